@@ -4,7 +4,7 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from datetime import timedelta
 from config import Config
-from database import db
+from database import READ_PRIMARY_HEADER, db
 
 
 def create_app():
@@ -22,11 +22,16 @@ def create_app():
         origins=Config.CORS_ORIGINS,
         supports_credentials=Config.CORS_SUPPORTS_CREDENTIALS,
         max_age=Config.CORS_MAX_AGE,
-        allow_headers=["Content-Type", "Authorization"],
+        allow_headers=["Content-Type", "Authorization", READ_PRIMARY_HEADER],
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     )
     jwt = JWTManager(app)
 
+    # gzip / brotli / zstd for large JSON bodies
+    from utils.compression import init_compression
+
+    init_compression(app)
+
     # Import models (this registers them with SQLAlchemy)
     import models.user
     import models.book
@@ -34,6 +39,17 @@ def create_app():
     import models.cart
     import models.order
     import models.review
+    import models.search
+    import models.catalog
+    import models.related
+    import models.catalog_import
+    import models.author
+    import models.publisher
+
+    # Compile the models' to_dict() serializers once, up front
+    from utils.serializers import compile_all
+
+    compile_all()
 
     # Import and register blueprints
     from routes.auth import auth_bp
@@ -42,6 +58,7 @@ def create_app():
     from routes.orders import orders_bp
     from routes.review import reviews_bp
     from routes.admin import admin_bp
+    from routes.covers import covers_bp
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(books_bp, url_prefix="/api/books")
@@ -49,6 +66,7 @@ def create_app():
     app.register_blueprint(orders_bp, url_prefix="/api/orders")
     app.register_blueprint(reviews_bp, url_prefix="/api/reviews")
     app.register_blueprint(admin_bp, url_prefix="/api/admin")
+    app.register_blueprint(covers_bp, url_prefix="/api/covers")
 
     # Health check endpoint
     @app.route("/api/health", methods=["GET"])
@@ -0,0 +1,135 @@
+"""
+GET /api/cart query count and latency for a 50-item cart.
+
+The cart and its books are read in one joined query, so the statement count
+must not grow with the number of lines; the check fails (exit status 1) if
+it does. Timed against the old read path, which loaded the lines and then
+lazy-loaded each line's book, and reloaded the whole cart again for the
+total and for the item count.
+
+Also times a burst of quantity edits sent as one PUT /api/cart/update per
+line against the same edits in a single POST /api/cart/batch.
+Usage: python -m benchmarks.cart [items_in_cart]   (default 50)
+"""
+
+import itertools
+import sys
+from benchmarks.common import (
+    count_queries,
+    create_bench_app,
+    db,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+# Statements GET /api/cart may run, whatever the size of the cart
+CART_QUERIES = 1
+
+# Lines changed per burst of quantity edits
+EDITS = 10
+
+
+def main():
+    from flask_jwt_extended import create_access_token
+    from models.book import Book
+    from models.cart import CartItem
+    from models.user import User
+
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    app = create_bench_app()
+    client = app.test_client()
+
+    print_header(f"CART READ BENCHMARK ({items} items)")
+
+    with app.app_context():
+        seed_books(items)
+        user = User(name="Bench Shopper", email="shopper@example.com", password="x")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.user_id
+        for (isbn,) in db.session.query(Book.isbn).limit(items):
+            db.session.add(CartItem(user_id=user_id, book_id=isbn, quantity=2))
+        db.session.commit()
+        headers = {
+            "Authorization": f"Bearer {create_access_token(identity=str(user_id))}"
+        }
+
+        def old_read():
+            db.session.expunge_all()
+            cart = CartItem.query.filter_by(user_id=user_id).all()
+            [item.to_dict() for item in cart]
+            sum(item.total_price for item in CartItem.query.filter_by(user_id=user_id))
+            sum(item.quantity for item in CartItem.query.filter_by(user_id=user_id))
+
+        with count_queries() as queries:
+            old_read()
+        print_row("old read path", time_calls(old_read), f"{queries['count']} queries")
+
+        def get_cart():
+            response = client.get("/api/cart", headers=headers)
+            assert response.status_code == 200, response.json
+            return response
+
+        with count_queries() as queries:
+            response = get_cart()
+        print_row("GET /api/cart", time_calls(get_cart), f"{queries['count']} queries")
+
+    lines = len(response.json["cart"])
+    summary = response.json["summary"]
+    if lines != items or summary["itemCount"] != items * 2:
+        print(f"❌ expected {items} lines, got {lines} ({summary})")
+        return 1
+    if queries["count"] != CART_QUERIES:
+        print(
+            f"❌ GET /api/cart ran {queries['count']} queries, expected {CART_QUERIES}"
+        )
+        return 1
+    print(f"✅ {items}-item cart read in {CART_QUERIES} query")
+
+    with app.app_context():
+        edited = [
+            isbn
+            for (isbn,) in db.session.query(Book.isbn)
+            .filter(Book.stock_quantity >= 2)
+            .order_by(Book.isbn)
+            .limit(EDITS)
+        ]
+    quantity = itertools.count()
+
+    def one_by_one():
+        new_quantity = 1 + next(quantity) % 2
+        for isbn in edited:
+            response = client.put(
+                "/api/cart/update",
+                json={"book_id": isbn, "quantity": new_quantity},
+                headers=headers,
+            )
+            assert response.status_code == 200, response.json
+        client.get("/api/cart", headers=headers)
+
+    def batched():
+        new_quantity = 1 + next(quantity) % 2
+        operations = [
+            {"op": "set", "book_id": isbn, "quantity": new_quantity} for isbn in edited
+        ]
+        response = client.post(
+            "/api/cart/batch", json={"operations": operations}, headers=headers
+        )
+        assert response.status_code == 200, response.json
+
+    print()
+    for label, edit in (
+        (f"{len(edited)} x PUT /update + GET", one_by_one),
+        ("1 x POST /batch", batched),
+    ):
+        with app.app_context():
+            with count_queries() as queries:
+                edit()
+        print_row(label, time_calls(edit, repeat=20), f"{queries['count']} queries")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+"""
+Concurrent add-to-cart check: several threads keep adding the same book to
+the same user's cart, first through the old lookup-then-insert-or-update
+path on a Cart table without the (user_id, book_id) unique key, then
+through POST /api/cart/add (one guarded upsert) on the current schema.
+
+Runs against a SQLite file so the threads hold separate connections. The
+check fails (exit status 1) unless the upsert leaves exactly one line
+holding every copy added. Also prints the statements one add runs on each
+path.
+Usage: python -m benchmarks.cart_concurrency [threads] [adds_per_thread]
+       (default 8 x 25)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+from benchmarks.common import count_queries, print_header
+from config import Config
+
+# Cart as in the original DDL, before uq_Cart_user_book
+LEGACY_CART_DDL = (
+    "CREATE TABLE Cart ("
+    "cart_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    "user_id INTEGER NOT NULL REFERENCES User (user_id), "
+    "book_id VARCHAR(13) NOT NULL REFERENCES Book_Details (isbn), "
+    "quantity INTEGER NOT NULL DEFAULT 1, "
+    "date_added DATETIME)"
+)
+
+
+def old_add_to_cart(user_id, book_id, quantity=1):
+    """The add-to-cart route body before the upsert"""
+    from benchmarks.common import db
+    from models.book import Book
+    from models.cart import CartItem
+
+    book = Book.query.filter_by(isbn=str(book_id)).first()
+    if book.stock_quantity < quantity:
+        return None
+    cart_item = CartItem.query.filter_by(user_id=user_id, book_id=book.isbn).first()
+    if cart_item:
+        if book.stock_quantity < cart_item.quantity + quantity:
+            return None
+        cart_item.quantity = cart_item.quantity + quantity
+    else:
+        cart_item = CartItem(user_id=user_id, book_id=book.isbn, quantity=quantity)
+        db.session.add(cart_item)
+    db.session.commit()
+    return cart_item.to_dict()
+
+
+def hammer(threads, adds, add):
+    """Run add() adds times in each of threads threads; returns the errors"""
+    errors = []
+    start = threading.Barrier(threads)
+
+    def worker():
+        start.wait()
+        for _ in range(adds):
+            try:
+                add()
+            except Exception as e:  # a lost race is a result, not a crash
+                errors.append(e)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    return errors
+
+
+def cart_lines(db, user_id):
+    from sqlalchemy import text
+
+    return db.session.execute(
+        text("SELECT quantity FROM Cart WHERE user_id = :user_id"),
+        {"user_id": user_id},
+    ).all()
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    adds = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    workdir = tempfile.mkdtemp(prefix="cart-concurrency-")
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'cart.db')}"
+
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import text
+    from benchmarks.common import create_bench_app, db, seed_books
+    from models.book import Book
+    from models.user import User
+
+    app = create_bench_app()
+    print_header(f"CONCURRENT ADD-TO-CART CHECK ({threads} threads x {adds} adds)")
+
+    with app.app_context():
+        seed_books(10)
+        user = User(name="Bench Shopper", email="shopper@example.com", password="x")
+        db.session.add(user)
+        isbn = "9780000000001"
+        db.session.get(Book, isbn).stock_quantity = threads * adds * 10
+        db.session.commit()
+        user_id = user.user_id
+        headers = {
+            "Authorization": f"Bearer {create_access_token(identity=str(user_id))}"
+        }
+
+        db.session.execute(text("DROP TABLE Cart"))
+        db.session.execute(text(LEGACY_CART_DDL))
+        db.session.commit()
+
+    def old_add():
+        with app.app_context():
+            old_add_to_cart(user_id, isbn)
+
+    with app.app_context():
+        with count_queries() as queries:
+            old_add()
+        old_queries = queries["count"]
+        db.session.execute(text("DELETE FROM Cart"))
+        db.session.commit()
+
+    errors = hammer(threads, adds, old_add)
+    with app.app_context():
+        lines = cart_lines(db, user_id)
+        print(
+            f"  before: {len(lines)} line(s), {sum(q for (q,) in lines)} of "
+            f"{threads * adds} copies, {len(errors)} failed add(s), "
+            f"{old_queries} statements per add"
+        )
+
+        db.session.execute(text("DROP TABLE Cart"))
+        db.session.commit()
+        db.create_all()
+        # Pooled connections still hold the legacy table's schema
+        db.engine.dispose()
+
+    def new_add():
+        response = app.test_client().post(
+            "/api/cart/add", json={"book_id": isbn}, headers=headers
+        )
+        if response.status_code != 200:
+            raise RuntimeError(response.json)
+
+    with app.app_context():
+        with count_queries() as queries:
+            new_add()
+        new_queries = queries["count"]
+        db.session.execute(text("DELETE FROM Cart"))
+        db.session.commit()
+
+    errors = hammer(threads, adds, new_add)
+    with app.app_context():
+        lines = cart_lines(db, user_id)
+    copies = sum(q for (q,) in lines)
+    print(
+        f"  after:  {len(lines)} line(s), {copies} of {threads * adds} copies, "
+        f"{len(errors)} failed add(s), {new_queries} statements per add"
+    )
+
+    if len(lines) != 1 or copies != threads * adds or errors:
+        print(f"❌ expected one line of {threads * adds} copies ({errors[:3]})")
+        return 1
+    print("✅ no duplicate lines and no lost adds")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
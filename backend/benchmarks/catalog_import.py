@@ -0,0 +1,107 @@
+"""
+Bulk catalog import: a supplier CSV loaded through utils.catalog_import
+(fresh inserts, then the same file again as all updates, then through
+POST /api/admin/books/import gzipped) against creating the books one
+POST /api/admin/books request at a time, plus statements per batch.
+Usage: python -m benchmarks.catalog_import [number_of_books]   (default 200000)
+"""
+
+import csv
+import gzip
+import io
+import sys
+import time
+
+from benchmarks.common import (
+    create_bench_app,
+    count_queries,
+    db,
+    make_book_rows,
+    print_header,
+)
+
+# Books created through POST /api/admin/books (extrapolated to the file size)
+SINGLE_REQUESTS = 2000
+
+
+def make_csv(book_count):
+    buffer = io.StringIO()
+    writer = None
+    for start in range(0, book_count, 10_000):
+        rows = make_book_rows(min(10_000, book_count - start), start)
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+            writer.writeheader()
+        writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def run_import(data, label, book_count):
+    from utils.catalog_import import import_books, start_job
+
+    start = time.perf_counter()
+    with count_queries() as queries:
+        job = import_books(io.StringIO(data, newline=""), start_job("csv", label))
+    elapsed = time.perf_counter() - start
+    batches = -(-job.rows_done // 1000)
+    print(
+        f"  {label:<32} {elapsed:6.1f} s  {book_count / elapsed:8,.0f} rows/s  "
+        f"{queries['count'] / batches:4.1f} statements/batch"
+    )
+    return elapsed
+
+
+def main():
+    from flask_jwt_extended import create_access_token
+    from models.user import User
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    app = create_bench_app()
+    client = app.test_client()
+
+    print_header(f"CATALOG IMPORT BENCHMARK ({book_count:,} books)")
+    data = make_csv(book_count)
+    print(f"  source: {len(data) / 2**20:.1f} MiB of CSV")
+
+    with app.app_context():
+        admin = User(name="Bench Admin", email="admin@example.com", password="x")
+        admin.user_type = "admin"
+        db.session.add(admin)
+        db.session.commit()
+        headers = {
+            "Authorization": f"Bearer {create_access_token(identity=str(admin.user_id))}"
+        }
+
+        run_import(data, "import, all new", book_count)
+        run_import(data, "import, all updates", book_count)
+
+    body = gzip.compress(data.encode(), 6)
+    start = time.perf_counter()
+    response = client.post(
+        "/api/admin/books/import",
+        data=body,
+        headers={**headers, "Content-Type": "text/csv", "Content-Encoding": "gzip"},
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {'POST .../import, gzipped':<32} {elapsed:6.1f} s  "
+        f"{book_count / elapsed:8,.0f} rows/s  "
+        f"({len(body) / 2**20:.1f} MiB upload, {response.json['job']['status']})"
+    )
+
+    rows = make_book_rows(SINGLE_REQUESTS, book_count)
+    start = time.perf_counter()
+    for row in rows:
+        # The route hands publication_date strings straight to SQLite's Date
+        del row["publication_date"]
+        client.post("/api/admin/books", json=row, headers=headers)
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {'POST /api/admin/books per book':<32} {elapsed:6.1f} s  "
+        f"{SINGLE_REQUESTS / elapsed:8,.0f} rows/s  "
+        f"(~{book_count * elapsed / SINGLE_REQUESTS / 60:.0f} min for the file)"
+    )
+
+
+if __name__ == "__main__":
+    main()
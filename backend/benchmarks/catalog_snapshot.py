@@ -0,0 +1,165 @@
+"""
+Shared catalog snapshot: writer cost, worker startup and memory per worker.
+
+Publishes the columnar catalog (all browse orders included) to a snapshot
+file, checks that listings answered from the mapped file match a catalog
+built from the database, then starts groups of worker processes that each
+open the snapshot and run a filtered listing in every sort order. Workers
+either use the mapped arrays as they are (shared) or copy them (what each
+worker building its own catalog costs); memory is the proportional set size
+(PSS) the catalog added to each worker, so shared pages count once in total.
+Usage: python -m benchmarks.catalog_snapshot [number_of_books]   (default 1000000)
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.common import count_queries, create_bench_app, db, print_header
+from benchmarks.common import seed_books
+
+WORKER_COUNTS = [1, 4, 8]
+CRITERIA = {"category_name": "Fantasy"}
+
+
+def proportional_memory():
+    """This process's PSS in MiB"""
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def worker(path, shared, results, done):
+    from routes.books import BROWSE_SORTS, _book_sort_keys
+    from utils.catalog_snapshot import open_snapshot
+    from utils.columnar import ColumnarCatalog, Order
+
+    sort_orders = [_book_sort_keys(sort) for sort in BROWSE_SORTS]
+    before = proportional_memory()
+    start = time.perf_counter()
+    catalog, _, _ = open_snapshot(path)
+    if not shared:
+        catalog = ColumnarCatalog(
+            catalog.isbns.copy(),
+            {column: values.copy() for column, values in catalog.arrays.items()},
+            catalog.dictionaries,
+            {
+                signature: Order(order.columns, order.permutation.copy(), None)
+                for signature, order in catalog.orders().items()
+            },
+        )
+    opened = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for sort_keys in sort_orders:
+        catalog.select(sort_keys, CRITERIA, 10, 30)
+    listed = time.perf_counter() - start
+
+    results.put((opened, listed, proportional_memory() - before))
+    # Stay alive (and mapped) until every worker has measured
+    done.wait()
+
+
+def run_workers(path, count, shared):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    done = context.Event()
+    processes = [
+        context.Process(target=worker, args=(path, shared, results, done))
+        for _ in range(count)
+    ]
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in processes]
+    done.set()
+    for process in processes:
+        process.join()
+    return measured
+
+
+def main():
+    from routes.books import BROWSE_SORTS, _book_sort_keys
+    from models.book import Book
+    from utils.catalog import bump_catalog_version
+    from utils.catalog_snapshot import open_snapshot
+    from utils.columnar import ColumnarCatalog, _book_rows, publish_snapshot
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = os.path.join(tempfile.mkdtemp(prefix="catalog-snapshot-"), "catalog.snap")
+    sort_orders = [_book_sort_keys(sort) for sort in BROWSE_SORTS]
+
+    app = create_bench_app()
+    app.config.update(COLUMNAR_CATALOG=True, COLUMNAR_SNAPSHOT_PATH=path)
+    print_header(f"CATALOG SNAPSHOT BENCHMARK ({book_count:,} books)")
+
+    failures = 0
+    with app.app_context():
+        seed_books(book_count)
+        db.session.execute(
+            db.text("UPDATE Book_Details SET updated_at = datetime('now', '-1 day')")
+        )
+        db.session.commit()
+
+        start = time.perf_counter()
+        _, size = publish_snapshot(path, sort_orders)
+        print(
+            f"  first publish (build + {len(sort_orders)} orders)  "
+            f"{time.perf_counter() - start:7.2f} s   {size / 2**20:.1f} MiB"
+        )
+
+        # A handful of edits, then an incremental republish from the file
+        for i in range(0, book_count, book_count // 20):
+            book = db.session.get(Book, f"{9780000000000 + i}")
+            book.title = f"Retitled {i}"
+            book.price = 7.5
+        bump_catalog_version()
+        db.session.commit()
+        app.extensions.pop("columnar_catalog")
+        start = time.perf_counter()
+        publish_snapshot(path, sort_orders)
+        print(
+            f"  republish after 20 edits (new process)   "
+            f"{time.perf_counter() - start:7.2f} s"
+        )
+
+        with count_queries() as queries:
+            start = time.perf_counter()
+            mapped, _, _ = open_snapshot(path)
+            opened = (time.perf_counter() - start) * 1000
+        print(
+            f"  open snapshot                         {opened:9.2f} ms, "
+            f"{queries['count']} queries"
+        )
+
+        built = ColumnarCatalog.build(_book_rows())
+        for sort_keys in sort_orders:
+            ours, _ = mapped.select(sort_keys, CRITERIA, 10, 30)
+            theirs, _ = built.select(sort_keys, CRITERIA, 10, 30)
+            if not (ours == theirs).all():
+                failures += 1
+                print(f"  ❌ {sort_keys[0]} differs from a fresh build")
+        if not failures:
+            print(f"  ✅ all {len(sort_orders)} orders match a fresh build")
+
+    print("\n  Workers (catalog's PSS per worker, total; open; 8 listings):")
+    for count in WORKER_COUNTS:
+        for shared in (False, True):
+            measured = run_workers(path, count, shared)
+            memory = [pss for _, _, pss in measured]
+            opened = max(opened for opened, _, _ in measured) * 1000
+            listed = max(listed for _, listed, _ in measured) * 1000
+            print(
+                f"  {count} x {'mapped' if shared else 'copied':<7} "
+                f"{sum(memory) / count:7.1f} MiB each, {sum(memory):7.1f} MiB total;"
+                f" open {opened:7.1f} ms; listings {listed:6.1f} ms"
+            )
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,181 @@
+"""
+Columnar catalog vs. SQL for browsing GET /api/books.
+
+Runs the same listings (filters, sorts, deep pages, cursors) with
+COLUMNAR_CATALOG off and on, checks the responses are identical, and
+compares latency. Then applies an inventory write (sales counters), an
+admin edit and an insert + delete, and times the first listing after each
+(the engine patches itself in that request) before checking again.
+Usage: python -m benchmarks.columnar [number_of_books]   (default 1000000)
+"""
+
+import sys
+import time
+from datetime import date
+
+from benchmarks.common import (
+    create_bench_app,
+    db,
+    make_book_rows,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+LISTINGS = [
+    ("title, page 1", "/api/books"),
+    ("title, page 5000", "/api/books?page=5000"),
+    ("category + price-low", "/api/books?category=mystery&sort=price-low"),
+    ("author + newest", "/api/books?author=Author%2042&sort=newest"),
+    (
+        "price range + bestselling",
+        "/api/books?min_price=10&max_price=12.5&sort=bestselling",
+    ),
+    (
+        "category + publisher + trending",
+        "/api/books?category=fantasy&publisher=Publisher%207&sort=trending",
+    ),
+    ("publisher sort, per_page=100", "/api/books?sort=publisher&per_page=100&page=40"),
+    ("cursor, price-high", "/api/books?sort=price-high&cursor="),
+]
+
+
+def fetch(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.json
+    return response.json
+
+
+def walk(client, url, pages=5):
+    """First few pages of a cursor listing, following next_cursor"""
+    responses = [fetch(client, url)]
+    for _ in range(pages - 1):
+        cursor = responses[-1]["pagination"]["next_cursor"]
+        if not cursor:
+            break
+        responses.append(fetch(client, url.split("&cursor=")[0] + f"&cursor={cursor}"))
+    return responses
+
+
+def compare(app, client):
+    """Listings whose columnar and SQL responses differ"""
+    differing = []
+    for label, url in LISTINGS:
+        results = []
+        for enabled in (False, True):
+            app.config["COLUMNAR_CATALOG"] = enabled
+            results.append(
+                walk(client, url) if "cursor=" in url else fetch(client, url)
+            )
+        if results[0] != results[1]:
+            differing.append(label)
+    return differing
+
+
+def report(differing):
+    if differing:
+        print(f"  ❌ responses differ: {', '.join(differing)}")
+    else:
+        print(f"  ✅ identical responses for all {len(LISTINGS)} listings")
+    return len(differing)
+
+
+def timed_first_request(app, client, url):
+    app.config["COLUMNAR_CATALOG"] = True
+    start = time.perf_counter()
+    fetch(client, url)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    from models.book import Book
+    from routes.books import _book_sort_keys
+    from utils.catalog import bump_catalog_version
+    from utils.columnar import get_catalog
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app = create_bench_app()
+    client = app.test_client()
+    print_header(f"COLUMNAR CATALOG BENCHMARK ({book_count:,} books)")
+
+    with app.app_context():
+        seed_books(book_count)
+        # Spread the sales counters and leave some dates NULL so every sort
+        # has ties and gaps to get right; the seed is backdated so syncs only
+        # re-read what the writes below touch
+        db.session.execute(
+            db.text(
+                "UPDATE Book_Details SET units_sold = (CAST(isbn AS INTEGER) * 7919)"
+                " % 5000, trend_score = ((CAST(isbn AS INTEGER) * 104729) % 1000)"
+                " / 10.0, publication_date = CASE WHEN pages % 50 = 0 THEN NULL"
+                " ELSE publication_date END, updated_at = datetime('now', '-1 day')"
+            )
+        )
+        db.session.commit()
+
+    failures = 0
+    with app.test_request_context():
+        app.config["COLUMNAR_CATALOG"] = True
+        start = time.perf_counter()
+        catalog = get_catalog(_book_sort_keys("title"))
+        build = time.perf_counter() - start
+        print(
+            f"  build {build:.2f} s, arrays {catalog.nbytes() / 2**20:.1f} MiB "
+            f"({catalog.nbytes() / max(len(catalog), 1):.0f} bytes/book)"
+        )
+
+    # Other orders are built on first use; time the first request per sort
+    for label, url in LISTINGS:
+        print(f"  first {label:<34} {timed_first_request(app, client, url):9.1f} ms")
+
+    failures += report(compare(app, client))
+
+    print("\n  Latency (SQL -> columnar):")
+    for label, url in LISTINGS:
+        for enabled in (False, True):
+            app.config["COLUMNAR_CATALOG"] = enabled
+            stats = time_calls(lambda: fetch(client, url), repeat=10, warmup=1)
+            print_row(f"{label[:22]} ({'col' if enabled else 'sql'})", stats)
+
+    print("\n  Writes, then the first columnar listing after each:")
+    with app.app_context():
+        isbns = [f"{9780000000000 + i}" for i in range(0, book_count, book_count // 50)]
+        db.session.execute(
+            db.update(Book)
+            .where(Book.isbn.in_(isbns))
+            .values(units_sold=Book.units_sold + 7, trend_score=Book.trend_score + 50)
+        )
+        bump_catalog_version("inventory")
+        db.session.commit()
+    elapsed = timed_first_request(app, client, "/api/books?sort=bestselling")
+    print(f"  sales counters of 50 books      {elapsed:9.1f} ms (patch + re-sort)")
+    failures += report(compare(app, client))
+
+    with app.app_context():
+        book = db.session.get(Book, isbns[3])
+        book.title = "Aaaa First Of All"
+        book.price = 11.25
+        book.publication_date = date(2030, 1, 1)
+        bump_catalog_version()
+        db.session.commit()
+    elapsed = timed_first_request(app, client, "/api/books")
+    print(f"  admin edit of one book          {elapsed:9.1f} ms (title re-placed)")
+    failures += report(compare(app, client))
+
+    with app.app_context():
+        row = make_book_rows(1, start=book_count)[0]
+        row.update(isbn="9770000000001", author_name="Author 42", price=11)
+        db.session.execute(db.insert(Book), [row])
+        db.session.execute(db.delete(Book).where(Book.isbn == isbns[5]))
+        bump_catalog_version()
+        db.session.commit()
+    elapsed = timed_first_request(app, client, "/api/books")
+    print(f"  insert + delete                 {elapsed:9.1f} ms (rows shifted)")
+    failures += report(compare(app, client))
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
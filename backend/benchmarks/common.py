@@ -0,0 +1,137 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run the real Flask app against an in-memory SQLite database
+(TestingConfig), so they are self-contained and need no MySQL server.
+Run them from the backend directory, e.g. python -m benchmarks.review_ratings
+"""
+
+import itertools
+import os
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+os.environ["FLASK_ENV"] = "testing"
+
+from sqlalchemy import event, insert  # noqa: E402
+from app import create_app  # noqa: E402
+from database import db  # noqa: E402
+
+CATEGORIES = ["Classics", "Science Fiction", "Fantasy", "Mystery", "Self Help"]
+
+# Vocabulary for synthetic titles and descriptions: a few real words plus
+# generated ones, drawn with Zipf-like weights so text search sees a
+# realistic mix of common and rare terms
+WORDS = (
+    "shadow river kingdom silent garden empire night winter secret house "
+    "stars ocean fire memory storm journey crown glass forest city dragon "
+    "letters island mountain machine dream stone voice summer ghost war "
+    "hunter lost golden broken last wild hidden iron crimson northern "
+    "daughter king queen song circle bridge tower light dark heart road"
+).split()
+_SYLLABLES = "ka lo mi ren tal vor shi pen dra gol mer nis ath bel cor fen".split()
+WORDS += [
+    a + b + c for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES
+][:5000]
+_WORD_WEIGHTS = list(
+    itertools.accumulate(1 / (rank + 20) for rank in range(len(WORDS)))
+)
+
+
+def create_bench_app():
+    """Create the app with a fresh schema"""
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def make_book_rows(count, start=0):
+    """Build synthetic Book_Details rows for bulk insertion"""
+    rng = random.Random(start)
+    base_date = date(1950, 1, 1)
+    rows = []
+    for i in range(start, start + count):
+        title = " ".join(
+            rng.choices(WORDS, cum_weights=_WORD_WEIGHTS, k=rng.randint(2, 4))
+        ).title()
+        rows.append(
+            {
+                "isbn": f"{9780000000000 + i}",
+                "title": f"{title} {i}",
+                "author_name": f"Author {i % 997}",
+                "publisher_name": f"Publisher {i % 53}",
+                "category_name": CATEGORIES[i % len(CATEGORIES)],
+                "price": 5 + (i % 4000) / 100,
+                "publication_date": base_date + timedelta(days=i % 25000),
+                "pages": 100 + i % 600,
+                "stock_quantity": i % 40,
+                "description": " ".join(
+                    rng.choices(WORDS, cum_weights=_WORD_WEIGHTS, k=24)
+                ),
+                "image": f"https://example.com/covers/{i}.jpg",
+            }
+        )
+    return rows
+
+
+def seed_books(count, batch_size=5000):
+    """Bulk insert synthetic books (call inside an app context)"""
+    from models.book import Book
+
+    for start in range(0, count, batch_size):
+        db.session.execute(
+            insert(Book), make_book_rows(min(batch_size, count - start), start)
+        )
+    db.session.commit()
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed inside the block"""
+    counter = {"count": 0}
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+
+
+def time_calls(fn, repeat=50, warmup=3):
+    """Call fn repeatedly and return latency percentiles in milliseconds"""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        "mean": statistics.fmean(samples),
+    }
+
+
+def print_header(title):
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+
+
+def print_row(label, stats, extra=""):
+    print(
+        f"  {label:<28} p50 {stats['p50']:8.3f} ms   "
+        f"p99 {stats['p99']:8.3f} ms  {extra}"
+    )
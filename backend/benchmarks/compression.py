@@ -0,0 +1,89 @@
+"""
+Response compression: bytes saved vs. CPU spent per coding (gzip, brotli,
+zstd) on representative payloads - a catalog page of 12 and of 100 books,
+the admin book list and the admin order list - plus GET /api/books latency
+uncompressed, compressed on every hit, and served from the compressed-body
+cache.
+Usage: python -m benchmarks.compression [number_of_books]   (default 20000)
+"""
+
+import sys
+
+from benchmarks.common import (
+    create_bench_app,
+    db,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+from benchmarks.related import make_order_lines, seed_orders
+
+PAYLOADS = (
+    ("books, 12 per page", "/api/books?cursor="),
+    ("books, 100 per page", "/api/books?per_page=100&cursor="),
+    ("admin books, 100", "/api/admin/books?per_page=100&cursor="),
+    ("admin orders, 100", "/api/admin/orders?per_page=100&cursor="),
+)
+
+
+def main():
+    from flask_jwt_extended import create_access_token
+    from models.user import User
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    app = create_bench_app()
+    client = app.test_client()
+    encoders = app.extensions["compression"]["encoders"]
+    cache = app.extensions["compression"]["cache"]
+
+    print_header(f"COMPRESSION BENCHMARK ({book_count:,} books)")
+    print(f"  codings available: {', '.join(encoders)}")
+
+    with app.app_context():
+        seed_books(book_count)
+        order_ids, books = make_order_lines(5000)
+        seed_orders(order_ids, books % book_count)
+        admin = User(name="Bench Admin", email="admin@example.com", password="x")
+        admin.user_type = "admin"
+        db.session.add(admin)
+        db.session.commit()
+        headers = {
+            "Authorization": f"Bearer {create_access_token(identity=str(admin.user_id))}"
+        }
+
+    for label, url in PAYLOADS:
+        body = client.get(url, headers=headers).data
+        print(f"\n  {label}: {len(body) / 1024:.1f} KB")
+        for coding, encode in encoders.items():
+            size = len(encode(body))
+            stats = time_calls(lambda: encode(body), repeat=50)
+            print_row(
+                f"  {coding}",
+                stats,
+                f"{size / 1024:6.1f} KB  (-{100 - 100 * size / len(body):.0f}%, "
+                f"{len(body) / stats['p50'] / 1000:.0f} MB/s)",
+            )
+
+    url = "/api/books?per_page=100&cursor="
+    print(f"\n  GET {url}")
+    print_row("identity", time_calls(lambda: client.get(url), repeat=200))
+    for coding in encoders:
+
+        def cold():
+            cache.entries.clear()
+            cache.size = 0
+            return client.get(url, headers={"Accept-Encoding": coding})
+
+        print_row(f"{coding}, compressed per hit", time_calls(cold, repeat=200))
+        print_row(
+            f"{coding}, cached",
+            time_calls(
+                lambda: client.get(url, headers={"Accept-Encoding": coding}),
+                repeat=200,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
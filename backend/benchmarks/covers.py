@@ -0,0 +1,117 @@
+"""
+Cover uploads: bytes a book grid downloads, upload latency and serving.
+
+Uploads a few large cover photos through POST /api/admin/books/<isbn>/cover
+and compares what a page of cards downloads as full-size originals against
+the card renditions, the upload response time against resizing inline, and
+GET /api/covers (full file, range request, revalidation).
+Usage: python -m benchmarks.covers [number_of_covers]   (default 12)
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.common import create_bench_app, db, print_header, print_row
+from benchmarks.common import seed_books, time_calls
+
+# Size of a typical publisher cover scan
+ORIGINAL_SIZE = (1600, 2400)
+
+
+def cover_photo(seed):
+    """A noisy JPEG, so it compresses about like a real cover"""
+    from PIL import Image
+
+    image = Image.effect_noise(ORIGINAL_SIZE, 40 + seed).convert("RGB")
+    image = Image.blend(
+        image, Image.new("RGB", ORIGINAL_SIZE, (seed * 20, 90, 160)), 0.6
+    )
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=90)
+    return out.getvalue()
+
+
+def main():
+    from flask_jwt_extended import create_access_token
+    from models.user import User
+    from utils.covers import COVER_SIZES, _render_all, enabled
+
+    if not enabled():
+        print("❌ Pillow is not installed (pip install Pillow)")
+        return 1
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    app = create_bench_app()
+    app.config["UPLOAD_FOLDER"] = tempfile.mkdtemp(prefix="covers-")
+    client = app.test_client()
+    print_header(f"COVER UPLOAD BENCHMARK ({count} covers)")
+
+    with app.app_context():
+        seed_books(count)
+        admin = User(name="Bench Admin", email="admin@example.com", password="x")
+        admin.user_type = "admin"
+        db.session.add(admin)
+        db.session.commit()
+        headers = {
+            "Authorization": f"Bearer {create_access_token(identity=str(admin.user_id))}"
+        }
+
+    photos = [cover_photo(i) for i in range(count)]
+    isbns = [f"{9780000000000 + i}" for i in range(count)]
+
+    start = time.perf_counter()
+    uploads = []
+    for isbn, photo in zip(isbns, photos):
+        response = client.post(
+            f"/api/admin/books/{isbn}/cover",
+            data={"cover": (io.BytesIO(photo), "cover.jpg")},
+            headers=headers,
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 201, response.json
+        uploads.append(response.json["cover"])
+    upload = (time.perf_counter() - start) * 1000 / count
+
+    # The same resizing done inside the request instead
+    scratch = tempfile.mkdtemp(prefix="covers-inline-")
+    start = time.perf_counter()
+    for i, photo in enumerate(photos):
+        original = os.path.join(scratch, f"{i}.jpg")
+        with open(original, "wb") as out:
+            out.write(photo)
+        _render_all(scratch, f"{i}", original)
+    inline = (time.perf_counter() - start) * 1000 / count
+
+    print(f"  upload request, resized in the pool {upload:8.1f} ms/cover")
+    print(
+        f"  resizing inline (all {len(COVER_SIZES)} sizes)      {inline:8.1f} ms/cover"
+    )
+
+    card_bytes = sum(len(client.get(cover["card"]).data) for cover in uploads)
+    original_bytes = sum(len(photo) for photo in photos)
+    print(
+        f"  grid page of {count} cards: originals {original_bytes / 1024:8.1f} KiB, "
+        f"card renditions {card_bytes / 1024:6.1f} KiB "
+        f"({original_bytes / card_bytes:.0f}x less)"
+    )
+
+    url = uploads[0]["detail"]
+    etag = client.get(url).headers["ETag"]
+    print()
+    print_row("GET detail cover", time_calls(lambda: client.get(url).close()))
+    print_row(
+        "GET with Range",
+        time_calls(lambda: client.get(url, headers={"Range": "bytes=0-1023"}).close()),
+    )
+    print_row(
+        "GET revalidated (304)",
+        time_calls(lambda: client.get(url, headers={"If-None-Match": etag}).close()),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
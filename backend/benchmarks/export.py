@@ -0,0 +1,105 @@
+"""
+GET /api/admin/books/export: time and size to stream the whole catalog as
+NDJSON / CSV, plain and gzipped, and a since= delta feed, against paging
+through GET /api/admin/books 100 at a time; plus peak memory while
+streaming a quarter of the catalog vs. all of it.
+Usage: python -m benchmarks.export [number_of_books]   (default 200000)
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.common import create_bench_app, db, print_header, seed_books
+
+# Seeded books were "updated" one second apart from here on
+FIRST_UPDATE = datetime(2020, 1, 1)
+
+
+def stream(client, url, headers):
+    """Consume a streamed response; returns (bytes, seconds)"""
+    start = time.perf_counter()
+    response = client.get(url, headers=headers, buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return size, time.perf_counter() - start
+
+
+def since(fraction, book_count):
+    """since= value that selects the last `fraction` of the catalog"""
+    changed = FIRST_UPDATE + timedelta(seconds=int(book_count * (1 - fraction)))
+    return changed.isoformat()
+
+
+def main():
+    from flask_jwt_extended import create_access_token
+    from models.user import User
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    app = create_bench_app()
+    client = app.test_client()
+
+    print_header(f"EXPORT BENCHMARK ({book_count:,} books)")
+
+    with app.app_context():
+        seed_books(book_count)
+        db.session.execute(
+            db.text(
+                "UPDATE Book_Details SET updated_at = "
+                "datetime(:start, '+' || (rowid - 1) || ' seconds')"
+            ),
+            {"start": FIRST_UPDATE.isoformat(sep=" ")},
+        )
+        admin = User(name="Bench Admin", email="admin@example.com", password="x")
+        admin.user_type = "admin"
+        db.session.add(admin)
+        db.session.commit()
+        headers = {
+            "Authorization": f"Bearer {create_access_token(identity=str(admin.user_id))}"
+        }
+    gzip_headers = {**headers, "Accept-Encoding": "gzip"}
+
+    export = "/api/admin/books/export"
+    for label, url, request_headers in (
+        ("ndjson", export, headers),
+        ("ndjson, gzip", export, gzip_headers),
+        ("csv", f"{export}?format=csv", headers),
+        ("csv, gzip", f"{export}?format=csv", gzip_headers),
+        (
+            "ndjson, since= (1% changed)",
+            f"{export}?since={since(0.01, book_count)}",
+            headers,
+        ),
+    ):
+        size, elapsed = stream(client, url, request_headers)
+        print(f"  {label:<30} {elapsed:6.2f} s  {size / 2**20:7.1f} MiB")
+
+    start = time.perf_counter()
+    pages = 0
+    url = "/api/admin/books?per_page=100&cursor="
+    while url:
+        cursor = client.get(url, headers=headers).json["pagination"]["next_cursor"]
+        pages += 1
+        url = f"/api/admin/books?per_page=100&cursor={cursor}" if cursor else None
+    print(
+        f"  {'paging /api/admin/books':<30} {time.perf_counter() - start:6.2f} s"
+        f"  ({pages:,} requests)"
+    )
+
+    # Flat if rows are streamed rather than collected
+    for fraction in (0.25, 1.0):
+        tracemalloc.start()
+        size, _ = stream(
+            client, f"{export}?since={since(fraction, book_count)}", headers
+        )
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"  peak memory, {fraction:>4.0%} of catalog: {peak / 2**20:5.1f} MiB "
+            f"for {size / 2**20:.1f} MiB of output"
+        )
+
+
+if __name__ == "__main__":
+    main()
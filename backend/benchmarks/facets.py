@@ -0,0 +1,76 @@
+"""
+GET /api/books with facets=category,author,publisher,price vs. the plain
+listing it decorates, cold (counts computed) and warm (cached per catalog
+version and filter set), with COLUMNAR_CATALOG off (grouped COUNTs in the
+database) and on (counted from the in-process arrays).
+
+Checks that both give the same facets; the check fails (exit status 1) if
+they differ.
+Usage: python -m benchmarks.facets [number_of_books]   (default 200000)
+"""
+
+import sys
+from benchmarks.common import (
+    create_bench_app,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+FACETS = "category,author,publisher,price"
+
+LISTINGS = (
+    ("all books", ""),
+    ("category", "category=fantasy"),
+    ("price range", "min_price=10&max_price=30"),
+)
+
+
+def main():
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    app = create_bench_app()
+    client = app.test_client()
+
+    print_header(f"FACETS BENCHMARK ({book_count:,} books)")
+
+    facets = {}
+    with app.app_context():
+        seed_books(book_count)
+
+        for enabled in (False, True):
+            app.config["COLUMNAR_CATALOG"] = enabled
+            print(f"\n  COLUMNAR_CATALOG {'on' if enabled else 'off'}")
+            for label, args in LISTINGS:
+                url = f"/api/books?{args}"
+                plain = time_calls(lambda: client.get(url), repeat=10)
+                print_row(f"{label}: listing", plain)
+
+                def cold():
+                    # Drop the cached counts only; bumping the catalog
+                    # version would also have the columnar catalog resync
+                    app.extensions["catalog_cache"]["keyed"].pop("facets", None)
+                    return client.get(f"{url}&facets={FACETS}")
+
+                faceted = time_calls(cold, repeat=10, warmup=1)
+                print_row(
+                    f"{label}: + facets (cold)",
+                    faceted,
+                    f"{faceted['p50'] / plain['p50']:.1f}x listing",
+                )
+                print_row(
+                    f"{label}: + facets (warm)",
+                    time_calls(lambda: client.get(f"{url}&facets={FACETS}"), repeat=10),
+                )
+                facets.setdefault(label, []).append(cold().json["facets"])
+
+    differing = [label for label, results in facets.items() if results[0] != results[1]]
+    if differing:
+        print(f"\n❌ facets differ with the columnar catalog: {', '.join(differing)}")
+        return 1
+    print(f"\n✅ identical facets for all {len(LISTINGS)} listings")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""
+GET /api/books/filters: cold (snapshot rebuilt) vs. warm (served from the
+cached snapshot) vs. revalidated (If-None-Match -> 304). Also the cold
+author and publisher lists, read from their tables' book counts, against
+the DISTINCT over Book_Details they used to run.
+Usage: python -m benchmarks.filters [number_of_books]   (default 200000)
+"""
+
+import sys
+from benchmarks.common import (
+    create_bench_app,
+    db,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+
+def main():
+    from models.book import Book
+    from utils.book_counts import reconcile_book_counts
+    from utils.catalog import bump_catalog_version
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    app = create_bench_app()
+    client = app.test_client()
+
+    print_header(f"FILTERS BENCHMARK ({book_count:,} books)")
+
+    with app.app_context():
+        seed_books(book_count)
+        reconcile_book_counts()
+        db.session.commit()
+
+        def cold(url):
+            def call():
+                bump_catalog_version()
+                db.session.commit()
+                client.get(url)
+
+            return call
+
+        print_row(
+            "cold (rebuild)",
+            time_calls(cold("/api/books/filters"), repeat=10, warmup=1),
+        )
+        for url in ("/api/books/authors", "/api/books/publishers"):
+            print_row(
+                f"cold {url.rsplit('/', 1)[1]}",
+                time_calls(cold(url), repeat=10, warmup=1),
+            )
+
+        def distinct():
+            for column in (Book.author_name, Book.publisher_name):
+                db.session.query(column).distinct().order_by(column).all()
+
+        print_row("DISTINCT names (before)", time_calls(distinct, repeat=10, warmup=1))
+
+        print_row("warm", time_calls(lambda: client.get("/api/books/filters")))
+
+        etag = client.get("/api/books/filters").headers["ETag"]
+        print_row(
+            "revalidated (304)",
+            time_calls(
+                lambda: client.get(
+                    "/api/books/filters", headers={"If-None-Match": etag}
+                )
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
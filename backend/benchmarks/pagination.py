@@ -0,0 +1,62 @@
+"""
+Deep-page latency: OFFSET + COUNT(*) vs. keyset cursors.
+
+Walks to increasingly deep positions of GET /api/books (sorted by title)
+with page= and with the equivalent cursor=, with and without totals.
+Usage: python -m benchmarks.pagination [number_of_books]   (default 200000)
+"""
+
+import sys
+from benchmarks.common import (
+    create_bench_app,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+PER_PAGE = 12
+DEPTHS = [1, 100, 1000, 10000]
+
+
+def main():
+    from models.book import Book
+    from utils.pagination import encode_cursor
+    from routes.books import _book_sort_keys
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    app = create_bench_app()
+    client = app.test_client()
+
+    print_header(f"PAGINATION BENCHMARK ({book_count:,} books, sort=title)")
+
+    with app.app_context():
+        seed_books(book_count)
+        sort_keys = _book_sort_keys("title")
+
+        for page in DEPTHS:
+            if (page - 1) * PER_PAGE >= book_count:
+                break
+
+            offset_url = f"/api/books?per_page={PER_PAGE}&page={page}"
+            stats = time_calls(lambda: client.get(offset_url), repeat=20)
+            print_row(f"page={page} (+count)", stats)
+
+            # Cursor pointing at the last row of the previous page
+            cursor = ""
+            if page > 1:
+                last = (
+                    Book.query.order_by(*[key.order_by for key in sort_keys])
+                    .offset((page - 1) * PER_PAGE - 1)
+                    .first()
+                )
+                with app.test_request_context():
+                    cursor = encode_cursor(sort_keys, last)
+
+            cursor_url = f"/api/books?per_page={PER_PAGE}&cursor={cursor}"
+            stats = time_calls(lambda: client.get(cursor_url), repeat=20)
+            print_row(f"cursor @ page {page}", stats)
+
+
+if __name__ == "__main__":
+    main()
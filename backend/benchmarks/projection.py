@@ -0,0 +1,42 @@
+"""
+GET /api/books page of 100 books: full payload vs. named projections and a
+sparse fields= list. Reports latency and response size.
+Usage: python -m benchmarks.projection [number_of_books]   (default 50000)
+"""
+
+import sys
+from benchmarks.common import (
+    create_bench_app,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+
+def main():
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    app = create_bench_app()
+    client = app.test_client()
+
+    print_header(f"PROJECTION BENCHMARK ({book_count:,} books, 100 per page)")
+
+    with app.app_context():
+        seed_books(book_count)
+
+        for label, args in (
+            ("full payload", ""),
+            ("projection=detail", "&projection=detail"),
+            ("projection=admin", "&projection=admin"),
+            ("projection=card", "&projection=card"),
+            ("fields=title,price", "&fields=title,price"),
+        ):
+            url = f"/api/books?per_page=100&cursor={args}"
+            size = len(client.get(url).data)
+            print_row(
+                label, time_calls(lambda: client.get(url)), f"{size / 1024:6.1f} KB"
+            )
+
+
+if __name__ == "__main__":
+    main()
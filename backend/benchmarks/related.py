@@ -0,0 +1,152 @@
+"""
+"Customers also bought": vectorised co-purchase build time for synthetic
+order lines (matrix product and top-K only), the full build_related() job
+against the database (load, compute, write), GET /api/books/<id>/related
+latency and the incremental update cost per new order.
+Usage: python -m benchmarks.related [order_lines] [database_order_lines]
+       (defaults 10000000 and 1000000)
+"""
+
+import itertools
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import (
+    create_bench_app,
+    db,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+BOOK_COUNT = 100_000
+FIRST_ISBN = 9780000000000
+
+
+def make_order_lines(line_count, seed=13):
+    """Parallel (order id, book code) arrays for roughly line_count lines.
+
+    Orders hold 1-6 books. The first is drawn with Zipf-like popularity;
+    each of the others is, more often than not, a near neighbour of it (same
+    series or author), so there are real patterns for the build to find.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 7, size=line_count // 3 + 1)
+    sizes = sizes[: np.searchsorted(np.cumsum(sizes), line_count) + 1]
+    order_ids = np.repeat(np.arange(1, len(sizes) + 1), sizes)[:line_count]
+
+    anchors = (rng.zipf(1.3, size=len(sizes)) - 1) % BOOK_COUNT
+    anchor = np.repeat(anchors, sizes)[:line_count]
+    nearby = (anchor + rng.integers(1, 20, size=line_count)) % BOOK_COUNT
+    anywhere = (rng.zipf(1.3, size=line_count) - 1) % BOOK_COUNT
+    books = np.where(rng.random(line_count) < 0.7, nearby, anywhere)
+    first = np.r_[True, order_ids[1:] != order_ids[:-1]]
+    books[first] = anchor[first]
+    return order_ids, books.astype(np.int32)
+
+
+def seed_orders(order_ids, books, batch_size=50_000):
+    """Bulk insert Book_Order / Order_Item rows for the given lines"""
+    connection = db.session.connection()
+    orders = (
+        "INSERT INTO Book_Order (order_id, user_id, customer_name, "
+        "customer_email, phone, payment_method, shipping_address, "
+        "total_amount, order_date, payment_status) VALUES "
+        "(?, 1, 'Bench', 'bench@example.com', '', 'cod', '', 0, "
+        "'2024-01-01 00:00:00', 'completed')"
+    )
+    lines = (
+        "INSERT INTO Order_Item (order_id, book_id, quantity, unit_price) "
+        "VALUES (?, ?, 1, 9.99)"
+    )
+    unique_orders = np.unique(order_ids).tolist()
+    for start in range(0, len(unique_orders), batch_size):
+        connection.exec_driver_sql(
+            orders, [(o,) for o in unique_orders[start : start + batch_size]]
+        )
+    isbns = (books.astype(np.int64) + FIRST_ISBN).astype(str)
+    for start in range(0, len(books), batch_size):
+        connection.exec_driver_sql(
+            lines,
+            list(
+                zip(
+                    order_ids[start : start + batch_size].tolist(),
+                    isbns[start : start + batch_size].tolist(),
+                )
+            ),
+        )
+    db.session.commit()
+
+
+def main():
+    from models.related import RelatedBook
+    from utils.related import build_related, co_purchase_matrix, record_order
+    from utils.related import top_related
+
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    db_line_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    print_header(f"RELATED BOOKS BENCHMARK ({line_count:,} order lines)")
+
+    order_ids, books = make_order_lines(line_count)
+    start = time.perf_counter()
+    matrix = co_purchase_matrix(order_ids, books, BOOK_COUNT)
+    built = time.perf_counter()
+    top = top_related(matrix)
+    ranked = time.perf_counter()
+    print(
+        f"  {len(np.unique(order_ids)):,} orders, {matrix.nnz:,} co-purchase "
+        f"pairs, {len(top[0]):,} related entries"
+    )
+    print(
+        f"  vectorised build: matrix {built - start:.1f} s + "
+        f"top-K {ranked - built:.1f} s = {ranked - start:.1f} s"
+    )
+    del matrix, top
+
+    app = create_bench_app()
+    client = app.test_client()
+    with app.app_context():
+        seed_books(BOOK_COUNT)
+        seed_orders(order_ids[:db_line_count], books[:db_line_count])
+        del order_ids, books
+
+        start = time.perf_counter()
+        pairs, entries = build_related()
+        db.session.commit()
+        print(
+            f"  build_related() over {db_line_count:,} lines in SQLite: "
+            f"{time.perf_counter() - start:.1f} s "
+            f"({pairs:,} pairs, {entries:,} entries written)"
+        )
+
+        listed = [
+            isbn
+            for (isbn,) in db.session.query(RelatedBook.book_id)
+            .filter(RelatedBook.rank == 0)
+            .limit(1000)
+        ]
+        queue = itertools.cycle(listed)
+        print_row(
+            "GET /<id>/related",
+            time_calls(
+                lambda: client.get(f"/api/books/{next(queue)}/related"), repeat=500
+            ),
+        )
+
+        baskets = itertools.cycle(
+            [listed[i : i + 3] for i in range(0, len(listed) - 3, 3)]
+        )
+
+        def new_order():
+            record_order(next(baskets))
+            db.session.commit()
+
+        print_row("record_order (3 books)", time_calls(new_order, repeat=200))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Read-replica routing check: runs the app against two SQLite files standing
+in for a primary and a replica (a backup of the primary that then falls
+behind a write) and checks which database each endpoint reads from - catalog,
+review and admin-stats GETs from the replica, X-Read-Primary and cart/order
+traffic from the primary - by the data returned and by statements per
+engine.
+Usage: python -m benchmarks.replica_routing [number_of_books]   (default 2000)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from benchmarks.common import print_header, seed_books
+from config import Config
+from database import READ_PRIMARY_HEADER
+
+ISBN = "9780000000000"
+# Seeded with stock, for the cart check
+IN_STOCK_ISBN = "9780000000001"
+
+
+def sync_replica(primary_path, replica_path):
+    """Bring the stand-in replica up to date with the primary"""
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    source.backup(target)
+    source.close()
+    target.close()
+
+
+@contextmanager
+def statements_by_engine(engines):
+    """Count SQL statements per engine name inside the block"""
+    from sqlalchemy import event
+
+    counts = dict.fromkeys(engines, 0)
+    listeners = []
+    for name, engine in engines.items():
+
+        def count(*args, name=name):
+            counts[name] += 1
+
+        event.listen(engine, "before_cursor_execute", count)
+        listeners.append((engine, count))
+    try:
+        yield counts
+    finally:
+        for engine, count in listeners:
+            event.remove(engine, "before_cursor_execute", count)
+
+
+def main():
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workdir = tempfile.mkdtemp(prefix="replica-check-")
+    primary_path = os.path.join(workdir, "primary.db")
+    replica_path = os.path.join(workdir, "replica.db")
+
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{primary_path}"
+    Config.SQLALCHEMY_BINDS = {"replica0": f"sqlite:///{replica_path}"}
+
+    from flask_jwt_extended import create_access_token
+    from benchmarks.common import create_bench_app, db
+    from models.book import Book
+    from models.user import User
+    from utils.catalog import bump_catalog_version
+
+    app = create_bench_app()
+    client = app.test_client()
+    print_header(f"READ-REPLICA ROUTING CHECK ({book_count:,} books)")
+
+    with app.app_context():
+        seed_books(book_count)
+        admin = User(name="Bench Admin", email="admin@example.com", password="x")
+        admin.user_type = "admin"
+        customer = User(name="Bench Customer", email="c@example.com", password="x")
+        db.session.add_all([admin, customer])
+        db.session.commit()
+        admin_headers = {
+            "Authorization": f"Bearer {create_access_token(identity=str(admin.user_id))}"
+        }
+        customer_headers = {
+            "Authorization": f"Bearer {create_access_token(identity=str(customer.user_id))}"
+        }
+        sync_replica(primary_path, replica_path)
+
+        # A write the replica hasn't caught up with yet
+        db.session.get(Book, ISBN).title = "Renamed On The Primary"
+        bump_catalog_version()
+        db.session.commit()
+        engines = {"primary": db.engines[None], "replica": db.engines["replica0"]}
+
+    failures = 0
+
+    def check(label, method, url, expect, headers=None, json=None, title=None):
+        nonlocal failures
+        with statements_by_engine(engines) as counts:
+            response = client.open(url, method=method, headers=headers, json=json)
+        used = {name for name, count in counts.items() if count}
+        ok = response.status_code < 400 and used == expect
+        if title is not None:
+            ok = ok and response.json["book"]["title"] == title
+        failures += not ok
+        print(
+            f"  {'✅' if ok else '❌'} {label:<38} {response.status_code}  "
+            f"primary {counts['primary']:>2}, replica {counts['replica']:>2}"
+        )
+
+    replica = sqlite3.connect(replica_path)
+    (old_title,) = replica.execute(
+        "SELECT title FROM Book_Details WHERE isbn = ?", (ISBN,)
+    ).fetchone()
+    replica.close()
+
+    check(
+        "GET book (stale replica copy)",
+        "GET",
+        f"/api/books/{ISBN}",
+        {"replica"},
+        title=old_title,
+    )
+    check(
+        f"GET book with {READ_PRIMARY_HEADER}",
+        "GET",
+        f"/api/books/{ISBN}",
+        {"primary"},
+        headers={READ_PRIMARY_HEADER: "1"},
+        title="Renamed On The Primary",
+    )
+    check("GET /api/books", "GET", "/api/books?sort=bestselling", {"replica"})
+    check("GET /api/books/filters", "GET", "/api/books/filters", {"replica"})
+    check(
+        "POST /api/books/batch",
+        "POST",
+        "/api/books/batch",
+        {"replica"},
+        json={"ids": [ISBN]},
+    )
+    check("GET /api/reviews/book/<id>", "GET", f"/api/reviews/book/{ISBN}", {"replica"})
+    check(
+        "GET /api/admin/stats",
+        "GET",
+        "/api/admin/stats",
+        {"replica"},
+        headers=admin_headers,
+    )
+    check(
+        "POST /api/cart/add",
+        "POST",
+        "/api/cart/add",
+        {"primary"},
+        headers=customer_headers,
+        json={"book_id": IN_STOCK_ISBN, "quantity": 1},
+    )
+    check("GET /api/cart", "GET", "/api/cart", {"primary"}, headers=customer_headers)
+    check(
+        "GET /api/admin/books",
+        "GET",
+        "/api/admin/books",
+        {"primary"},
+        headers=admin_headers,
+    )
+
+    sync_replica(primary_path, replica_path)
+    check(
+        "GET book after the replica caught up",
+        "GET",
+        f"/api/books/{ISBN}",
+        {"replica"},
+        title="Renamed On The Primary",
+    )
+
+    print(
+        f"\n{'✅ All routed as expected' if not failures else f'❌ {failures} failed'}"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
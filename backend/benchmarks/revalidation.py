@@ -0,0 +1,51 @@
+"""
+Public book endpoints: full response vs. conditional revalidation
+(If-None-Match -> 304, answered without touching the ORM).
+Usage: python -m benchmarks.revalidation [number_of_books]   (default 100000)
+"""
+
+import sys
+from benchmarks.common import (
+    count_queries,
+    create_bench_app,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+
+def main():
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    app = create_bench_app()
+    client = app.test_client()
+
+    print_header(f"REVALIDATION BENCHMARK ({book_count:,} books)")
+
+    with app.app_context():
+        seed_books(book_count)
+        isbn = client.get("/api/books").json["books"][0]["id"]
+
+        for label, url in (
+            ("listing", "/api/books"),
+            ("listing + facets", "/api/books?category=fantasy&facets=author,price"),
+            ("book detail", f"/api/books/{isbn}"),
+            ("book reviews", f"/api/reviews/book/{isbn}"),
+        ):
+            etag = client.get(url).headers["ETag"]
+            print_row(f"{label}: 200", time_calls(lambda: client.get(url)))
+
+            def revalidate():
+                return client.get(url, headers={"If-None-Match": etag})
+
+            with count_queries() as queries:
+                status = revalidate().status_code
+            print_row(
+                f"{label}: {status}",
+                time_calls(revalidate),
+                f"{queries['count']} queries",
+            )
+
+
+if __name__ == "__main__":
+    main()
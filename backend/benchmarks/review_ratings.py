@@ -0,0 +1,64 @@
+"""
+Catalog page latency vs. number of reviews per book.
+
+With rating/review_count read from the stored aggregates, a GET /api/books
+page should cost the same whether its books have 0 or 5,000 reviews each.
+Usage: python -m benchmarks.review_ratings
+"""
+
+from sqlalchemy import insert
+from benchmarks.common import (
+    count_queries,
+    create_bench_app,
+    db,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+PAGE_SIZE = 12
+REVIEW_DEPTHS = [0, 100, 1000, 5000]
+
+
+def main():
+    from models.book import Book
+    from models.review import Review
+
+    app = create_bench_app()
+    client = app.test_client()
+
+    print_header("CATALOG PAGE LATENCY VS REVIEWS PER BOOK")
+
+    with app.app_context():
+        seed_books(PAGE_SIZE)
+        isbns = [isbn for (isbn,) in db.session.query(Book.isbn).all()]
+
+        loaded = 0
+        for depth in REVIEW_DEPTHS:
+            # Top every book on the page up to `depth` reviews
+            extra = depth - loaded
+            if extra:
+                for isbn in isbns:
+                    db.session.execute(
+                        insert(Review),
+                        [
+                            {"user_id": 1, "book_id": isbn, "rating": 1 + n % 5}
+                            for n in range(extra)
+                        ],
+                    )
+                Book.reconcile_rating_totals()
+                db.session.commit()
+                loaded = depth
+
+            url = f"/api/books?per_page={PAGE_SIZE}"
+            with count_queries() as queries:
+                client.get(url)
+            stats = time_calls(lambda: client.get(url))
+            print_row(
+                f"{depth} reviews/book", stats, f"{queries['count']} queries"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Bestseller / trending leaderboards: GET /api/books?sort=bestselling and
+sort=trending (overall and within a category, first page and a cursor page)
+read off the sales counter indexes, against the on-demand
+SUM(quantity) GROUP BY book_id over Order_Item they replace, plus the cost
+of record_sales() per order.
+Usage: python -m benchmarks.sales [number_of_books] [order_lines]
+       (defaults 200000 and 1000000)
+"""
+
+import itertools
+import random
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import (
+    CATEGORIES,
+    create_bench_app,
+    db,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+from benchmarks.related import FIRST_ISBN, make_order_lines, seed_orders
+
+
+def main():
+    from sqlalchemy import func
+    from models.book import Book
+    from models.category import Category
+    from models.order import OrderItem
+    from utils.sales import reconcile_sales, record_sales
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    line_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    app = create_bench_app()
+    client = app.test_client()
+    rng = random.Random(3)
+
+    print_header(
+        f"SALES LEADERBOARD BENCHMARK ({book_count:,} books, "
+        f"{line_count:,} order lines)"
+    )
+
+    with app.app_context():
+        seed_books(book_count)
+        db.session.add_all(Category(name) for name in CATEGORIES)
+        order_ids, books = make_order_lines(line_count)
+        seed_orders(order_ids, books % book_count)
+        # Spread the orders over the last 60 days so trending has an effect
+        db.session.execute(
+            db.text(
+                "UPDATE Book_Order SET order_date = "
+                "datetime('now', '-' || (abs(random()) % 86400) || ' minutes')"
+            )
+        )
+        reconcile_sales()
+        db.session.commit()
+
+        slug = "science-fiction"
+        for label, url in (
+            ("bestselling", "/api/books?sort=bestselling"),
+            ("trending", "/api/books?sort=trending"),
+            ("bestselling in category", f"/api/books?sort=bestselling&category={slug}"),
+            ("trending in category", f"/api/books?sort=trending&category={slug}"),
+        ):
+            first = client.get(url + "&cursor=").json
+            cursor = first["pagination"]["next_cursor"]
+            print_row(label, time_calls(lambda: client.get(url), repeat=50))
+            print_row(
+                f"{label}, p2",
+                time_calls(lambda: client.get(f"{url}&cursor={cursor}"), repeat=50),
+            )
+
+        def group_by():
+            return (
+                db.session.query(OrderItem.book_id, func.sum(OrderItem.quantity))
+                .join(Book, Book.isbn == OrderItem.book_id)
+                .filter(Book.category_name == "Science Fiction")
+                .group_by(OrderItem.book_id)
+                .order_by(func.sum(OrderItem.quantity).desc())
+                .limit(12)
+                .all()
+            )
+
+        print_row("GROUP BY in category", time_calls(group_by, repeat=5))
+
+        now = datetime.utcnow()
+        lines = itertools.cycle(
+            [
+                [
+                    (
+                        str(FIRST_ISBN + rng.randrange(book_count)),
+                        rng.choice(CATEGORIES),
+                        rng.randint(1, 3),
+                    )
+                    for _ in range(3)
+                ]
+                for _ in range(100)
+            ]
+        )
+
+        def new_order():
+            record_sales(next(lines), now - timedelta(minutes=rng.randrange(600)))
+            db.session.commit()
+
+        print_row("record_sales (3 books)", time_calls(new_order, repeat=200))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Indexed BM25 search vs. the LIKE '%term%' fallback.
+
+Seeds a synthetic catalog, times GET /api/books?search=... through the LIKE
+path, builds the inverted index and times the same queries again.
+Usage: python -m benchmarks.search [number_of_books]   (default 500000)
+"""
+
+import sys
+import time
+from benchmarks.common import (
+    create_bench_app,
+    db,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+QUERIES = ["dragon", "silent garden", "crimson tower 4217", "author 12"]
+
+
+def main():
+    from utils import search as search_index
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    app = create_bench_app()
+    client = app.test_client()
+
+    print_header(f"SEARCH BENCHMARK ({book_count:,} books)")
+
+    with app.app_context():
+        start = time.perf_counter()
+        seed_books(book_count)
+        print(f"  Seeded catalog in {time.perf_counter() - start:.1f}s")
+
+        def run(label):
+            print(f"\n  {label}")
+            for text in QUERIES:
+                url = f"/api/books?search={text}&sort=relevance"
+                total = client.get(url).get_json()["pagination"]["total"]
+                stats = time_calls(lambda: client.get(url), repeat=20, warmup=1)
+                print_row(f"'{text}'", stats, f"{total} hits")
+
+        run("LIKE '%term%' scan")
+
+        start = time.perf_counter()
+        indexed = search_index.rebuild_index()
+        db.session.commit()
+        print(
+            f"\n  Built index for {indexed:,} books in "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+
+        run("Inverted index + BM25")
+
+
+if __name__ == "__main__":
+    main()
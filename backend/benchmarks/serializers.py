@@ -0,0 +1,306 @@
+"""
+Serialization throughput per model: compiled to_dict() vs. the previous
+hand-written, property-based implementation (kept here as the baseline).
+Objects are built in memory, so only serialization is measured.
+Usage: python -m benchmarks.serializers [sizes]   (default 1000,10000)
+"""
+
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from benchmarks.common import create_bench_app, print_header
+
+
+# --- Previous implementations (baseline) -----------------------------------
+
+
+def legacy_book(self):
+    return {
+        "id": self.isbn,
+        "title": self.title,
+        "author": self.author_name,
+        "description": self.description,
+        "price": float(self.price),
+        "originalPrice": float(self.price),
+        "stock": self.stock_quantity,
+        "rating": float(self.rating),
+        "reviews": self.review_count,
+        "image": self.image,
+        "isbn": self.isbn,
+        "publicationDate": (
+            self.publication_date.strftime("%Y-%m-%d")
+            if self.publication_date
+            else None
+        ),
+        "pages": self.pages,
+        "language": "English",
+        "isFeatured": False,
+        "isOnSale": self.is_on_sale,
+        "discountPercentage": self.discount_percentage,
+        "availabilityStatus": self.availability_status,
+        "isInStock": self.is_in_stock,
+        "category": self.category_name.lower().replace(" ", "-"),
+        "categoryName": self.category_name,
+        "createdAt": (
+            self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else ""
+        ),
+        "updatedAt": (
+            self.updated_at.strftime("%Y-%m-%d %H:%M:%S") if self.updated_at else ""
+        ),
+    }
+
+
+def legacy_book_simple(self):
+    return {
+        "id": self.isbn,
+        "title": self.title,
+        "author": self.author_name,
+        "price": float(self.price),
+        "image": self.image,
+        "stock": self.stock_quantity,
+    }
+
+
+def legacy_cart_item(self):
+    book_data = legacy_book_simple(self.book) if self.book else {}
+    return {
+        "id": self.book_id,
+        "book_id": self.book_id,
+        "title": book_data.get("title", ""),
+        "author": book_data.get("author", ""),
+        "price": book_data.get("price", 0),
+        "image": book_data.get("image", ""),
+        "quantity": self.quantity,
+        "totalPrice": float(self.total_price),
+        "totalOriginalPrice": float(self.total_original_price),
+        "savings": float(self.savings),
+        "stock": book_data.get("stock", 0),
+        "createdAt": (
+            self.date_added.strftime("%Y-%m-%d %H:%M:%S") if self.date_added else ""
+        ),
+        "updatedAt": (
+            self.date_added.strftime("%Y-%m-%d %H:%M:%S") if self.date_added else ""
+        ),
+    }
+
+
+def legacy_order_item(self):
+    book_data = legacy_book_simple(self.book) if self.book else {}
+    return {
+        "id": self.order_item_id,
+        "bookId": self.book_id,
+        "title": book_data.get("title", ""),
+        "author": book_data.get("author", ""),
+        "image": book_data.get("image", ""),
+        "quantity": self.quantity,
+        "pricePerItem": float(self.unit_price),
+        "totalPrice": float(self.total_price),
+        "createdAt": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def legacy_order(self):
+    if self.total_amount and self.total_amount > 0:
+        total_amount = float(self.total_amount)
+    else:
+        subtotal = (
+            sum(item.total_price for item in self.order_items)
+            if self.order_items
+            else Decimal("0.00")
+        )
+        tax_amount = subtotal * Decimal("0.08")
+        shipping_cost = Decimal("0.00") if subtotal >= 50 else Decimal("5.99")
+        total_amount = float(subtotal + tax_amount + shipping_cost)
+
+    subtotal = (
+        sum(item.total_price for item in self.order_items)
+        if self.order_items
+        else Decimal("0.00")
+    )
+    tax_amount = subtotal * Decimal("0.08")
+    shipping_cost = Decimal("0.00") if subtotal >= 50 else Decimal("5.99")
+
+    return {
+        "id": self.order_id,
+        "orderNumber": self.order_number,
+        "status": self.status,
+        "customer": {
+            "firstName": self.first_name,
+            "lastName": self.last_name,
+            "email": self.customer_email,
+            "phone": self.phone,
+            "fullName": self.customer_name,
+        },
+        "shipping": {
+            "address": self.shipping_address,
+            "city": self.city,
+            "postalCode": self.postal_code,
+            "fullAddress": self.shipping_address,
+        },
+        "payment": {"method": self.payment_method, "status": self.payment_status},
+        "totals": {
+            "subtotal": float(subtotal),
+            "taxAmount": float(tax_amount),
+            "shippingCost": float(shipping_cost),
+            "discountAmount": 0.00,
+            "totalAmount": total_amount,
+        },
+        "items": [legacy_order_item(item) for item in self.order_items],
+        "itemsCount": self.items_count,
+        "timestamps": {
+            "createdAt": self.order_date.strftime("%Y-%m-%d %H:%M:%S"),
+            "updatedAt": self.order_date.strftime("%Y-%m-%d %H:%M:%S"),
+            "shippedAt": None,
+            "deliveredAt": None,
+        },
+    }
+
+
+def legacy_user(self):
+    return {
+        "id": self.user_id,
+        "firstName": self.first_name,
+        "lastName": self.last_name,
+        "email": self.email,
+        "phone": self.phone,
+        "address": self.address,
+        "city": self.city,
+        "postalCode": "",
+        "joinedDate": self.registration_date.strftime("%Y-%m-%d"),
+        "avatar": self.get_avatar_url(),
+        "user_type": self.user_type,
+    }
+
+
+def legacy_review(self):
+    return {
+        "id": self.review_id,
+        "userId": self.user_id,
+        "bookId": self.book_id,
+        "rating": self.rating,
+        "comment": self.review_text,
+        "reviewDate": (
+            self.review_date.strftime("%Y-%m-%d %H:%M:%S") if self.review_date else ""
+        ),
+        "user": legacy_user(self.user) if self.user else None,
+    }
+
+
+# --- Fixtures ---------------------------------------------------------------
+
+
+def make_objects(count):
+    from models.book import Book
+    from models.cart import CartItem
+    from models.order import Order, OrderItem
+    from models.review import Review
+    from models.user import User
+
+    now = datetime(2024, 5, 6, 7, 8, 9)
+    books = [
+        Book(
+            isbn=f"{9780000000000 + i}",
+            title=f"Title {i}",
+            author_name=f"Author {i % 97}",
+            publisher_name=f"Publisher {i % 13}",
+            category_name="Science Fiction",
+            price=Decimal("12.99"),
+            publication_date=now.date(),
+            pages=300,
+            stock_quantity=i % 20,
+            description="A book " * 30,
+            image=f"https://example.com/{i}.jpg",
+            rating_sum=i % 50,
+            rating_count=i % 11,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+    users = [
+        User(
+            user_id=i,
+            name=f"First Last{i}",
+            email=f"u{i}@example.com",
+            password="x",
+            user_type="customer",
+            registration_date=now,
+        )
+        for i in range(count)
+    ]
+
+    cart_items = []
+    for i, book in enumerate(books):
+        item = CartItem(user_id=i, book_id=book.isbn, quantity=1 + i % 3)
+        item.book, item.date_added = book, now
+        cart_items.append(item)
+
+    reviews = []
+    for i, (book, user) in enumerate(zip(books, users)):
+        review = Review(i, book.isbn, 1 + i % 5, "ok")
+        review.review_id, review.user = i, user
+        reviews.append(review)
+
+    orders = []
+    for i in range(count):
+        order = Order(i, "First", "Last", "e@x.com", "1", "1 St", "City", "000")
+        order.order_id, order.order_date = i, now
+        order.total_amount = Decimal("40.00") if i % 2 else Decimal("0")
+        for book in books[i : i + 3]:
+            item = OrderItem(book.isbn, 2, book.price)
+            item.order_item_id, item.book = i, book
+            order.order_items.append(item)
+        orders.append(order)
+
+    return {
+        "Book": (books, legacy_book),
+        "CartItem": (cart_items, legacy_cart_item),
+        "Order": (orders, legacy_order),
+        "OrderItem": (orders[0].order_items * (count // 3 + 1), legacy_order_item),
+        "Review": (reviews, legacy_review),
+        "User": (users, legacy_user),
+    }
+
+
+def throughput(fn, objects, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for obj in objects:
+            fn(obj)
+        best = min(best, time.perf_counter() - start)
+    return len(objects) / best
+
+
+def main():
+    sizes = (
+        [int(size) for size in sys.argv[1].split(",")]
+        if len(sys.argv) > 1
+        else [1_000, 10_000]
+    )
+    app = create_bench_app()
+
+    with app.app_context():
+        for size in sizes:
+            print_header(f"SERIALIZER BENCHMARK ({size:,} objects per model)")
+            print(
+                f"  {'model':<12} {'legacy obj/s':>14} "
+                f"{'compiled obj/s':>16} {'speedup':>9}"
+            )
+            for model, (objects, legacy) in make_objects(size).items():
+                objects = objects[:size]
+                compiled = type(objects[0]).to_dict
+                assert legacy(objects[1]).keys() == compiled(objects[1]).keys()
+
+                before = throughput(legacy, objects)
+                after = throughput(compiled, objects)
+                print(
+                    f"  {model:<12} {before:>14,.0f} {after:>16,.0f} "
+                    f"{after / before:>8.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
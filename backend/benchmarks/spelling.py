@@ -0,0 +1,114 @@
+"""
+Typo-tolerant search: memory footprint and build time of the trigram
+spelling index, correction latency for misspelt words, and
+GET /api/books?search= for misspelt vs. correctly spelt queries.
+Usage: python -m benchmarks.spelling [number_of_books]   (default 200000)
+"""
+
+import itertools
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import (
+    create_bench_app,
+    db,
+    make_book_rows,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+
+def misspell(word, rng):
+    """Delete, transpose or replace one letter"""
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(("delete", "transpose", "replace"))
+    if edit == "delete":
+        return word[:i] + word[i + 1 :]
+    if edit == "transpose":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+    return word[:i] + rng.choice("aeioustr") + word[i + 1 :]
+
+
+def main():
+    from utils.search import rebuild_index
+    from utils.spelling import SpellingIndex
+    from utils.suggest import get_spelling
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    app = create_bench_app()
+    client = app.test_client()
+    rng = random.Random(7)
+
+    print_header(f"SPELLING BENCHMARK ({book_count:,} books)")
+
+    def build():
+        index = SpellingIndex()
+        for row in rows:
+            index.add_text(row["title"], row["author_name"])
+        return index
+
+    rows = make_book_rows(book_count)
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    # Traced separately; tracing slows the build down several times over
+    tracemalloc.start()
+    standalone = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"  index: {len(standalone):,} words, "
+        f"{len(standalone.postings):,} trigram buckets, "
+        f"{size / 2**20:.1f} MiB, built in {elapsed:.1f} s"
+    )
+    del rows, standalone
+
+    with app.app_context():
+        seed_books(book_count)
+        rebuild_index()
+        db.session.commit()
+
+        spelling = get_spelling()
+        words = sorted(word for word in spelling.counts if len(word) >= 5)
+        pairs = [(misspell(word, rng), word) for word in rng.sample(words, 500)]
+        pairs = [(typo, word) for typo, word in pairs if typo not in spelling.counts]
+        typos = [typo for typo, _ in pairs]
+        fixed = sum(spelling.correct(typo) == word for typo, word in pairs)
+        print(f"  typos corrected to the intended word: {fixed}/{len(pairs)}")
+
+        queue = itertools.cycle(typos)
+        print_row(
+            "correct(word)", time_calls(lambda: spelling.correct(next(queue)), 500)
+        )
+
+        hits = {
+            typo: len(client.get(f"/api/books?search={typo}").json["books"])
+            for typo in typos[:20]
+        }
+        print(
+            f"  misspelt queries with results: "
+            f"{sum(1 for n in hits.values() if n)}/{len(hits)}"
+        )
+
+        queue = itertools.cycle(typos)
+        print_row(
+            "search, misspelt",
+            time_calls(
+                lambda: client.get(f"/api/books?search={next(queue)}"), repeat=20
+            ),
+        )
+        queue = itertools.cycle(rng.sample(words, 50))
+        print_row(
+            "search, spelt correctly",
+            time_calls(
+                lambda: client.get(f"/api/books?search={next(queue)}"), repeat=20
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+GET /api/books/suggest typeahead: index build time, lookup latency by prefix
+length (in-process and through the endpoint), incremental update cost, and
+GET /api/books?search= for the same prefixes as the baseline.
+Usage: python -m benchmarks.suggest [number_of_books]   (default 1000000)
+"""
+
+import itertools
+import random
+import sys
+import time
+
+from benchmarks.common import (
+    create_bench_app,
+    db,
+    print_header,
+    print_row,
+    seed_books,
+    time_calls,
+)
+
+PREFIX_LENGTHS = (1, 2, 3, 5, 8)
+
+
+def main():
+    from models.book import Book
+    from utils.suggest import get_index
+
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app = create_bench_app()
+    client = app.test_client()
+    rng = random.Random(42)
+
+    print_header(f"SUGGEST BENCHMARK ({book_count:,} books)")
+
+    with app.app_context():
+        seed_books(book_count)
+        # Skewed review counts so ranking by popularity has something to do
+        db.session.execute(
+            db.text("UPDATE Book_Details SET rating_count = abs(random()) % 1000")
+        )
+        db.session.commit()
+
+        start = time.perf_counter()
+        index = get_index()
+        print(
+            f"  index build: {time.perf_counter() - start:.1f} s, "
+            f"{len(index):,} entries, {len(index.tops):,} precomputed prefixes"
+        )
+
+        sample = [entry.key for entry in rng.sample(index.entries, 1000)]
+        for length in PREFIX_LENGTHS:
+            prefixes = itertools.cycle([key[:length] for key in sample])
+            print_row(
+                f"prefix {length}: index lookup",
+                time_calls(lambda: index.suggest(next(prefixes)), repeat=1000),
+            )
+            print_row(
+                f"prefix {length}: endpoint",
+                time_calls(
+                    lambda: client.get(f"/api/books/suggest?q={next(prefixes)}"),
+                    repeat=500,
+                ),
+            )
+
+        baseline = itertools.cycle([key[:3] for key in sample])
+        print_row(
+            "prefix 3: /api/books?search=",
+            time_calls(
+                lambda: client.get(f"/api/books?search={next(baseline)}"), repeat=5
+            ),
+        )
+
+        books = itertools.cycle(
+            db.session.query(
+                Book.isbn, Book.title, Book.author_name, Book.publisher_name
+            ).limit(1000)
+        )
+        print_row(
+            "incremental upsert",
+            time_calls(
+                lambda: index.upsert_book(*next(books), rng.randrange(2000)),
+                repeat=500,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Related Books Build Script
+Recomputes the "customers also bought" lists (Co_Purchase / Related_Book)
+from every order placed so far. Run it once to enable the lists, then
+nightly to fold in the score drift that incremental updates leave behind.
+Uses NumPy/SciPy when installed (see requirements.txt), plain Python otherwise.
+Usage: python build_related.py
+"""
+
+import time
+from app import create_app
+from database import db
+from utils.catalog import bump_catalog_version
+from utils import related
+
+
+def main():
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "=" * 60)
+        print("BUILDING RELATED BOOKS")
+        print("=" * 60)
+        if related.np is None:
+            print("\n⚠️  NumPy/SciPy not installed - using the slower Python build")
+
+        start = time.perf_counter()
+        pairs, entries = related.build_related()
+        # Related lists are served under the inventory version
+        bump_catalog_version("inventory")
+        db.session.commit()
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"\n✅ {pairs} co-purchase pair(s), {entries} related entries "
+            f"in {elapsed:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,16 @@ class Config:
 
     # SQLAlchemy configuration - NOW USING MYSQL
     SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+    # Read replicas (comma-separated URIs, optional): catalog and review GETs
+    # read from them, everything else uses the primary above (see database.py)
+    SQLALCHEMY_REPLICA_URIS = [
+        uri.strip()
+        for uri in os.environ.get("DATABASE_REPLICA_URIS", "").split(",")
+        if uri.strip()
+    ]
+    SQLALCHEMY_BINDS = {
+        f"replica{index}": uri for index, uri in enumerate(SQLALCHEMY_REPLICA_URIS)
+    }
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {
         "pool_pre_ping": True,
@@ -43,12 +53,44 @@ class Config:
     # Pagination
     POSTS_PER_PAGE = 12
 
-    # File upload configuration (for future book cover uploads)
+    # Response compression (utils/compression.py): bodies below the minimum
+    # size are sent uncompressed; ETagged responses' compressed bodies are
+    # cached per process up to the cache size
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_CACHE_SIZE = 32 * 1024 * 1024
+
+    # In-process columnar copy of the catalog that answers GET /api/books
+    # filters, sorts and pages without querying (utils/columnar.py, needs NumPy)
+    COLUMNAR_CATALOG = os.environ.get("COLUMNAR_CATALOG", "").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    # Shared snapshot of that catalog, written by write_catalog_snapshot.py
+    # and mapped by every worker (utils/catalog_snapshot.py)
+    COLUMNAR_SNAPSHOT_PATH = os.environ.get("COLUMNAR_SNAPSHOT_PATH") or None
+
+    # Largest upload accepted by the bulk catalog import, which streams its
+    # body instead of buffering it (so MAX_CONTENT_LENGTH doesn't apply)
+    IMPORT_MAX_SIZE = 1024 * 1024 * 1024
+
+    # File upload configuration (book cover uploads, utils/covers.py)
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(
         os.path.dirname(os.path.abspath(__file__)), "static", "uploads"
     )
     ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
+    # Where cover renditions are served from (a CDN in front of it, say)
+    COVER_URL_PREFIX = os.environ.get("COVER_URL_PREFIX", "/api/covers")
+    # Threads resizing uploaded covers, per worker process
+    COVER_WORKERS = int(os.environ.get("COVER_WORKERS", 2))
+    # Hand cover files to the front-end server (X-Sendfile) instead of
+    # sending them from Python
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
 
 
 class DevelopmentConfig(Config):
@@ -74,6 +116,7 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"  # In-memory database for testing
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # SQLite pools reject the MySQL pool settings
     WTF_CSRF_ENABLED = False
 
 
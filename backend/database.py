@@ -1,3 +1,85 @@
+"""The SQLAlchemy instance, with reads routed to read replicas on request.
+
+Replicas are configured as SQLALCHEMY_BINDS named replica<N> (see
+config.py). A request that calls use_replica(), which the catalog and
+review blueprints do for their GET handlers, has its SELECTs sent to one of
+them, picked at random per request. Flushes, INSERT/UPDATE/DELETE and
+SELECT ... FOR UPDATE still go to the primary, and requests that never opt
+in (cart, orders, auth, admin writes) read and write only the primary, so
+they always see their own writes.
+
+Replicas lag the primary a little. A client that has just written and must
+read the result back sends READ_PRIMARY_HEADER; server code that needs
+fresh data calls use_primary().
+"""
+
+import random
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND_PREFIX = "replica"
+
+# Request header that keeps a request's reads on the primary
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+
+def _replica_keys():
+    binds = current_app.config.get("SQLALCHEMY_BINDS") or {}
+    return [key for key in binds if key.startswith(REPLICA_BIND_PREFIX)]
+
+
+def use_replica():
+    """Send the current request's reads to a replica, if any are configured
+    and the client didn't ask for the primary"""
+    keys = _replica_keys()
+    if not keys or request.headers.get(READ_PRIMARY_HEADER):
+        return
+    if g.get("db_replica") is None:
+        g.db_replica = random.choice(keys)
+
+
+def use_primary():
+    """Read from the primary for the rest of the current request"""
+    g.pop("db_replica", None)
+
+
+def read_source():
+    """Bind key of the replica this request reads from, None for the primary"""
+    if not has_request_context():
+        return None
+    return g.get("db_replica")
+
+
+def replica_reads(f):
+    """Decorator: the view's reads go to a replica (see use_replica)"""
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        use_replica()
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+def _is_write(clause):
+    return clause is not None and (
+        getattr(clause, "is_dml", False)
+        or getattr(clause, "_for_update_arg", None) is not None
+    )
+
+
+class RoutingSession(Session):
+    """Session that sends plain reads to the request's replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not _is_write(clause):
+            replica = read_source()
+            if replica is not None:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy(session_options={"class_": RoutingSession})
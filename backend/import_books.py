@@ -0,0 +1,105 @@
+"""
+Bulk Catalog Import Script
+Creates or updates books from a supplier catalog file in CSV or NDJSON
+(.gz files are decompressed on the fly), one multi-row upsert per batch.
+Rows that fail validation are reported and skipped; if the import stops
+part way, rerun it with --resume <job id> to continue from the last
+committed batch.
+Usage: python import_books.py <file> [--format csv|ndjson] [--resume JOB_ID]
+                              [--batch-size N]
+"""
+
+import argparse
+import os
+import time
+from app import create_app
+from utils.catalog_import import (
+    BATCH_SIZE,
+    FORMATS,
+    InvalidImport,
+    import_books,
+    start_job,
+    text_stream,
+)
+
+
+def guess_format(path):
+    """Format from the file extension (books.csv.gz -> csv)"""
+    name = path[:-3] if path.endswith(".gz") else path
+    extension = os.path.splitext(name)[1].lstrip(".").lower()
+    return "ndjson" if extension in ("json", "jsonl") else extension
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import books")
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=list(FORMATS))
+    parser.add_argument("--resume", type=int, metavar="JOB_ID")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "=" * 60)
+        print("IMPORTING BOOKS")
+        print("=" * 60)
+
+        try:
+            job = start_job(
+                args.format or guess_format(args.file),
+                os.path.basename(args.file),
+                args.resume,
+            )
+        except InvalidImport as e:
+            print(f"\n❌ {e}")
+            return 1
+
+        if args.resume:
+            print(f"\n⏩ Resuming job {job.job_id} after row {job.rows_done:,}")
+        else:
+            print(f"\n📋 Import job {job.job_id}")
+
+        start = time.perf_counter()
+        first_row = job.rows_done
+
+        def progress(job):
+            rate = (job.rows_done - first_row) / (time.perf_counter() - start)
+            print(
+                f"  📦 {job.rows_done:,} rows: {job.imported:,} imported, "
+                f"{job.failed:,} rejected ({rate:,.0f} rows/s)"
+            )
+
+        try:
+            with open(args.file, "rb") as source:
+                import_books(
+                    text_stream(source, args.file.endswith(".gz")),
+                    job,
+                    batch_size=args.batch_size,
+                    progress=progress,
+                )
+        except Exception as e:
+            print(f"\n❌ Import failed after row {job.rows_done:,}: {e}")
+            print(
+                f"   Fix the problem and rerun with --resume {job.job_id} "
+                "to continue"
+            )
+            return 1
+
+        for error in job.errors.limit(20):
+            print(f"  ⚠️  line {error.line} ({error.isbn or 'no ISBN'}): {error.error}")
+        if job.failed > 20:
+            print(
+                f"  ... and {job.failed - 20:,} more (GET /api/admin/books/import/{job.job_id})"
+            )
+
+        print(
+            f"\n✅ Imported {job.imported:,} book(s), rejected {job.failed:,} row(s), "
+            f"{job.categories_created} new categories, in "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
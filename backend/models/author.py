@@ -0,0 +1,30 @@
+from database import db
+
+
+class Author(db.Model):
+    __tablename__ = "Author"  # Matches your DDL
+
+    author_name = db.Column(db.String(255), primary_key=True)
+    biography = db.Column(db.Text, nullable=True)
+    nationality = db.Column(db.String(100), nullable=True)
+    # Books carrying this author_name, maintained by the book writes (see
+    # utils/book_counts.py) so author lists never scan Book_Details
+    book_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0", index=True
+    )
+
+    @property
+    def name(self):
+        return self.author_name
+
+    def to_dict(self):
+        """Convert author object to dictionary"""
+        return {
+            "author_name": self.author_name,
+            "biography": self.biography,
+            "nationality": self.nationality,
+            "book_count": self.book_count or 0,
+        }
+
+    def __repr__(self):
+        return f"<Author {self.author_name}>"
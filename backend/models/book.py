@@ -1,6 +1,18 @@
 from database import db
 from datetime import datetime
-from sqlalchemy import Numeric
+from sqlalchemy import Numeric, update
+from sqlalchemy.orm import query_expression
+
+from utils.catalog import slug_for_category
+from utils.covers import cover_url
+from utils.sales import current_trend
+from utils.serializers import Attr, Const, DateTime, Expr, Float, Schema
+
+# Characters of the description served as a book's "summary"
+SUMMARY_LENGTH = 200
+
+# Keys of to_dict_simple() (cart and order lines)
+SIMPLE_FIELDS = ("id", "title", "author", "price", "image@thumbnail", "stock")
 
 
 class Book(db.Model):
@@ -9,14 +21,54 @@ class Book(db.Model):
     isbn = db.Column(db.String(13), primary_key=True)
     title = db.Column(db.String(255), nullable=False, index=True)
     author_name = db.Column(db.String(255), nullable=False, index=True)
-    publisher_name = db.Column(db.String(255), nullable=False)
-    category_name = db.Column(db.String(255), nullable=False)
-    price = db.Column(Numeric(10, 2), nullable=False)
+    publisher_name = db.Column(db.String(255), nullable=False, index=True)
+    category_name = db.Column(db.String(255), nullable=False, index=True)
+    price = db.Column(Numeric(10, 2), nullable=False, index=True)
     publication_date = db.Column(db.Date, nullable=True)
     pages = db.Column(db.Integer, nullable=True)
     stock_quantity = db.Column(db.Integer, nullable=False)
     description = db.Column(db.Text, nullable=True)
     image = db.Column(db.String(255), nullable=True)
+    # Content digest of an uploaded cover (utils/covers.py); its renditions
+    # replace the external image URL in payloads
+    cover = db.Column(db.String(32), nullable=True)
+
+    # Denormalized review aggregates, maintained by the review routes so the
+    # catalog never has to load Review rows just to show a rating
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # Sales counters, maintained by the order routes (see utils/sales.py);
+    # the bestseller and trending listings read them through these indexes
+    units_sold = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0", index=True
+    )
+    trend_score = db.Column(
+        db.Double, nullable=False, default=0.0, server_default="0", index=True
+    )
+
+    # Row timestamps; updated_at moves on every write to the book, including
+    # stock and rating changes, so it can drive caching and incremental export
+    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=True,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        index=True,
+    )
+
+    __table_args__ = (
+        # Bestsellers / trending within one category
+        db.Index("ix_Book_Details_category_units_sold", "category_name", "units_sold"),
+        db.Index(
+            "ix_Book_Details_category_trend_score", "category_name", "trend_score"
+        ),
+    )
+
+    # First SUMMARY_LENGTH characters of the description, filled in by the SQL
+    # query when a projection asks for it (see utils/projection.py)
+    summary = query_expression()
 
     # Foreign Keys
     # Note: Your DDL has foreign keys, but we'll handle them as strings for now
@@ -54,15 +106,15 @@ class Book(db.Model):
 
     @property
     def rating(self):
-        """Calculate average rating from reviews"""
-        if self.reviews:
-            return sum(r.rating for r in self.reviews) / len(self.reviews)
+        """Average rating from the stored review aggregates"""
+        if self.rating_count:
+            return self.rating_sum / self.rating_count
         return 0.0
 
     @property
     def review_count(self):
         """Count of reviews"""
-        return len(self.reviews) if self.reviews else 0
+        return self.rating_count or 0
 
     @property
     def is_on_sale(self):
@@ -93,14 +145,6 @@ class Book(db.Model):
     def is_active(self):
         return True  # All books active by default
 
-    @property
-    def created_at(self):
-        return self.publication_date or datetime.utcnow()
-
-    @property
-    def updated_at(self):
-        return self.publication_date or datetime.utcnow()
-
     def update_stock(self, quantity):
         """Update stock quantity"""
         if self.stock_quantity + quantity >= 0:
@@ -108,56 +152,163 @@ class Book(db.Model):
             return True
         return False
 
-    def to_dict(self):
-        """Convert book object to dictionary"""
-        return {
-            "id": self.isbn,
-            "title": self.title,
-            "author": self.author_name,
-            "description": self.description,
-            "price": float(self.price),
-            "originalPrice": float(self.price),
-            "stock": self.stock_quantity,
-            "rating": float(self.rating),
-            "reviews": self.review_count,
-            "image": self.image,
-            "isbn": self.isbn,
-            "publicationDate": (
-                self.publication_date.strftime("%Y-%m-%d")
-                if self.publication_date
-                else None
+    @classmethod
+    def adjust_rating_totals(cls, isbn, sum_delta, count_delta=0):
+        """Apply a review write to the stored rating aggregates.
+
+        Issued as a single UPDATE ... SET col = col + delta inside the
+        caller's transaction, so concurrent review writes can't lose updates.
+        """
+        db.session.execute(
+            update(cls)
+            .where(cls.isbn == isbn)
+            .values(
+                rating_sum=cls.rating_sum + sum_delta,
+                rating_count=cls.rating_count + count_delta,
+            )
+        )
+
+    @classmethod
+    def reconcile_rating_totals(cls):
+        """Recompute rating aggregates for every book from the Review table.
+
+        Returns the number of books whose stored totals had drifted.
+        """
+        from models.review import Review
+
+        review_sum = (
+            db.select(db.func.coalesce(db.func.sum(Review.rating), 0))
+            .where(Review.book_id == cls.isbn)
+            .scalar_subquery()
+        )
+        review_count = (
+            db.select(db.func.count(Review.review_id))
+            .where(Review.book_id == cls.isbn)
+            .scalar_subquery()
+        )
+
+        is_drifted = db.or_(
+            cls.rating_sum != review_sum, cls.rating_count != review_count
+        )
+        drifted = cls.query.filter(is_drifted).with_entities(cls.isbn).count()
+
+        # Only rewrite drifted rows so untouched books keep their updated_at
+        db.session.execute(
+            update(cls)
+            .where(is_drifted)
+            .values(rating_sum=review_sum, rating_count=review_count),
+            execution_options={"synchronize_session": False},
+        )
+        return drifted
+
+    # Payload keys and how each is computed; to_dict() compiles one function
+    # per requested key set, and utils/projection.py defers the columns that
+    # the requested keys don't read
+    SERIALIZER = Schema(
+        "book",
+        {
+            "id": Attr("isbn"),
+            "title": Attr("title"),
+            "author": Attr("author_name"),
+            "publisher": Attr("publisher_name"),
+            "description": Attr("description"),
+            "summary": Expr("obj.summary_text", columns=()),
+            "price": Float("price"),
+            "originalPrice": Float("price"),
+            "stock": Attr("stock_quantity"),
+            "rating": Expr(
+                "({rating_sum} / {rating_count} if {rating_count} else 0.0)"
             ),
-            "pages": self.pages,
-            "language": "English",
-            "isFeatured": False,
-            "isOnSale": self.is_on_sale,
-            "discountPercentage": self.discount_percentage,
-            "availabilityStatus": self.availability_status,
-            "isInStock": self.is_in_stock,
-            "category": self.category_name.lower().replace(" ", "-"),
-            "categoryName": self.category_name,
-            "createdAt": (
-                self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else ""
+            "reviews": Expr("({rating_count} or 0)"),
+            # Cover sized for the payload: book page by default, "image@card"
+            # for grid cards, "image@thumbnail" for cart and order lines
+            "image": Expr("cover_url({cover}, {image}, 'detail')", cover_url=cover_url),
+            "image@card": Expr(
+                "cover_url({cover}, {image}, 'card')", cover_url=cover_url
             ),
-            "updatedAt": (
-                self.updated_at.strftime("%Y-%m-%d %H:%M:%S") if self.updated_at else ""
+            "image@thumbnail": Expr(
+                "cover_url({cover}, {image}, 'thumbnail')", cover_url=cover_url
             ),
-        }
+            "isbn": Attr("isbn"),
+            "publicationDate": DateTime("publication_date", "%Y-%m-%d", default=None),
+            "pages": Attr("pages"),
+            "language": Const("English"),
+            "isFeatured": Const(False),
+            # No sale prices in the DDL (see is_on_sale / discount_percentage)
+            "isOnSale": Const(False),
+            "discountPercentage": Const(0),
+            "availabilityStatus": Expr(
+                '("In Stock" if {stock_quantity} > 10 '
+                'else "Limited Stock" if {stock_quantity} > 0 '
+                'else "Out of Stock")'
+            ),
+            "isInStock": Expr("{stock_quantity} > 0"),
+            "category": Expr(
+                "slug_for_category({category_name})",
+                slug_for_category=slug_for_category,
+            ),
+            "categoryName": Attr("category_name"),
+            "createdAt": DateTime("created_at"),
+            "updatedAt": DateTime("updated_at"),
+            "unitsSold": Attr("units_sold"),
+            # Recent sales, each counting less the longer ago it was
+            "trending": Expr(
+                "round(current_trend({trend_score}), 2)", current_trend=current_trend
+            ),
+        },
+        # What to_dict() returns when no fields are given
+        default=(
+            "id",
+            "title",
+            "author",
+            "description",
+            "price",
+            "originalPrice",
+            "stock",
+            "rating",
+            "reviews",
+            "image",
+            "isbn",
+            "publicationDate",
+            "pages",
+            "language",
+            "isFeatured",
+            "isOnSale",
+            "discountPercentage",
+            "availabilityStatus",
+            "isInStock",
+            "category",
+            "categoryName",
+            "createdAt",
+            "updatedAt",
+        ),
+    )
+
+    @property
+    def summary_text(self):
+        """Short description, from the SQL-side summary when it was loaded"""
+        if self.summary is not None:
+            return self.summary
+        return (self.description or "")[:SUMMARY_LENGTH]
+
+    def to_dict(self, fields=None):
+        """Convert book object to dictionary (optionally only some keys)"""
+        return self.SERIALIZER.serializer(fields)(self)
 
     def to_dict_simple(self):
         """Convert book object to simple dictionary (for cart items)"""
-        return {
-            "id": self.isbn,
-            "title": self.title,
-            "author": self.author_name,
-            "price": float(self.price),
-            "image": self.image,
-            "stock": self.stock_quantity,
-        }
+        return self.SERIALIZER.serializer(SIMPLE_FIELDS)(self)
 
     @classmethod
     def search(cls, query):
-        """Search books by title or author"""
+        """Search books through the full-text index (LIKE until it's built),
+        tolerating misspelt words"""
+        from utils.search import is_index_ready, search_books_fuzzy
+
+        if is_index_ready():
+            ranked, _ = search_books_fuzzy(query)
+            return cls.query.filter(cls.isbn.in_([isbn for isbn, _ in ranked]))
+
         return cls.query.filter(
             db.or_(cls.title.contains(query), cls.author_name.contains(query))
         )
@@ -1,9 +1,16 @@
 from database import db
 from datetime import datetime
+from sqlalchemy.orm import joinedload
+from utils.covers import cover_url
+from utils.serializers import Attr, Const, DateTime, Expr, Schema
 
 
 class CartItem(db.Model):
     __tablename__ = "Cart"  # Matches your DDL
+    __table_args__ = (
+        # One line per book per user; add_quantity() upserts against it
+        db.UniqueConstraint("user_id", "book_id", name="uq_Cart_user_book"),
+    )
 
     cart_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey("User.user_id"), nullable=False)
@@ -39,8 +46,8 @@ class CartItem(db.Model):
     @property
     def total_original_price(self):
         """Calculate total original price for this cart item"""
-        original_price = self.book.price
-        return original_price * self.quantity if self.book else 0
+        # Original price == price (no sale prices in the DDL)
+        return self.total_price
 
     @property
     def savings(self):
@@ -68,46 +75,149 @@ class CartItem(db.Model):
         """Decrease quantity by specified amount"""
         return self.update_quantity(self.quantity - amount)
 
+    SERIALIZER = Schema(
+        "cart_item",
+        {
+            "id": Attr("book_id"),  # Using book_id as id for frontend compatibility
+            "book_id": Attr("book_id"),
+            "title": Expr("({book}.title if {book} is not None else '')"),
+            "author": Expr("({book}.author_name if {book} is not None else '')"),
+            "price": Expr("(float({book}.price) if {book} is not None else 0)"),
+            "image": Expr(
+                "(cover_url({book}.cover, {book}.image, 'thumbnail')"
+                " if {book} is not None else '')",
+                cover_url=cover_url,
+            ),
+            "quantity": Attr("quantity"),
+            "totalPrice": Expr(
+                "(float({book}.price * {quantity}) if {book} is not None else 0.0)"
+            ),
+            # Original price == price (no sale prices in the DDL)
+            "totalOriginalPrice": Expr(
+                "(float({book}.price * {quantity}) if {book} is not None else 0.0)"
+            ),
+            "savings": Const(0.0),
+            "stock": Expr("({book}.stock_quantity if {book} is not None else 0)"),
+            "createdAt": DateTime("date_added"),
+            "updatedAt": DateTime("date_added"),
+        },
+    )
+
     def to_dict(self):
         """Convert cart item to dictionary"""
-        book_data = self.book.to_dict_simple() if self.book else {}
+        return self.SERIALIZER.serializer()(self)
 
-        return {
-            "id": self.book_id,  # Using book_id as id for frontend compatibility
-            "book_id": self.book_id,
-            "title": book_data.get("title", ""),
-            "author": book_data.get("author", ""),
-            "price": book_data.get("price", 0),
-            "image": book_data.get("image", ""),
-            "quantity": self.quantity,
-            "totalPrice": float(self.total_price),
-            "totalOriginalPrice": float(self.total_original_price),
-            "savings": float(self.savings),
-            "stock": book_data.get("stock", 0),
-            "createdAt": (
-                self.date_added.strftime("%Y-%m-%d %H:%M:%S") if self.date_added else ""
-            ),
-            "updatedAt": (
-                self.date_added.strftime("%Y-%m-%d %H:%M:%S") if self.date_added else ""
-            ),
-        }
+    @classmethod
+    def add_quantity(cls, user_id, book_id, quantity):
+        """Add quantity copies of a book to the user's cart in one statement:
+        INSERT ... SELECT ... ON DUPLICATE KEY UPDATE on MySQL, ON CONFLICT
+        DO UPDATE elsewhere (caller commits).
+
+        The SELECT reads the book, so nothing is written when the book does
+        not exist or the line would end up above its stock. Returns whether
+        the line was written.
+        """
+        from models.book import Book
+
+        dialect_name = db.session.get_bind().dialect.name
+        if dialect_name == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        in_cart = (
+            db.select(cls.quantity)
+            .where(cls.user_id == user_id, cls.book_id == book_id)
+            .scalar_subquery()
+        )
+        source = db.select(
+            db.literal(user_id),
+            Book.isbn,
+            db.literal(quantity),
+            db.literal(datetime.utcnow()),
+        ).where(
+            Book.isbn == book_id,
+            Book.stock_quantity >= db.func.coalesce(in_cart, 0) + quantity,
+        )
+        statement = insert(cls).from_select(
+            ["user_id", "book_id", "quantity", "date_added"], source
+        )
+        if dialect_name == "mysql":
+            statement = statement.on_duplicate_key_update(
+                quantity=cls.quantity + quantity
+            )
+        else:
+            statement = statement.on_conflict_do_update(
+                index_elements=["user_id", "book_id"],
+                set_={"quantity": cls.quantity + quantity},
+            )
+        return db.session.execute(statement).rowcount > 0
+
+    @classmethod
+    def set_quantity(cls, user_id, book_id, quantity):
+        """Set the quantity of a line already in the user's cart in one
+        guarded UPDATE (caller commits).
+
+        Nothing is written when there is no such line or quantity is above
+        the book's stock. Returns whether the line was written.
+        """
+        from models.book import Book
+
+        stock = (
+            db.select(Book.stock_quantity).where(Book.isbn == book_id).scalar_subquery()
+        )
+        statement = (
+            db.update(cls)
+            .where(
+                cls.user_id == user_id,
+                cls.book_id == book_id,
+                db.literal(quantity) <= stock,
+            )
+            .values(quantity=quantity)
+            .execution_options(synchronize_session=False)
+        )
+        return db.session.execute(statement).rowcount > 0
+
+    @classmethod
+    def merge_duplicates(cls):
+        """Fold lines repeating a (user, book) pair into the oldest one,
+        summing their quantities. Returns the number of lines removed."""
+        duplicates = (
+            db.session.query(
+                cls.user_id,
+                cls.book_id,
+                db.func.min(cls.cart_id),
+                db.func.sum(cls.quantity),
+            )
+            .group_by(cls.user_id, cls.book_id)
+            .having(db.func.count() > 1)
+            .all()
+        )
+        removed = 0
+        for user_id, book_id, keep, quantity in duplicates:
+            line = cls.query.filter_by(user_id=user_id, book_id=book_id)
+            line.filter(cls.cart_id == keep).update(
+                {"quantity": quantity}, synchronize_session=False
+            )
+            removed += line.filter(cls.cart_id != keep).delete(
+                synchronize_session=False
+            )
+        return removed
 
     @classmethod
     def get_user_cart(cls, user_id):
         """Get all cart items for a user"""
-        return cls.query.filter_by(user_id=user_id).all()
+        return CartView.load(user_id).items
 
     @classmethod
     def get_cart_total(cls, user_id):
         """Get total price of user's cart"""
-        cart_items = cls.get_user_cart(user_id)
-        return sum(item.total_price for item in cart_items)
+        return CartView.load(user_id).total_price
 
     @classmethod
     def get_cart_items_count(cls, user_id):
         """Get total number of items in user's cart"""
-        cart_items = cls.get_user_cart(user_id)
-        return sum(item.quantity for item in cart_items)
+        return CartView.load(user_id).item_count
 
     @classmethod
     def clear_user_cart(cls, user_id):
@@ -117,3 +227,69 @@ class CartItem(db.Model):
 
     def __repr__(self):
         return f"<CartItem User:{self.user_id} Book:{self.book_id} Qty:{self.quantity}>"
+
+
+# Book columns a cart line reads: its payload, stock checks and checkout
+CART_BOOK_COLUMNS = (
+    "isbn",
+    "title",
+    "author_name",
+    "category_name",
+    "price",
+    "stock_quantity",
+    "image",
+    "cover",
+)
+
+
+class CartView:
+    """A user's cart, read in one query that joins each line to its book,
+    with the line and cart totals computed once.
+
+    Every cart read goes through load(), so serializing or totalling the
+    lines never lazy-loads a book per line.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.item_count = sum(item.quantity for item in items)
+        self.total_price = sum(item.total_price for item in items)
+
+    @classmethod
+    def load(cls, user_id, lock=False, book_ids=None):
+        """The user's cart, or only its lines for book_ids; lock=True takes
+        row locks on the lines and their books (SELECT ... FOR UPDATE) for
+        checkout"""
+        from models.book import Book
+
+        query = CartItem.query.filter_by(user_id=user_id)
+        if book_ids is not None:
+            query = query.filter(CartItem.book_id.in_(book_ids))
+        query = query.options(
+            joinedload(CartItem.book).load_only(
+                *(getattr(Book, column) for column in CART_BOOK_COLUMNS)
+            )
+        ).order_by(CartItem.cart_id)
+        if lock:
+            # Re-read rows already in the session so stock is checked
+            # against the locked values
+            query = query.with_for_update().populate_existing()
+        return cls(query.all())
+
+    def __len__(self):
+        return len(self.items)
+
+    def to_dict(self):
+        """Cart lines as in GET /api/cart"""
+        serialize = CartItem.SERIALIZER.serializer()
+        return [serialize(item) for item in self.items]
+
+    def summary(self):
+        """Cart totals"""
+        return {
+            "itemCount": self.item_count,
+            "totalPrice": float(self.total_price),
+            # Original price == price (no sale prices in the DDL)
+            "totalOriginalPrice": float(self.total_price),
+            "savings": 0.0,
+        }
@@ -0,0 +1,19 @@
+from database import db
+from datetime import datetime
+
+
+class CatalogVersion(db.Model):
+    """Single-row counter bumped by every admin write to the catalog.
+
+    Lets each worker process tell whether its cached catalog data is stale
+    with one primary-key read.
+    """
+
+    __tablename__ = "Catalog_Version"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CatalogVersion {self.version}>"
@@ -0,0 +1,80 @@
+from database import db
+from datetime import datetime
+
+
+class ImportJob(db.Model):
+    """One bulk catalog import (utils/catalog_import.py).
+
+    rows_done is committed together with each batch of books, so it is the
+    checkpoint a failed or interrupted import resumes from.
+    """
+
+    __tablename__ = "Import_Job"
+
+    job_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    source = db.Column(db.String(255), nullable=True)
+    format = db.Column(db.String(10), nullable=False)
+    # running -> completed | failed
+    status = db.Column(db.String(20), nullable=False, default="running")
+    # Data rows consumed from the file, valid or not
+    rows_done = db.Column(db.Integer, nullable=False, default=0)
+    imported = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    categories_created = db.Column(db.Integer, nullable=False, default=0)
+    message = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    errors = db.relationship(
+        "ImportRowError",
+        backref="job",
+        lazy="dynamic",
+        cascade="all, delete-orphan",
+        order_by="ImportRowError.line",
+    )
+
+    def to_dict(self, max_errors=0):
+        """Job summary, with up to max_errors of the row errors"""
+        data = {
+            "id": self.job_id,
+            "source": self.source,
+            "format": self.format,
+            "status": self.status,
+            "rowsDone": self.rows_done,
+            "imported": self.imported,
+            "failed": self.failed,
+            "categoriesCreated": self.categories_created,
+            "message": self.message,
+            "createdAt": self.created_at.isoformat() if self.created_at else None,
+            "updatedAt": self.updated_at.isoformat() if self.updated_at else None,
+        }
+        if max_errors:
+            data["errors"] = [
+                error.to_dict() for error in self.errors.limit(max_errors)
+            ]
+        return data
+
+    def __repr__(self):
+        return f"<ImportJob {self.job_id} {self.status} {self.rows_done} rows>"
+
+
+class ImportRowError(db.Model):
+    """A row an import rejected, by line number in the source file"""
+
+    __tablename__ = "Import_Row_Error"
+
+    error_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    job_id = db.Column(
+        db.Integer, db.ForeignKey("Import_Job.job_id"), nullable=False, index=True
+    )
+    line = db.Column(db.Integer, nullable=False)
+    isbn = db.Column(db.String(32), nullable=True)
+    error = db.Column(db.String(255), nullable=False)
+
+    def to_dict(self):
+        return {"line": self.line, "isbn": self.isbn, "error": self.error}
+
+    def __repr__(self):
+        return f"<ImportRowError job {self.job_id} line {self.line}>"
@@ -1,27 +1,51 @@
+import re
+
 from database import db
 from datetime import datetime
 
 
+def category_slug(name):
+    """URL-friendly slug for a category name ("Arts & Crafts" -> "arts-and-crafts")"""
+    name = name.lower().replace("&", " and ").replace("'", "")
+    return re.sub(r"[^\w]+", "-", name).strip("-")
+
+
+def unique_category_slug(name, taken):
+    """category_slug(name), suffixed -2, -3, ... past the slugs in taken
+    (which it is added to)"""
+    base = slug = category_slug(name)
+    suffix = 2
+    while slug in taken:
+        slug, suffix = f"{base}-{suffix}", suffix + 1
+    taken.add(slug)
+    return slug
+
+
 class Category(db.Model):
     __tablename__ = "Category"  # Matches your DDL
 
     category_name = db.Column(db.String(255), primary_key=True)
     description = db.Column(db.Text, nullable=True)
+    # Persisted so /api/books?category=<slug> resolves through an index
+    # instead of guessing the name back from the slug
+    slug = db.Column(db.String(255), nullable=True, unique=True, index=True)
+    # Sales counters across the category's books (see utils/sales.py)
+    units_sold = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0", index=True
+    )
+    trend_score = db.Column(
+        db.Double, nullable=False, default=0.0, server_default="0", index=True
+    )
 
     # Properties for backward compatibility
     @property
     def id(self):
-        return self.slug
+        return self.slug or category_slug(self.category_name)
 
     @property
     def name(self):
         return self.category_name
 
-    @property
-    def slug(self):
-        """Generate URL-friendly slug from name"""
-        return self.category_name.lower().replace(" ", "-").replace("&", "and")
-
     @property
     def is_active(self):
         return True  # All categories active by default
@@ -33,15 +57,16 @@ class Category(db.Model):
     def __init__(self, name, description=None):
         self.category_name = name
         self.description = description
+        self.slug = category_slug(name)
 
     def generate_slug(self, name):
         """Generate URL-friendly slug from name"""
-        return name.lower().replace(" ", "-").replace("&", "and")
+        return category_slug(name)
 
     def to_dict(self):
         """Convert category object to dictionary"""
         return {
-            "id": self.slug,
+            "id": self.id,
             "name": self.category_name,
             "description": self.description,
         }
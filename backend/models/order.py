@@ -4,6 +4,24 @@ import string
 import random
 from sqlalchemy import Numeric
 from decimal import Decimal
+from utils.covers import cover_url
+from utils.serializers import Attr, Const, Expr, Float, Group, List, Schema
+
+
+# Payment states of a cancelled order (see Order.status); such orders don't
+# count as sales
+CANCELLED_STATUSES = ("failed", "refunded")
+
+
+def _tax_and_shipping(subtotal):
+    """8% tax; shipping is free from $50"""
+    tax_amount = subtotal * Decimal("0.08")
+    shipping_cost = Decimal("0.00") if subtotal >= 50 else Decimal("5.99")
+    return tax_amount, shipping_cost
+
+
+def _utcnow_text():
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
 
 
 class Order(db.Model):
@@ -195,94 +213,104 @@ class Order(db.Model):
         """Get total number of items in order"""
         return sum(item.quantity for item in self.order_items)
 
-    # In backend/models/order.py
-
-    def to_dict(self):
-        """Convert order to dictionary"""
-        # ⭐ Use the ACTUAL stored total_amount from database
-        # Convert Decimal to float properly
-        if self.total_amount and self.total_amount > 0:
-            total_amount = float(self.total_amount)
-        else:
-            # Fallback: calculate if total is 0 or None
-            subtotal = (
-                sum(item.total_price for item in self.order_items)
-                if self.order_items
-                else Decimal("0.00")
-            )
-            tax_amount = subtotal * Decimal("0.08")
-            shipping_cost = Decimal("0.00") if subtotal >= 50 else Decimal("5.99")
-            total_amount = float(subtotal + tax_amount + shipping_cost)
-
-        # Calculate component totals for display breakdown
-        subtotal = (
+    def _subtotal(self):
+        return (
             sum(item.total_price for item in self.order_items)
             if self.order_items
             else Decimal("0.00")
         )
-        tax_amount = subtotal * Decimal("0.08")  # 8% tax
-        shipping_cost = Decimal("0.00") if subtotal >= 50 else Decimal("5.99")
+
+    def display_total(self, subtotal=None):
+        """Stored total_amount, recalculated from the items if it's missing"""
+        # ⭐ Use the ACTUAL stored total_amount from database
+        if self.total_amount and self.total_amount > 0:
+            return float(self.total_amount)
+
+        # Fallback: calculate if total is 0 or None
+        if subtotal is None:
+            subtotal = self._subtotal()
+        tax_amount, shipping_cost = _tax_and_shipping(subtotal)
+        return float(subtotal + tax_amount + shipping_cost)
+
+    def totals(self):
+        """Totals breakdown for display (the subtotal is summed once)"""
+        subtotal = self._subtotal()
+        tax_amount, shipping_cost = _tax_and_shipping(subtotal)
 
         return {
-            "id": self.order_id,
-            "orderNumber": self.order_number,
-            "status": self.status,
-            "customer": {
-                "firstName": self.first_name,
-                "lastName": self.last_name,
-                "email": self.customer_email,
-                "phone": self.phone,
-                "fullName": self.customer_name,
-            },
-            "shipping": {
-                "address": self.shipping_address,
-                "city": self.city,
-                "postalCode": self.postal_code,
-                "fullAddress": self.shipping_address,
-            },
-            "payment": {"method": self.payment_method, "status": self.payment_status},
-            "totals": {
-                "subtotal": float(subtotal),
-                "taxAmount": float(tax_amount),
-                "shippingCost": float(shipping_cost),
-                "discountAmount": 0.00,
-                "totalAmount": total_amount,  # ⭐ Already converted to float
-            },
-            "items": [item.to_dict() for item in self.order_items],
-            "itemsCount": self.items_count,
-            "timestamps": {
-                "createdAt": self.order_date.strftime("%Y-%m-%d %H:%M:%S"),
-                "updatedAt": self.order_date.strftime("%Y-%m-%d %H:%M:%S"),
-                "shippedAt": None,
-                "deliveredAt": None,
-            },
+            "subtotal": float(subtotal),
+            "taxAmount": float(tax_amount),
+            "shippingCost": float(shipping_cost),
+            "discountAmount": 0.00,
+            "totalAmount": self.display_total(subtotal),
         }
 
+    SERIALIZER = Schema(
+        "order",
+        {
+            "id": Attr("order_id"),
+            "orderNumber": Expr("'BH%08d' % {order_id}"),
+            "status": Attr("status"),
+            "customer": Group(
+                {
+                    "firstName": Expr(
+                        "({customer_name}.split()[0] if {customer_name} else '')"
+                    ),
+                    "lastName": Expr("' '.join({customer_name}.split()[1:])"),
+                    "email": Attr("customer_email"),
+                    "phone": Attr("phone"),
+                    "fullName": Attr("customer_name"),
+                }
+            ),
+            "shipping": Group(
+                {
+                    "address": Attr("shipping_address"),
+                    # City and postal code are folded into shipping_address
+                    "city": Const(""),
+                    "postalCode": Const(""),
+                    "fullAddress": Attr("shipping_address"),
+                }
+            ),
+            "payment": Group(
+                {"method": Attr("payment_method"), "status": Attr("payment_status")}
+            ),
+            "totals": Expr("obj.totals()", columns=()),
+            "totalAmount": Expr("obj.display_total()", columns=()),
+            "items": List("order_items", lambda: OrderItem.SERIALIZER),
+            "itemsCount": Expr("sum(item.quantity for item in {order_items})"),
+            "timestamps": Group(
+                {
+                    "createdAt": Expr("{order_date}.strftime('%Y-%m-%d %H:%M:%S')"),
+                    "updatedAt": Expr("{order_date}.strftime('%Y-%m-%d %H:%M:%S')"),
+                    "shippedAt": Const(None),
+                    "deliveredAt": Const(None),
+                }
+            ),
+            "createdAt": Expr("{order_date}.strftime('%Y-%m-%d %H:%M:%S')"),
+        },
+        default=(
+            "id",
+            "orderNumber",
+            "status",
+            "customer",
+            "shipping",
+            "payment",
+            "totals",
+            "items",
+            "itemsCount",
+            "timestamps",
+        ),
+    )
+
+    def to_dict(self):
+        """Convert order to dictionary"""
+        return self.SERIALIZER.serializer()(self)
+
     def to_dict_simple(self):
         """Convert order to simple dictionary (for order lists)"""
-        # ⭐ Use ACTUAL stored total_amount from database
-        # Convert Decimal to float properly
-        if self.total_amount and self.total_amount > 0:
-            total_amount = float(self.total_amount)
-        else:
-            # Fallback: calculate if total is 0 or None
-            subtotal = (
-                sum(item.total_price for item in self.order_items)
-                if self.order_items
-                else Decimal("0.00")
-            )
-            tax_amount = subtotal * Decimal("0.08")
-            shipping_cost = Decimal("0.00") if subtotal >= 50 else Decimal("5.99")
-            total_amount = float(subtotal + tax_amount + shipping_cost)
-
-        return {
-            "id": self.order_id,
-            "orderNumber": self.order_number,
-            "status": self.status,
-            "totalAmount": total_amount,  # ⭐ Already converted to float
-            "itemsCount": self.items_count,
-            "createdAt": self.order_date.strftime("%Y-%m-%d %H:%M:%S"),
-        }
+        return self.SERIALIZER.serializer(
+            ("id", "orderNumber", "status", "totalAmount", "itemsCount", "createdAt")
+        )(self)
 
     @classmethod
     def get_user_orders(cls, user_id):
@@ -333,21 +361,28 @@ class OrderItem(db.Model):
         """Calculate total price for this order item"""
         return self.unit_price * self.quantity
 
+    SERIALIZER = Schema(
+        "order_item",
+        {
+            "id": Attr("order_item_id"),
+            "bookId": Attr("book_id"),
+            "title": Expr("({book}.title if {book} is not None else '')"),
+            "author": Expr("({book}.author_name if {book} is not None else '')"),
+            "image": Expr(
+                "(cover_url({book}.cover, {book}.image, 'thumbnail')"
+                " if {book} is not None else '')",
+                cover_url=cover_url,
+            ),
+            "quantity": Attr("quantity"),
+            "pricePerItem": Float("unit_price"),
+            "totalPrice": Expr("float({unit_price} * {quantity})"),
+            "createdAt": Expr("utcnow_text()", utcnow_text=_utcnow_text),
+        },
+    )
+
     def to_dict(self):
         """Convert order item to dictionary"""
-        book_data = self.book.to_dict_simple() if self.book else {}
-
-        return {
-            "id": self.order_item_id,
-            "bookId": self.book_id,
-            "title": book_data.get("title", ""),
-            "author": book_data.get("author", ""),
-            "image": book_data.get("image", ""),
-            "quantity": self.quantity,
-            "pricePerItem": float(self.unit_price),
-            "totalPrice": float(self.total_price),
-            "createdAt": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-        }
+        return self.SERIALIZER.serializer()(self)
 
     def __repr__(self):
         return (
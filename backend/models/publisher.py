@@ -0,0 +1,40 @@
+from database import db
+
+
+class Publisher(db.Model):
+    __tablename__ = "Publisher"  # Matches your DDL
+
+    publisher_name = db.Column(db.String(255), primary_key=True)
+    address = db.Column(db.Text, nullable=True)
+    city = db.Column(db.String(100), nullable=True)
+    phone = db.Column(db.String(20), nullable=True)
+    email = db.Column(db.String(255), nullable=True)
+    established_date = db.Column(db.Date, nullable=True)
+    # Books carrying this publisher_name, maintained by the book writes (see
+    # utils/book_counts.py) so publisher lists never scan Book_Details
+    book_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0", index=True
+    )
+
+    @property
+    def name(self):
+        return self.publisher_name
+
+    def to_dict(self):
+        """Convert publisher object to dictionary"""
+        return {
+            "publisher_name": self.publisher_name,
+            "address": self.address,
+            "city": self.city,
+            "phone": self.phone,
+            "email": self.email,
+            "established_date": (
+                self.established_date.strftime("%Y-%m-%d")
+                if self.established_date
+                else None
+            ),
+            "book_count": self.book_count or 0,
+        }
+
+    def __repr__(self):
+        return f"<Publisher {self.publisher_name}>"
@@ -0,0 +1,42 @@
+from database import db
+
+
+class CoPurchase(db.Model):
+    """How many orders contained both books (one row per direction).
+
+    The diagonal row (book_id == related_id) holds the number of orders the
+    book appeared in, which the similarity score is normalised by.
+    """
+
+    __tablename__ = "Co_Purchase"
+
+    book_id = db.Column(
+        db.String(13), db.ForeignKey("Book_Details.isbn"), primary_key=True
+    )
+    related_id = db.Column(
+        db.String(13), db.ForeignKey("Book_Details.isbn"), primary_key=True
+    )
+    orders = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CoPurchase {self.book_id}+{self.related_id} x{self.orders}>"
+
+
+class RelatedBook(db.Model):
+    """Precomputed "customers also bought" list, one row per rank"""
+
+    __tablename__ = "Related_Book"
+
+    book_id = db.Column(
+        db.String(13), db.ForeignKey("Book_Details.isbn"), primary_key=True
+    )
+    rank = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    related_id = db.Column(
+        db.String(13), db.ForeignKey("Book_Details.isbn"), nullable=False
+    )
+    score = db.Column(db.Float, nullable=False)
+    # Orders containing both books
+    orders = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<RelatedBook {self.book_id} #{self.rank}: {self.related_id}>"
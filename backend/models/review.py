@@ -1,5 +1,7 @@
 from database import db
 from datetime import datetime
+from models.user import User
+from utils.serializers import Attr, DateTime, Nested, Schema
 
 
 class Review(db.Model):
@@ -34,21 +36,33 @@ class Review(db.Model):
         self.review_text = review_text
         self.review_date = datetime.utcnow()
 
-    def to_dict(self):
-        """Convert review to dictionary"""
-        return {
-            "id": self.review_id,
-            "userId": self.user_id,
-            "bookId": self.book_id,
-            "rating": self.rating,
-            "comment": self.review_text,
-            "reviewDate": (
-                self.review_date.strftime("%Y-%m-%d %H:%M:%S")
-                if self.review_date
-                else ""
-            ),
-            "user": self.user.to_dict() if self.user else None,
-        }
+    SERIALIZER = Schema(
+        "review",
+        {
+            "id": Attr("review_id"),
+            "userId": Attr("user_id"),
+            "bookId": Attr("book_id"),
+            "rating": Attr("rating"),
+            "comment": Attr("review_text"),
+            "reviewDate": DateTime("review_date"),
+            "user": Nested("user", User.SERIALIZER),
+        },
+    )
+
+    # A book's review listing is public and cached by shared caches, so it
+    # only shows the reviewer's public fields
+    PUBLIC_SERIALIZER = Schema(
+        "review_public",
+        {
+            **SERIALIZER.fields,
+            "user": Nested("user", User.SERIALIZER, keys=User.PUBLIC_FIELDS),
+        },
+    )
+
+    def to_dict(self, public=False):
+        """Convert review to dictionary (public: as other users see it)"""
+        schema = self.PUBLIC_SERIALIZER if public else self.SERIALIZER
+        return schema.serializer()(self)
 
     @classmethod
     def get_book_reviews(cls, book_id):
@@ -0,0 +1,49 @@
+from database import db
+
+
+class SearchPosting(db.Model):
+    """One (term, book) entry of the catalog's inverted index"""
+
+    __tablename__ = "Search_Posting"
+
+    term = db.Column(db.String(64), primary_key=True)
+    book_id = db.Column(
+        db.String(13), db.ForeignKey("Book_Details.isbn"), primary_key=True
+    )
+    # Term frequency, weighted by the field(s) the term appeared in
+    weight = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (
+        db.Index("idx_search_posting_book", "book_id"),
+        # Lets very common terms be read best-first (impact order)
+        db.Index("idx_search_posting_term_weight", "term", "weight"),
+    )
+
+    def __repr__(self):
+        return f"<SearchPosting {self.term} Book:{self.book_id}>"
+
+
+class SearchDocument(db.Model):
+    """Per-book document length used for BM25 length normalisation"""
+
+    __tablename__ = "Search_Document"
+
+    book_id = db.Column(
+        db.String(13), db.ForeignKey("Book_Details.isbn"), primary_key=True
+    )
+    length = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return f"<SearchDocument Book:{self.book_id} Length:{self.length}>"
+
+
+class SearchTerm(db.Model):
+    """Document frequency per term, used to plan and score queries"""
+
+    __tablename__ = "Search_Term"
+
+    term = db.Column(db.String(64), primary_key=True)
+    doc_freq = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SearchTerm {self.term} df:{self.doc_freq}>"
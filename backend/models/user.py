@@ -1,6 +1,7 @@
 from database import db
 from datetime import datetime
 import bcrypt
+from utils.serializers import Attr, Const, Expr, Schema
 
 
 class User(db.Model):
@@ -70,21 +71,29 @@ class User(db.Model):
         """Generate avatar URL"""
         return f"https://ui-avatars.com/api/?name={self.name.replace(' ', '+')}&background=6366f1&color=fff&size=40"
 
+    SERIALIZER = Schema(
+        "user",
+        {
+            "id": Attr("user_id"),
+            "firstName": Expr("({name}.split()[0] if {name} else '')"),
+            "lastName": Expr("' '.join({name}.split()[1:])"),
+            "email": Attr("email"),
+            "phone": Attr("phone"),
+            "address": Attr("address"),
+            "city": Attr("city"),
+            "postalCode": Const(""),  # Not in your DDL
+            "joinedDate": Expr("{registration_date}.strftime('%Y-%m-%d')"),
+            "avatar": Expr("obj.get_avatar_url()", columns=("name",)),
+            "user_type": Attr("user_type"),
+        },
+    )
+
+    # What other users see of a user, e.g. as the author of a review
+    PUBLIC_FIELDS = ("id", "firstName", "lastName", "avatar")
+
     def to_dict(self):
         """Convert user object to dictionary"""
-        return {
-            "id": self.user_id,
-            "firstName": self.first_name,
-            "lastName": self.last_name,
-            "email": self.email,
-            "phone": self.phone,
-            "address": self.address,
-            "city": self.city,
-            "postalCode": "",  # Not in your DDL
-            "joinedDate": self.registration_date.strftime("%Y-%m-%d"),
-            "avatar": self.get_avatar_url(),
-            "user_type": self.user_type,
-        }
+        return self.SERIALIZER.serializer()(self)
 
     def __repr__(self):
         return f"<User {self.email}>"
@@ -0,0 +1,35 @@
+"""
+Search Index Rebuild Script
+Recreates the full-text search index (Search_Posting / Search_Document)
+from Book_Details. Run it once to enable indexed search; afterwards admin
+book writes keep the index up to date.
+Usage: python rebuild_search_index.py
+"""
+
+import time
+from app import create_app
+from database import db
+from utils.catalog import bump_catalog_version
+from utils.search import rebuild_index
+
+
+def main():
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "=" * 60)
+        print("REBUILDING SEARCH INDEX")
+        print("=" * 60)
+
+        start = time.perf_counter()
+        indexed = rebuild_index()
+        # Search results (and so cached listings) change with the index
+        bump_catalog_version()
+        db.session.commit()
+        elapsed = time.perf_counter() - start
+
+        print(f"\n✅ Indexed {indexed} book(s) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
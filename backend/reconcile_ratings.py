@@ -0,0 +1,30 @@
+"""
+Rating Aggregates Backfill Script
+Recomputes Book_Details.rating_sum / rating_count from the Review table.
+Run it once after upgrade_schema.py adds the columns, and again any time the
+stored aggregates are suspected to have drifted.
+Usage: python reconcile_ratings.py
+"""
+
+from app import create_app
+from database import db
+from models.book import Book
+from utils.catalog import bump_catalog_version
+
+
+def reconcile_ratings():
+    app = create_app()
+
+    with app.app_context():
+        total_books = Book.query.count()
+        drifted = Book.reconcile_rating_totals()
+        if drifted:
+            bump_catalog_version("inventory")
+        db.session.commit()
+
+        print(f"Checked {total_books} books")
+        print(f"\n✅ Reconciled {drifted} book(s) with stale rating totals")
+
+
+if __name__ == "__main__":
+    reconcile_ratings()
@@ -0,0 +1,29 @@
+"""
+Sales Counters Backfill Script
+Recomputes units_sold / trend_score on Book_Details and Category from the
+orders. Run it after upgrade_schema.py adds the columns, after moving
+utils.sales.TREND_EPOCH, and any time the counters are suspected to have
+drifted.
+Usage: python reconcile_sales.py
+"""
+
+from app import create_app
+from database import db
+from utils.catalog import bump_catalog_version
+from utils.sales import reconcile_sales
+
+
+def main():
+    app = create_app()
+
+    with app.app_context():
+        fixed = reconcile_sales()
+        if fixed:
+            bump_catalog_version("inventory")
+        db.session.commit()
+
+        print(f"\n✅ Reconciled {fixed} book/category row(s) with stale sales counters")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from functools import wraps
+from database import replica_reads
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -37,12 +38,15 @@ def admin_get_books():
     try:
         from database import db
         from models.book import Book
+        from utils.pagination import InvalidCursor, SortKey, paginate_request
+        from utils.projection import InvalidFields, load_options, parse_fields
 
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 20, type=int)
         search = request.args.get("search", "")
+        fields = parse_fields(
+            request.args.get("fields"), request.args.get("projection", "admin")
+        )
 
-        query = Book.query
+        query = Book.query.options(*load_options(fields))
 
         if search:
             query = query.filter(
@@ -53,29 +57,152 @@ def admin_get_books():
                 )
             )
 
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-        books = [book.to_dict() for book in pagination.items]
+        result = paginate_request(query, [SortKey(Book.isbn)])
+        books = [book.to_dict(fields) for book in result.items]
 
         return (
             jsonify(
                 {
                     "success": True,
                     "books": books,
-                    "pagination": {
-                        "page": page,
-                        "pages": pagination.pages,
-                        "total": pagination.total,
-                    },
+                    "pagination": result.to_dict(),
                 }
             ),
             200,
         )
 
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching books: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
+@admin_bp.route("/books/export", methods=["GET"])
+@admin_required
+def admin_export_books():
+    """Stream the whole catalog, or the books changed since=, as NDJSON or CSV"""
+    try:
+        from datetime import datetime
+        from flask import Response, stream_with_context
+        from utils.export import (
+            EXPORT_OVERLAP,
+            FORMATS,
+            InvalidExport,
+            export_books,
+            parse_since,
+        )
+        from utils.projection import InvalidFields, parse_fields
+
+        format = request.args.get("format", "ndjson")
+        if format not in FORMATS:
+            raise InvalidExport(
+                f"Unknown format: {format}. Available: {', '.join(FORMATS)}"
+            )
+        since = parse_since(request.args.get("since"))
+        fields = parse_fields(
+            request.args.get("fields"), request.args.get("projection", "admin")
+        )
+        gzip = request.accept_encodings.best_match(["gzip"]) is not None
+
+        # Taken before the query runs. The X-Export-As-Of a delta feed passes
+        # as its next since= reaches back EXPORT_OVERLAP further, to changes
+        # flushed before now but committed after this export's snapshot
+        as_of = datetime.utcnow().replace(microsecond=0)
+        body = export_books(fields, format, since, gzip=gzip)
+
+        response = Response(stream_with_context(body), mimetype=FORMATS[format])
+        response.headers["Content-Disposition"] = (
+            f'attachment; filename="books-{as_of:%Y%m%dT%H%M%SZ}.{format}"'
+        )
+        next_since = as_of - EXPORT_OVERLAP
+        response.headers["X-Export-As-Of"] = f"{next_since.isoformat()}Z"
+        response.vary.add("Accept-Encoding")
+        if gzip:
+            response.headers["Content-Encoding"] = "gzip"
+        return response
+
+    except (InvalidExport, InvalidFields) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error exporting books: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/books/import", methods=["POST"])
+@admin_required
+def admin_import_books():
+    """Create or update books in bulk from a CSV or NDJSON request body.
+
+    The body may be gzipped (Content-Encoding: gzip). ?job=<id> resumes an
+    earlier import of the same file from its last committed batch.
+    """
+    job = None
+    try:
+        from flask import current_app
+        from werkzeug.exceptions import RequestEntityTooLarge
+        from werkzeug.wsgi import get_input_stream
+        from utils.catalog_import import (
+            FORMATS,
+            InvalidImport,
+            import_books,
+            start_job,
+            text_stream,
+        )
+
+        formats_by_type = {mimetype: name for name, mimetype in FORMATS.items()}
+        format = request.args.get("format") or formats_by_type.get(
+            request.mimetype, "ndjson"
+        )
+        job = start_job(
+            format, request.args.get("filename"), request.args.get("job", type=int)
+        )
+
+        # Read straight from the WSGI input rather than buffered in memory
+        body = get_input_stream(
+            request.environ, max_content_length=current_app.config["IMPORT_MAX_SIZE"]
+        )
+        gzipped = request.headers.get("Content-Encoding") == "gzip"
+        import_books(text_stream(body, gzipped), job)
+
+        return jsonify({"success": True, "job": job.to_dict(max_errors=100)})
+
+    except InvalidImport as e:
+        return jsonify({"error": str(e)}), 400
+    except RequestEntityTooLarge:
+        return jsonify({"error": "Import file is too large"}), 413
+    except Exception as e:
+        from database import db
+
+        db.session.rollback()
+        logger.error(f"Error importing books: {str(e)}")
+        response = {"error": "Import failed", "details": str(e)}
+        if job is not None:
+            # The client resumes with ?job=<id>
+            response["job"] = job.to_dict(max_errors=100)
+        return jsonify(response), 500
+
+
+@admin_bp.route("/books/import/<int:job_id>", methods=["GET"])
+@admin_required
+def admin_get_import(job_id):
+    """Progress and row errors of a bulk import"""
+    try:
+        from database import db
+        from models.catalog_import import ImportJob
+
+        job = db.session.get(ImportJob, job_id)
+        if not job:
+            return jsonify({"error": "Import job not found"}), 404
+
+        max_errors = min(max(request.args.get("errors", 100, type=int), 0), 1000)
+        return jsonify({"success": True, "job": job.to_dict(max_errors=max_errors)})
+
+    except Exception as e:
+        logger.error(f"Error getting import job: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @admin_bp.route("/books", methods=["POST"])
 @admin_required
 def admin_create_book():
@@ -83,6 +210,10 @@ def admin_create_book():
     try:
         from database import db
         from models.book import Book
+        from utils import search as search_index
+        from utils import suggest
+        from utils.book_counts import adjust_book_counts
+        from utils.catalog import bump_catalog_version
 
         data = request.get_json()
 
@@ -119,7 +250,11 @@ def admin_create_book():
         )
 
         db.session.add(book)
+        adjust_book_counts(after=(book.author_name, book.publisher_name))
+        search_index.index_book(book)
+        bump_catalog_version()
         db.session.commit()
+        suggest.index_book(book)
 
         return (
             jsonify(
@@ -147,12 +282,19 @@ def admin_update_book(isbn):
     try:
         from database import db
         from models.book import Book
+        from utils import search as search_index
+        from utils import suggest
+        from utils.book_counts import adjust_book_counts
+        from utils.catalog import bump_catalog_version
+        from utils.sales import move_category_sales
 
         book = Book.query.filter_by(isbn=isbn).first()
         if not book:
             return jsonify({"error": "Book not found"}), 404
 
         data = request.get_json()
+        before = (book.author_name, book.publisher_name)
+        old_category = book.category_name
 
         # Update fields
         if "title" in data:
@@ -176,7 +318,29 @@ def admin_update_book(isbn):
         if "image" in data:
             book.image = data["image"]
 
+        if any(field in data for field in search_index.FIELD_WEIGHTS):
+            search_index.index_book(book)
+
+        after = (book.author_name, book.publisher_name)
+        if after != before:
+            adjust_book_counts(before, after)
+
+        if book.category_name != old_category:
+            # The book's sales move with it to the new category's leaderboards;
+            # its counters are read under a row lock so no order slips between
+            units_sold, trend_score = (
+                db.session.query(Book.units_sold, Book.trend_score)
+                .filter(Book.isbn == book.isbn)
+                .with_for_update()
+                .one()
+            )
+            move_category_sales(
+                [(units_sold, trend_score, old_category, book.category_name)]
+            )
+
+        bump_catalog_version()
         db.session.commit()
+        suggest.index_book(book)
 
         return (
             jsonify(
@@ -197,6 +361,55 @@ def admin_update_book(isbn):
         return jsonify({"error": str(e)}), 500
 
 
+@admin_bp.route("/books/<isbn>/cover", methods=["POST"])
+@admin_required
+def admin_upload_cover(isbn):
+    """Upload a book's cover (multipart field "cover").
+
+    The original is stored under its content digest and the thumbnail,
+    card and detail renditions are made in the background (utils/covers.py);
+    the book's payloads use them from now on.
+    """
+    try:
+        from database import db
+        from models.book import Book
+        from utils.catalog import bump_catalog_version
+        from utils.covers import COVER_SIZES, InvalidCover, cover_url, save_cover
+
+        book = Book.query.filter_by(isbn=isbn).first()
+        if not book:
+            return jsonify({"error": "Book not found"}), 404
+
+        try:
+            book.cover = save_cover(request.files.get("cover"))
+        except InvalidCover as e:
+            return jsonify({"error": str(e)}), 400
+
+        bump_catalog_version()
+        db.session.commit()
+
+        return (
+            jsonify(
+                {
+                    "success": True,
+                    "message": "Cover uploaded successfully",
+                    "cover": {
+                        size: cover_url(book.cover, book.image, size)
+                        for size in COVER_SIZES
+                    },
+                }
+            ),
+            201,
+        )
+
+    except Exception as e:
+        from database import db
+
+        db.session.rollback()
+        logger.error(f"Error uploading cover: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @admin_bp.route("/books/<isbn>", methods=["DELETE"])
 @admin_required
 def admin_delete_book(isbn):
@@ -204,13 +417,21 @@ def admin_delete_book(isbn):
     try:
         from database import db
         from models.book import Book
+        from utils import search as search_index
+        from utils import suggest
+        from utils.book_counts import adjust_book_counts
+        from utils.catalog import bump_catalog_version
 
         book = Book.query.filter_by(isbn=isbn).first()
         if not book:
             return jsonify({"error": "Book not found"}), 404
 
+        search_index.remove_book(isbn)
+        adjust_book_counts(before=(book.author_name, book.publisher_name))
         db.session.delete(book)
+        bump_catalog_version()
         db.session.commit()
+        suggest.remove_book(isbn)
 
         return jsonify({"success": True, "message": "Book deleted successfully"}), 200
 
@@ -231,28 +452,24 @@ def admin_get_users():
     """Get all users"""
     try:
         from models.user import User
+        from utils.pagination import InvalidCursor, SortKey, paginate_request
 
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 20, type=int)
-
-        pagination = User.query.paginate(page=page, per_page=per_page, error_out=False)
-        users = [user.to_dict() for user in pagination.items]
+        result = paginate_request(User.query, [SortKey(User.user_id)])
+        users = [user.to_dict() for user in result.items]
 
         return (
             jsonify(
                 {
                     "success": True,
                     "users": users,
-                    "pagination": {
-                        "page": page,
-                        "pages": pagination.pages,
-                        "total": pagination.total,
-                    },
+                    "pagination": result.to_dict(),
                 }
             ),
             200,
         )
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching users: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -265,6 +482,7 @@ def admin_update_user(user_id):
     try:
         from database import db
         from models.user import User
+        from utils.catalog import bump_catalog_version
 
         user = User.query.get(user_id)
         if not user:
@@ -272,8 +490,10 @@ def admin_update_user(user_id):
 
         data = request.get_json()
 
-        if "name" in data:
+        if "name" in data and data["name"] != user.name:
             user.name = data["name"]
+            # Book review listings show the name, so they are stale
+            bump_catalog_version("inventory")
         if "email" in data:
             # Check if email is taken
             existing = User.query.filter_by(email=data["email"]).first()
@@ -348,9 +568,8 @@ def admin_get_orders():
     """Get all orders"""
     try:
         from models.order import Order
+        from utils.pagination import InvalidCursor, SortKey, paginate_request
 
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 20, type=int)
         status = request.args.get("status", "")
 
         query = Order.query
@@ -358,11 +577,15 @@ def admin_get_orders():
         if status:
             query = query.filter_by(payment_status=status)
 
-        pagination = query.order_by(Order.order_date.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        result = paginate_request(
+            query,
+            [
+                SortKey(Order.order_date, descending=True),
+                SortKey(Order.order_id, descending=True),
+            ],
         )
 
-        orders = [order.to_dict_simple() for order in pagination.items]
+        orders = [order.to_dict_simple() for order in result.items]
 
         # ⭐ DEBUG: Log first order
         if orders:
@@ -375,16 +598,14 @@ def admin_get_orders():
                 {
                     "success": True,
                     "orders": orders,
-                    "pagination": {
-                        "page": page,
-                        "pages": pagination.pages,
-                        "total": pagination.total,
-                    },
+                    "pagination": result.to_dict(),
                 }
             ),
             200,
         )
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching orders: {str(e)}")
         import traceback
@@ -433,7 +654,10 @@ def admin_update_order(order_id):
     """Update order status"""
     try:
         from database import db
-        from models.order import Order
+        from models.order import CANCELLED_STATUSES, Order
+        from utils.catalog import bump_catalog_version
+        from utils.related import record_order
+        from utils.sales import record_sales
 
         order = Order.query.get(order_id)
         if not order:
@@ -442,7 +666,27 @@ def admin_update_order(order_id):
         data = request.get_json()
 
         if "payment_status" in data:
+            was_cancelled = order.payment_status in CANCELLED_STATUSES
             order.payment_status = data["payment_status"]
+            # Cancelling (or reinstating) an order moves its sales and
+            # co-purchases
+            is_cancelled = order.payment_status in CANCELLED_STATUSES
+            if is_cancelled != was_cancelled:
+                sign = -1 if is_cancelled else 1
+                record_sales(
+                    [
+                        (item.book_id, item.book.category_name, item.quantity)
+                        for item in order.order_items
+                    ],
+                    order.order_date,
+                    sign,
+                )
+                record_order([item.book_id for item in order.order_items], sign)
+
+                # Sales counters and "customers also bought" lists moved, so
+                # cached book and related responses are stale; keep this
+                # after record_order
+                bump_catalog_version("inventory")
         if "shipping_address" in data:
             order.shipping_address = data["shipping_address"]
 
@@ -473,12 +717,30 @@ def admin_delete_order(order_id):
     """Delete order"""
     try:
         from database import db
-        from models.order import Order
+        from models.order import CANCELLED_STATUSES, Order
+        from utils.catalog import bump_catalog_version
+        from utils.related import record_order
+        from utils.sales import record_sales
 
         order = Order.query.get(order_id)
         if not order:
             return jsonify({"error": "Order not found"}), 404
 
+        if order.payment_status not in CANCELLED_STATUSES:
+            record_sales(
+                [
+                    (item.book_id, item.book.category_name, item.quantity)
+                    for item in order.order_items
+                ],
+                order.order_date,
+                -1,
+            )
+            record_order([item.book_id for item in order.order_items], -1)
+
+            # Sales counters and "customers also bought" lists moved, so
+            # cached book and related responses are stale; keep this after
+            # record_order
+            bump_catalog_version("inventory")
         db.session.delete(order)
         db.session.commit()
 
@@ -498,15 +760,40 @@ def admin_delete_order(order_id):
 @admin_bp.route("/authors", methods=["GET"])
 @admin_required
 def admin_get_authors():
-    """Get all authors"""
+    """Authors with their book counts, a page at a time (search= filters by
+    name)"""
     try:
-        from database import db
+        from models.author import Author
+        from utils.pagination import (
+            MAX_PER_PAGE,
+            InvalidCursor,
+            SortKey,
+            paginate_request,
+        )
 
-        result = db.session.execute(db.text("SELECT * FROM Author"))
-        authors = [dict(row._mapping) for row in result]
+        query = Author.query
+        search = request.args.get("search", "")
+        if search:
+            query = query.filter(Author.author_name.contains(search))
 
-        return jsonify({"success": True, "authors": authors}), 200
+        # The admin screen lists them all, so pages are as large as allowed
+        result = paginate_request(
+            query, [SortKey(Author.author_name)], default_per_page=MAX_PER_PAGE
+        )
 
+        return (
+            jsonify(
+                {
+                    "success": True,
+                    "authors": [author.to_dict() for author in result.items],
+                    "pagination": result.to_dict(),
+                }
+            ),
+            200,
+        )
+
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching authors: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -518,36 +805,34 @@ def admin_create_author():
     """Create new author"""
     try:
         from database import db
+        from models.author import Author
+        from utils.book_counts import recount_books
+        from utils.catalog import bump_catalog_version
 
         data = request.get_json()
 
         if not data.get("author_name"):
             return jsonify({"error": "author_name is required"}), 400
 
-        # Check if author exists
-        result = db.session.execute(
-            db.text("SELECT * FROM Author WHERE author_name = :name"),
-            {"name": data["author_name"]},
-        )
-        if result.fetchone():
+        if db.session.get(Author, data["author_name"]):
             return jsonify({"error": "Author already exists"}), 400
 
-        db.session.execute(
-            db.text(
-                """
-                INSERT INTO Author (author_name, biography, nationality)
-                VALUES (:name, :bio, :nationality)
-            """
-            ),
-            {
-                "name": data["author_name"],
-                "bio": data.get("biography"),
-                "nationality": data.get("nationality"),
-            },
+        author = Author(
+            author_name=data["author_name"],
+            biography=data.get("biography"),
+            nationality=data.get("nationality"),
         )
+        db.session.add(author)
+        db.session.flush()
+        # Books may already carry the name
+        recount_books(authors=[author.author_name])
+        bump_catalog_version()
         db.session.commit()
 
-        return jsonify({"success": True, "message": "Author created successfully"}), 201
+        return (
+            jsonify({"success": True, "message": "Author created successfully"}),
+            201,
+        )
 
     except Exception as e:
         from database import db
@@ -563,26 +848,27 @@ def admin_update_author(author_name):
     """Update author details"""
     try:
         from database import db
+        from models.author import Author
+        from utils.catalog import bump_catalog_version
+
+        author = db.session.get(Author, author_name)
+        if not author:
+            return jsonify({"error": "Author not found"}), 404
 
         data = request.get_json()
 
-        db.session.execute(
-            db.text(
-                """
-                UPDATE Author 
-                SET biography = :bio, nationality = :nationality
-                WHERE author_name = :name
-            """
-            ),
-            {
-                "name": author_name,
-                "bio": data.get("biography"),
-                "nationality": data.get("nationality"),
-            },
-        )
+        if "biography" in data:
+            author.biography = data["biography"]
+        if "nationality" in data:
+            author.nationality = data["nationality"]
+
+        bump_catalog_version()
         db.session.commit()
 
-        return jsonify({"success": True, "message": "Author updated successfully"}), 200
+        return (
+            jsonify({"success": True, "message": "Author updated successfully"}),
+            200,
+        )
 
     except Exception as e:
         from database import db
@@ -598,14 +884,32 @@ def admin_delete_author(author_name):
     """Delete author"""
     try:
         from database import db
+        from models.author import Author
+        from utils.catalog import bump_catalog_version
+
+        author = db.session.get(Author, author_name)
+        if not author:
+            return jsonify({"error": "Author not found"}), 404
+
+        # Its books would be left uncounted
+        if author.book_count:
+            return (
+                jsonify(
+                    {
+                        "error": f"Author still has {author.book_count} book(s)",
+                    }
+                ),
+                400,
+            )
 
-        db.session.execute(
-            db.text("DELETE FROM Author WHERE author_name = :name"),
-            {"name": author_name},
-        )
+        db.session.delete(author)
+        bump_catalog_version()
         db.session.commit()
 
-        return jsonify({"success": True, "message": "Author deleted successfully"}), 200
+        return (
+            jsonify({"success": True, "message": "Author deleted successfully"}),
+            200,
+        )
 
     except Exception as e:
         from database import db
@@ -621,15 +925,40 @@ def admin_delete_author(author_name):
 @admin_bp.route("/publishers", methods=["GET"])
 @admin_required
 def admin_get_publishers():
-    """Get all publishers"""
+    """Publishers with their book counts, a page at a time (search= filters by
+    name)"""
     try:
-        from database import db
+        from models.publisher import Publisher
+        from utils.pagination import (
+            MAX_PER_PAGE,
+            InvalidCursor,
+            SortKey,
+            paginate_request,
+        )
 
-        result = db.session.execute(db.text("SELECT * FROM Publisher"))
-        publishers = [dict(row._mapping) for row in result]
+        query = Publisher.query
+        search = request.args.get("search", "")
+        if search:
+            query = query.filter(Publisher.publisher_name.contains(search))
 
-        return jsonify({"success": True, "publishers": publishers}), 200
+        # The admin screen lists them all, so pages are as large as allowed
+        result = paginate_request(
+            query, [SortKey(Publisher.publisher_name)], default_per_page=MAX_PER_PAGE
+        )
 
+        return (
+            jsonify(
+                {
+                    "success": True,
+                    "publishers": [publisher.to_dict() for publisher in result.items],
+                    "pagination": result.to_dict(),
+                }
+            ),
+            200,
+        )
+
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching publishers: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -641,28 +970,32 @@ def admin_create_publisher():
     """Create new publisher"""
     try:
         from database import db
+        from models.publisher import Publisher
+        from utils.book_counts import recount_books
+        from utils.catalog import bump_catalog_version
+        from utils.helpers import parse_date
 
         data = request.get_json()
 
         if not data.get("publisher_name"):
             return jsonify({"error": "publisher_name is required"}), 400
 
-        db.session.execute(
-            db.text(
-                """
-                INSERT INTO Publisher (publisher_name, address, city, phone, email, established_date)
-                VALUES (:name, :address, :city, :phone, :email, :established)
-            """
-            ),
-            {
-                "name": data["publisher_name"],
-                "address": data.get("address"),
-                "city": data.get("city"),
-                "phone": data.get("phone"),
-                "email": data.get("email"),
-                "established": data.get("established_date"),
-            },
+        if db.session.get(Publisher, data["publisher_name"]):
+            return jsonify({"error": "Publisher already exists"}), 400
+
+        publisher = Publisher(
+            publisher_name=data["publisher_name"],
+            address=data.get("address"),
+            city=data.get("city"),
+            phone=data.get("phone"),
+            email=data.get("email"),
+            established_date=parse_date(data.get("established_date") or ""),
         )
+        db.session.add(publisher)
+        db.session.flush()
+        # Books may already carry the name
+        recount_books(publishers=[publisher.publisher_name])
+        bump_catalog_version()
         db.session.commit()
 
         return (
@@ -684,27 +1017,28 @@ def admin_update_publisher(publisher_name):
     """Update publisher details"""
     try:
         from database import db
+        from models.publisher import Publisher
+        from utils.catalog import bump_catalog_version
+        from utils.helpers import parse_date
+
+        publisher = db.session.get(Publisher, publisher_name)
+        if not publisher:
+            return jsonify({"error": "Publisher not found"}), 404
 
         data = request.get_json()
 
-        db.session.execute(
-            db.text(
-                """
-                UPDATE Publisher 
-                SET address = :address, city = :city, phone = :phone, 
-                    email = :email, established_date = :established
-                WHERE publisher_name = :name
-            """
-            ),
-            {
-                "name": publisher_name,
-                "address": data.get("address"),
-                "city": data.get("city"),
-                "phone": data.get("phone"),
-                "email": data.get("email"),
-                "established": data.get("established_date"),
-            },
-        )
+        if "address" in data:
+            publisher.address = data["address"]
+        if "city" in data:
+            publisher.city = data["city"]
+        if "phone" in data:
+            publisher.phone = data["phone"]
+        if "email" in data:
+            publisher.email = data["email"]
+        if "established_date" in data:
+            publisher.established_date = parse_date(data["established_date"] or "")
+
+        bump_catalog_version()
         db.session.commit()
 
         return (
@@ -726,11 +1060,26 @@ def admin_delete_publisher(publisher_name):
     """Delete publisher"""
     try:
         from database import db
+        from models.publisher import Publisher
+        from utils.catalog import bump_catalog_version
+
+        publisher = db.session.get(Publisher, publisher_name)
+        if not publisher:
+            return jsonify({"error": "Publisher not found"}), 404
+
+        # Its books would be left uncounted
+        if publisher.book_count:
+            return (
+                jsonify(
+                    {
+                        "error": f"Publisher still has {publisher.book_count} book(s)",
+                    }
+                ),
+                400,
+            )
 
-        db.session.execute(
-            db.text("DELETE FROM Publisher WHERE publisher_name = :name"),
-            {"name": publisher_name},
-        )
+        db.session.delete(publisher)
+        bump_catalog_version()
         db.session.commit()
 
         return (
@@ -777,6 +1126,7 @@ def admin_create_category():
     try:
         from database import db
         from models.category import Category
+        from utils.catalog import bump_catalog_version
 
         data = request.get_json()
 
@@ -789,7 +1139,12 @@ def admin_create_category():
 
         category = Category(name=data["name"], description=data.get("description"))
 
+        # Names like "Self Help" and "Self-Help" would share a URL slug
+        if Category.query.filter_by(slug=category.slug).first():
+            return jsonify({"error": "A category with this slug already exists"}), 400
+
         db.session.add(category)
+        bump_catalog_version()
         db.session.commit()
 
         return (
@@ -818,6 +1173,7 @@ def admin_update_category(category_name):
     try:
         from database import db
         from models.category import Category
+        from utils.catalog import bump_catalog_version
 
         category = Category.query.filter_by(category_name=category_name).first()
         if not category:
@@ -828,6 +1184,7 @@ def admin_update_category(category_name):
         if "description" in data:
             category.description = data["description"]
 
+        bump_catalog_version()
         db.session.commit()
 
         return (
@@ -856,12 +1213,14 @@ def admin_delete_category(category_name):
     try:
         from database import db
         from models.category import Category
+        from utils.catalog import bump_catalog_version
 
         category = Category.query.filter_by(category_name=category_name).first()
         if not category:
             return jsonify({"error": "Category not found"}), 404
 
         db.session.delete(category)
+        bump_catalog_version()
         db.session.commit()
 
         return (
@@ -886,31 +1245,31 @@ def admin_get_reviews():
     """Get all reviews"""
     try:
         from models.review import Review
-
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 20, type=int)
-
-        pagination = Review.query.order_by(Review.review_date.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        from utils.pagination import InvalidCursor, SortKey, paginate_request
+
+        result = paginate_request(
+            Review.query,
+            [
+                SortKey(Review.review_date, descending=True),
+                SortKey(Review.review_id, descending=True),
+            ],
         )
 
-        reviews = [review.to_dict() for review in pagination.items]
+        reviews = [review.to_dict() for review in result.items]
 
         return (
             jsonify(
                 {
                     "success": True,
                     "reviews": reviews,
-                    "pagination": {
-                        "page": page,
-                        "pages": pagination.pages,
-                        "total": pagination.total,
-                    },
+                    "pagination": result.to_dict(),
                 }
             ),
             200,
         )
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching reviews: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -923,12 +1282,16 @@ def admin_delete_review(review_id):
     try:
         from database import db
         from models.review import Review
+        from models.book import Book
+        from utils.catalog import bump_catalog_version
 
         review = Review.query.get(review_id)
         if not review:
             return jsonify({"error": "Review not found"}), 404
 
+        Book.adjust_rating_totals(review.book_id, -review.rating, -1)
         db.session.delete(review)
+        bump_catalog_version("inventory")
         db.session.commit()
 
         return jsonify({"success": True, "message": "Review deleted successfully"}), 200
@@ -944,8 +1307,11 @@ def admin_delete_review(review_id):
 # ==================== DASHBOARD STATS ====================
 
 
+# Dashboard aggregates are the heaviest admin reads and tolerate replica lag;
+# the admin check stays outside so authorization always reads the primary
 @admin_bp.route("/stats", methods=["GET"])
 @admin_required
+@replica_reads
 def admin_get_stats():
     """Get admin dashboard statistics"""
     try:
@@ -956,6 +1322,7 @@ def admin_get_stats():
         from models.review import Review
         from database import db
         from decimal import Decimal
+        from utils.sales import current_trend
 
         # Count statistics
         total_users = User.query.filter_by(user_type="customer").count()
@@ -978,6 +1345,14 @@ def admin_get_stats():
         # Low stock books
         low_stock_books = Book.query.filter(Book.stock_quantity < 10).all()
 
+        # Leaderboards, read off the sales counter indexes
+        bestsellers = (
+            Book.query.order_by(Book.units_sold.desc(), Book.isbn).limit(5).all()
+        )
+        top_categories = (
+            Category.query.order_by(Category.units_sold.desc()).limit(5).all()
+        )
+
         return (
             jsonify(
                 {
@@ -996,6 +1371,19 @@ def admin_get_stats():
                     "lowStockBooks": [
                         book.to_dict_simple() for book in low_stock_books
                     ],
+                    "bestsellers": [
+                        book.to_dict(("id", "title", "author", "unitsSold", "trending"))
+                        for book in bestsellers
+                    ],
+                    "topCategories": [
+                        {
+                            "id": category.id,
+                            "name": category.category_name,
+                            "unitsSold": category.units_sold,
+                            "trending": round(current_trend(category.trend_score), 2),
+                        }
+                        for category in top_categories
+                    ],
                 }
             ),
             200,
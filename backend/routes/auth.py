@@ -156,6 +156,7 @@ def update_profile():
     try:
         from database import db
         from models.user import User
+        from utils.catalog import bump_catalog_version
 
         user_id = int(get_jwt_identity())
         user = User.query.get(user_id)
@@ -169,7 +170,11 @@ def update_profile():
         if "firstName" in data or "lastName" in data:
             first_name = data.get("firstName", user.first_name)
             last_name = data.get("lastName", user.last_name)
-            user.name = f"{first_name} {last_name}"
+            name = f"{first_name} {last_name}"
+            if name != user.name:
+                user.name = name
+                # Book review listings show the name, so they are stale
+                bump_catalog_version("inventory")
 
         if "email" in data:
             # Check if email is already taken by another user
@@ -1,8 +1,87 @@
+from datetime import date
 from flask import Blueprint, request, jsonify, current_app
-from sqlalchemy import or_
+from sqlalchemy import and_, false, or_
+from database import replica_reads, use_replica
 
 books_bp = Blueprint("books", __name__)
 
+# Most ISBNs a single batch lookup may ask for
+MAX_BATCH_SIZE = 300
+BATCH_SIZE_ERROR = f"At most {MAX_BATCH_SIZE} ids can be looked up at once"
+
+# ?sort= values with an order of their own (anything else sorts by title)
+BROWSE_SORTS = (
+    "title",
+    "price-low",
+    "price-high",
+    "author",
+    "publisher",
+    "newest",
+    "bestselling",
+    "trending",
+)
+
+
+def _book_sort_keys(sort_by):
+    """Sort order for a ?sort= value, ending in the ISBN tie-breaker"""
+    from models.book import Book
+    from utils.pagination import SortKey
+
+    sort_keys = {
+        "price-low": [SortKey(Book.price)],
+        "price-high": [SortKey(Book.price, descending=True)],
+        "author": [SortKey(Book.author_name)],
+        "publisher": [SortKey(Book.publisher_name)],
+        "newest": [
+            SortKey(Book.publication_date, descending=True, null_value=date(1000, 1, 1))
+        ],
+        # Leaderboards: index scans over the sales counters (utils/sales.py)
+        "bestselling": [SortKey(Book.units_sold, descending=True)],
+        "trending": [SortKey(Book.trend_score, descending=True)],
+    }.get(sort_by, [SortKey(Book.title)])
+
+    return sort_keys + [SortKey(Book.isbn)]
+
+
+def _catalog_state(fields, sort_by=None):
+    """catalog_state() for a book payload, time-bucketed when it shows or
+    ranks by the decayed trending score"""
+    from utils.catalog import catalog_state
+    from utils.sales import trend_state
+
+    version, last_modified = catalog_state()
+    if sort_by == "trending" or (fields is not None and "trending" in fields):
+        return trend_state(version, last_modified)
+    return version, last_modified
+
+
+def _batch_isbns(ids):
+    """Distinct, stripped ISBNs in request order"""
+    return list(dict.fromkeys(str(isbn).strip() for isbn in ids if str(isbn).strip()))
+
+
+def _lookup_books(isbns, fields):
+    """Resolve a list of ISBNs with one IN query, keyed by ISBN"""
+    from models.book import Book
+    from utils.projection import load_options
+
+    query = Book.query.options(*load_options(fields)).filter(Book.isbn.in_(isbns))
+    found = {book.isbn: book.to_dict(fields) for book in (query if isbns else [])}
+
+    return {
+        "success": True,
+        "books": found,
+        "missing": [isbn for isbn in isbns if isbn not in found],
+        "count": len(found),
+    }
+
+
+@books_bp.before_request
+def read_from_replica():
+    """Catalog browsing tolerates replica lag (see database.py)"""
+    if request.method == "GET":
+        use_replica()
+
 
 @books_bp.route("", methods=["GET"])
 def get_books():
@@ -10,10 +89,24 @@ def get_books():
         from database import db
         from models.book import Book
         from models.category import Category
+        from utils.catalog import cached_json, not_modified, resolve_category
+        from utils.columnar import paginate_browse
+        from utils.facets import FACET_LIMIT, InvalidFacet, facet_counts
+        from utils.facets import parse_price_edges
+        from utils.pagination import (
+            InvalidCursor,
+            Page,
+            clamp_per_page,
+            paginate_request,
+        )
+        from utils.projection import InvalidFields, load_options, parse_fields
+        from utils.search import is_index_ready, paginate_ranked
+        from utils.search import search_books_fuzzy
+        from utils.suggest import did_you_mean
 
         # Get query parameters
         page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 12, type=int)
+        per_page = clamp_per_page(request.args.get("per_page", 12, type=int))
         category = request.args.get("category", "")
         author = request.args.get("author", "")  # NEW: Filter by author
         publisher = request.args.get("publisher", "")  # NEW: Filter by publisher
@@ -21,84 +114,135 @@ def get_books():
         sort_by = request.args.get("sort", "title")
         min_price = request.args.get("min_price", type=float)  # NEW
         max_price = request.args.get("max_price", type=float)  # NEW
+        facets = [f for f in request.args.get("facets", "").split(",") if f]
+        fields = parse_fields(
+            request.args.get("fields"), request.args.get("projection")
+        )
+        ids = request.args.get("ids")
+
+        # Revalidation against an unchanged catalog is answered before any query
+        version, last_modified = _catalog_state(fields, sort_by)
+        cached = not_modified("books", version, last_modified)
+        if cached is not None:
+            return cached
+
+        # ?ids=isbn1,isbn2 is a batch lookup rather than a listing
+        if ids is not None:
+            isbns = _batch_isbns(ids.split(","))
+            if len(isbns) > MAX_BATCH_SIZE:
+                return jsonify({"error": BATCH_SIZE_ERROR}), 400
+            return cached_json(
+                "books", version, _lookup_books(isbns, fields), last_modified
+            )
 
-        # Base query
-        query = Book.query
+        # Filter criteria, keyed by the facet they belong to so facet counts
+        # can leave out their own filter; criteria holds the same equality
+        # filters as plain values for the columnar catalog
+        filters = {}
+        criteria = {}
 
-        # Filter by category
+        # Filter by category (slug -> name from the cached map, then an
+        # index seek on category_name); an unknown slug matches nothing
         if category and category != "all":
-            # Convert slug to category name
-            category_name = category.replace("-", " ").title()
-            if category == "science-fiction":
-                category_name = "Science Fiction"
-            elif category == "self-help":
-                category_name = "Self Help"
-
-            query = query.filter_by(category_name=category_name)
+            category_name = resolve_category(category)
+            filters["category"] = (
+                Book.category_name == category_name
+                if category_name is not None
+                else false()
+            )
+            criteria["category_name"] = category_name
 
         # NEW: Filter by author
         if author:
-            query = query.filter_by(author_name=author)
+            filters["author"] = Book.author_name == author
+            criteria["author_name"] = author
 
         # NEW: Filter by publisher
         if publisher:
-            query = query.filter_by(publisher_name=publisher)
+            filters["publisher"] = Book.publisher_name == publisher
+            criteria["publisher_name"] = publisher
 
-        # Filter by search term
+        # Filter by search term; misspelt words add the corrected query's
+        # matches and a "did you mean" to the response
+        relevance = None
+        corrected = None
         if search:
-            query = query.filter(
-                or_(
-                    Book.title.contains(search),
-                    Book.author_name.contains(search),
-                    Book.publisher_name.contains(search),
+            if is_index_ready():
+                ranked, corrected = search_books_fuzzy(search)
+                relevance = {isbn: rank for rank, (isbn, _) in enumerate(ranked)}
+                filters["search"] = Book.isbn.in_(list(relevance))
+            else:
+                # Index not built yet - fall back to substring matching
+                corrected = did_you_mean(search)
+                terms = [search, corrected] if corrected else [search]
+                filters["search"] = or_(
+                    *[
+                        or_(
+                            Book.title.contains(term),
+                            Book.author_name.contains(term),
+                            Book.publisher_name.contains(term),
+                        )
+                        for term in terms
+                    ]
                 )
-            )
 
         # NEW: Filter by price range
+        price_filters = []
         if min_price is not None:
-            query = query.filter(Book.price >= min_price)
+            price_filters.append(Book.price >= min_price)
         if max_price is not None:
-            query = query.filter(Book.price <= max_price)
-
-        # Sort books
-        if sort_by == "price-low":
-            query = query.order_by(Book.price.asc())
-        elif sort_by == "price-high":
-            query = query.order_by(Book.price.desc())
-        elif sort_by == "title":
-            query = query.order_by(Book.title.asc())
-        elif sort_by == "author":  # NEW
-            query = query.order_by(Book.author_name.asc())
-        elif sort_by == "publisher":  # NEW
-            query = query.order_by(Book.publisher_name.asc())
-        elif sort_by == "newest":  # NEW
-            query = query.order_by(Book.publication_date.desc())
+            price_filters.append(Book.price <= max_price)
+        if price_filters:
+            filters["price"] = and_(*price_filters)
+
+        # Only the columns the requested fields (and the sort) read are loaded
+        sort_keys = _book_sort_keys(sort_by)
+        load = Book.query.options(
+            *load_options(fields, [key.column for key in sort_keys])
+        )
+        query = load.filter(*filters.values())
+
+        # Paginate results (keyset mode when a cursor is given)
+        if sort_by == "relevance" and relevance:
+            if request.args.get("cursor") is not None:
+                raise InvalidCursor("Cursor pagination is not supported for relevance")
+            items, total = paginate_ranked(query, relevance, page, per_page)
+            result = Page(items, per_page, page, total, page * per_page < total)
         else:
-            query = query.order_by(Book.title.asc())
-
-        # Paginate results
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-
-        books = [book.to_dict() for book in pagination.items]
+            # Browsing without a search term can be answered in-process
+            result = None
+            if not search:
+                result = paginate_browse(
+                    load, sort_keys, criteria, min_price, max_price, 12
+                )
+            if result is None:
+                result = paginate_request(query, sort_keys, 12)
+
+        books = [book.to_dict(fields) for book in result.items]
+
+        response = {
+            "success": True,
+            "books": books,
+            "pagination": result.to_dict(),
+        }
+        if corrected:
+            response["didYouMean"] = corrected
+
+        # Per-value counts for the requested facets under the current filters
+        if facets:
+            response["facets"] = facet_counts(
+                filters,
+                facets,
+                price_edges=parse_price_edges(request.args.get("price_buckets")),
+                limit=request.args.get("facet_limit", FACET_LIMIT, type=int),
+                cache_key=(category, author, publisher, search, min_price, max_price),
+                browse=None if search else (criteria, min_price, max_price),
+            )
 
-        return (
-            jsonify(
-                {
-                    "success": True,
-                    "books": books,
-                    "pagination": {
-                        "page": page,
-                        "pages": pagination.pages,
-                        "per_page": per_page,
-                        "total": pagination.total,
-                        "has_next": pagination.has_next,
-                        "has_prev": pagination.has_prev,
-                    },
-                }
-            ),
-            200,
-        )
+        return cached_json("books", version, response, last_modified)
 
+    except (InvalidCursor, InvalidFacet, InvalidFields) as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching books: {str(e)}")
         return jsonify({"error": "Failed to fetch books", "details": str(e)}), 500
@@ -109,35 +253,157 @@ def get_book(book_id):
     try:
         from database import db
         from models.book import Book
+        from utils.catalog import cached_json, not_modified
+        from utils.projection import InvalidFields, load_options, parse_fields
 
-        # book_id is the ISBN
-        book = Book.query.filter_by(isbn=book_id).first()
+        fields = parse_fields(
+            request.args.get("fields"), request.args.get("projection")
+        )
 
-        if not book:
-            # Try as integer ID for backward compatibility
-            try:
-                book = Book.query.filter_by(isbn=str(book_id)).first()
-            except:
-                pass
+        version, last_modified = _catalog_state(fields)
+        cached = not_modified("book", version, last_modified)
+        if cached is not None:
+            return cached
+
+        # book_id is the ISBN
+        book = Book.query.options(*load_options(fields)).filter_by(isbn=book_id).first()
 
         if not book:
             return jsonify({"error": "Book not found"}), 404
 
-        return jsonify({"success": True, "book": book.to_dict()}), 200
+        return cached_json(
+            "book",
+            version,
+            {"success": True, "book": book.to_dict(fields)},
+            last_modified,
+        )
 
+    except InvalidFields as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching book {book_id}: {str(e)}")
         return jsonify({"error": "Failed to fetch book", "details": str(e)}), 500
 
 
+@books_bp.route("/<book_id>/related", methods=["GET"])
+def get_related_books(book_id):
+    """Customers who bought this book also bought..."""
+    try:
+        from models.book import Book
+        from models.related import RelatedBook
+        from utils.catalog import cached_json, not_modified
+        from utils.projection import InvalidFields, load_options, parse_fields
+        from utils.related import DEFAULT_RELATED, TOP_RELATED
+
+        fields = parse_fields(
+            request.args.get("fields"), request.args.get("projection", "card")
+        )
+        limit = request.args.get("limit", DEFAULT_RELATED, type=int)
+        limit = max(1, min(limit, TOP_RELATED))
+
+        # New orders re-rank the lists and bump the inventory version
+        version, last_modified = _catalog_state(fields)
+        cached = not_modified("related", version, last_modified)
+        if cached is not None:
+            return cached
+
+        # The list is precomputed: a primary-key range read joined to the books
+        books = (
+            Book.query.options(*load_options(fields))
+            .join(RelatedBook, RelatedBook.related_id == Book.isbn)
+            .filter(RelatedBook.book_id == book_id)
+            .order_by(RelatedBook.rank)
+            .limit(limit)
+            .all()
+        )
+        if not books and not Book.query.filter_by(isbn=book_id).count():
+            return jsonify({"error": "Book not found"}), 404
+
+        return cached_json(
+            "related",
+            version,
+            {
+                "success": True,
+                "bookId": book_id,
+                "books": [book.to_dict(fields) for book in books],
+            },
+            last_modified,
+        )
+
+    except InvalidFields as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error fetching related books {book_id}: {str(e)}")
+        return (
+            jsonify({"error": "Failed to fetch related books", "details": str(e)}),
+            500,
+        )
+
+
+# POST only to carry the id list; it's a read like the GETs
+@books_bp.route("/batch", methods=["POST"])
+@replica_reads
+def get_books_batch():
+    """Look up several books by ISBN in one request"""
+    try:
+        from utils.projection import InvalidFields, parse_fields
+
+        data = request.get_json() or {}
+        ids = data.get("ids")
+        if not isinstance(ids, list):
+            return jsonify({"error": "ids must be a list of ISBNs"}), 400
+
+        isbns = _batch_isbns(ids)
+        if len(isbns) > MAX_BATCH_SIZE:
+            return jsonify({"error": BATCH_SIZE_ERROR}), 400
+
+        fields = parse_fields(data.get("fields"), data.get("projection"))
+
+        return jsonify(_lookup_books(isbns, fields)), 200
+
+    except InvalidFields as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error fetching book batch: {str(e)}")
+        return jsonify({"error": "Failed to fetch books", "details": str(e)}), 500
+
+
+@books_bp.route("/suggest", methods=["GET"])
+def get_suggestions():
+    """Typeahead: titles, authors and publishers starting with q"""
+    try:
+        from utils.suggest import DEFAULT_SUGGESTIONS, suggest
+
+        query = request.args.get("q", "").strip()
+        limit = request.args.get("limit", DEFAULT_SUGGESTIONS, type=int)
+
+        return (
+            jsonify(
+                {
+                    "success": True,
+                    "query": query,
+                    "suggestions": suggest(query, limit) if query else [],
+                }
+            ),
+            200,
+        )
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching suggestions: {str(e)}")
+        return (
+            jsonify({"error": "Failed to fetch suggestions", "details": str(e)}),
+            500,
+        )
+
+
 @books_bp.route("/categories", methods=["GET"])
 @books_bp.route("/categories/", methods=["GET"])
 def get_categories():
     try:
-        from database import db
-        from models.category import Category
+        from utils.catalog import cached_json, catalog_state, filter_snapshot
 
-        categories = Category.query.all()
+        version, filters = filter_snapshot()
+        _, last_modified = catalog_state("catalog")
 
         # Add "All Books" category
         categories_data = [
@@ -146,13 +412,14 @@ def get_categories():
                 "name": "All Books",
                 "description": "Browse all available books",
             }
-        ]
+        ] + filters["categories"]
 
-        # Convert categories to the format expected by frontend
-        for category in categories:
-            categories_data.append(category.to_dict())
-
-        return jsonify({"success": True, "categories": categories_data}), 200
+        return cached_json(
+            "categories",
+            version,
+            {"success": True, "categories": categories_data},
+            last_modified,
+        )
 
     except Exception as e:
         current_app.logger.error(f"Error fetching categories: {str(e)}")
@@ -161,21 +428,16 @@ def get_categories():
 
 @books_bp.route("/authors", methods=["GET"])
 def get_authors():
-    """Get list of all unique authors"""
+    """Authors with books, with their book counts (from the Author table)"""
     try:
-        from database import db
-        from models.book import Book
+        from utils.catalog import author_list, cached_json, catalog_state
 
-        # Get unique authors
-        authors = (
-            db.session.query(Book.author_name)
-            .distinct()
-            .order_by(Book.author_name)
-            .all()
-        )
-        author_list = [author[0] for author in authors]
+        version, authors = author_list()
+        _, last_modified = catalog_state("catalog")
 
-        return jsonify({"success": True, "authors": author_list}), 200
+        return cached_json(
+            "authors", version, {"success": True, "authors": authors}, last_modified
+        )
 
     except Exception as e:
         current_app.logger.error(f"Error fetching authors: {str(e)}")
@@ -184,21 +446,19 @@ def get_authors():
 
 @books_bp.route("/publishers", methods=["GET"])
 def get_publishers():
-    """Get list of all unique publishers"""
+    """Publishers with books, with their book counts (from the Publisher table)"""
     try:
-        from database import db
-        from models.book import Book
+        from utils.catalog import cached_json, catalog_state, publisher_list
 
-        # Get unique publishers
-        publishers = (
-            db.session.query(Book.publisher_name)
-            .distinct()
-            .order_by(Book.publisher_name)
-            .all()
-        )
-        publisher_list = [publisher[0] for publisher in publishers]
+        version, publishers = publisher_list()
+        _, last_modified = catalog_state("catalog")
 
-        return jsonify({"success": True, "publishers": publisher_list}), 200
+        return cached_json(
+            "publishers",
+            version,
+            {"success": True, "publishers": publishers},
+            last_modified,
+        )
 
     except Exception as e:
         current_app.logger.error(f"Error fetching publishers: {str(e)}")
@@ -209,62 +469,14 @@ def get_publishers():
 def get_filters():
     """Get all available filters (categories, authors, publishers, price range)"""
     try:
-        from database import db
-        from models.book import Book
-        from models.category import Category
+        from utils.catalog import cached_json, catalog_state, filter_snapshot
 
-        # Get categories
-        categories = Category.query.all()
-        category_list = [cat.to_dict() for cat in categories]
+        # Served from a snapshot that is rebuilt only after admin catalog writes
+        version, filters = filter_snapshot()
+        _, last_modified = catalog_state("catalog")
 
-        # Get unique authors
-        authors = (
-            db.session.query(Book.author_name)
-            .distinct()
-            .order_by(Book.author_name)
-            .all()
-        )
-        author_list = [author[0] for author in authors]
-
-        # Get unique publishers
-        publishers = (
-            db.session.query(Book.publisher_name)
-            .distinct()
-            .order_by(Book.publisher_name)
-            .all()
-        )
-        publisher_list = [publisher[0] for publisher in publishers]
-
-        # Get price range
-        price_range = db.session.query(
-            db.func.min(Book.price).label("min_price"),
-            db.func.max(Book.price).label("max_price"),
-        ).first()
-
-        return (
-            jsonify(
-                {
-                    "success": True,
-                    "filters": {
-                        "categories": category_list,
-                        "authors": author_list,
-                        "publishers": publisher_list,
-                        "priceRange": {
-                            "min": (
-                                float(price_range.min_price)
-                                if price_range.min_price
-                                else 0
-                            ),
-                            "max": (
-                                float(price_range.max_price)
-                                if price_range.max_price
-                                else 100
-                            ),
-                        },
-                    },
-                }
-            ),
-            200,
+        return cached_json(
+            "filters", version, {"success": True, "filters": filters}, last_modified
         )
 
     except Exception as e:
@@ -15,14 +15,17 @@ cart_bp = Blueprint("cart", __name__)
 def get_cart():
     """Get user's cart items"""
     try:
-        from models.cart import CartItem
+        from models.cart import CartView
 
         user_id = int(get_jwt_identity())
-        cart_items = CartItem.query.filter_by(user_id=user_id).all()
-
-        cart_data = [item.to_dict() for item in cart_items]
+        cart = CartView.load(user_id)
 
-        return jsonify({"success": True, "cart": cart_data}), 200
+        return (
+            jsonify(
+                {"success": True, "cart": cart.to_dict(), "summary": cart.summary()}
+            ),
+            200,
+        )
 
     except Exception as e:
         logger.error(f"Error fetching cart: {str(e)}")
@@ -37,59 +40,37 @@ def add_to_cart():
     try:
         from database import db
         from models.book import Book
-        from models.cart import CartItem
+        from models.cart import CartItem, CartView
 
         user_id = int(get_jwt_identity())
         data = request.get_json()
 
-        # Get book_id (could be integer or ISBN string)
         book_id = data.get("book_id")
         quantity = data.get("quantity", 1)
 
         if not book_id:
             return jsonify({"error": "Book ID is required"}), 400
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity < 1:
+            return jsonify({"error": "Quantity must be a positive integer"}), 400
 
-        # Find book by ID or ISBN
-        book = Book.query.filter_by(isbn=str(book_id)).first()
-        if not book:
-            # Try finding by integer ID if exists
-            try:
-                book = Book.query.get(book_id)
-            except:
-                pass
-
-        if not book:
-            return jsonify({"error": "Book not found"}), 404
+        # Cart lines are keyed by ISBN
+        book_isbn = str(book_id)
 
-        # Use ISBN as book_id for cart
-        book_isbn = book.isbn
-
-        # Check stock
-        if book.stock_quantity < quantity:
+        # Insert the line or add to it, guarded by stock, in one statement
+        if not CartItem.add_quantity(user_id, book_isbn, quantity):
+            if not db.session.get(Book, book_isbn):
+                return jsonify({"error": "Book not found"}), 404
             return jsonify({"error": "Insufficient stock"}), 400
 
-        # Check if item already exists in cart
-        cart_item = CartItem.query.filter_by(user_id=user_id, book_id=book_isbn).first()
-
-        if cart_item:
-            # Update quantity
-            new_quantity = cart_item.quantity + quantity
-            if book.stock_quantity < new_quantity:
-                return jsonify({"error": "Insufficient stock"}), 400
-            cart_item.quantity = new_quantity
-        else:
-            # Create new cart item
-            cart_item = CartItem(user_id=user_id, book_id=book_isbn, quantity=quantity)
-            db.session.add(cart_item)
-
         db.session.commit()
 
+        (cart_item,) = CartView.load(user_id, book_ids=[book_isbn]).to_dict()
         return (
             jsonify(
                 {
                     "success": True,
                     "message": "Item added to cart",
-                    "cart_item": cart_item.to_dict(),
+                    "cart_item": cart_item,
                 }
             ),
             200,
@@ -110,8 +91,7 @@ def update_cart_item():
     """Update cart item quantity"""
     try:
         from database import db
-        from models.book import Book
-        from models.cart import CartItem
+        from models.cart import CartItem, CartView
 
         user_id = int(get_jwt_identity())
         data = request.get_json()
@@ -121,32 +101,33 @@ def update_cart_item():
 
         if not book_id or quantity is None:
             return jsonify({"error": "Book ID and quantity are required"}), 400
+        if isinstance(quantity, bool) or not isinstance(quantity, int):
+            return jsonify({"error": "Quantity must be an integer"}), 400
 
-        cart_item = CartItem.query.filter_by(user_id=user_id, book_id=book_id).first()
-
-        if not cart_item:
-            return jsonify({"error": "Cart item not found"}), 404
+        line = CartItem.query.filter_by(user_id=user_id, book_id=book_id)
 
         if quantity <= 0:
             # Remove item from cart
-            db.session.delete(cart_item)
+            if not line.delete(synchronize_session=False):
+                return jsonify({"error": "Cart item not found"}), 404
             db.session.commit()
             return jsonify({"success": True, "message": "Item removed from cart"}), 200
 
-        # Check stock
-        book = Book.query.filter_by(isbn=book_id).first()
-        if book and book.stock_quantity < quantity:
+        # Set the quantity, guarded by stock, in one statement
+        if not CartItem.set_quantity(user_id, book_id, quantity):
+            if not db.session.query(line.exists()).scalar():
+                return jsonify({"error": "Cart item not found"}), 404
             return jsonify({"error": "Insufficient stock"}), 400
 
-        cart_item.quantity = quantity
         db.session.commit()
 
+        (cart_item,) = CartView.load(user_id, book_ids=[book_id]).to_dict()
         return (
             jsonify(
                 {
                     "success": True,
                     "message": "Cart updated",
-                    "cart_item": cart_item.to_dict(),
+                    "cart_item": cart_item,
                 }
             ),
             200,
@@ -160,6 +141,59 @@ def update_cart_item():
         return jsonify({"error": "Failed to update cart", "details": str(e)}), 500
 
 
+@cart_bp.route("/batch", methods=["POST"])
+@cart_bp.route("/batch/", methods=["POST"])
+@jwt_required()
+def batch_update_cart():
+    """Apply a list of add/set/remove operations in one transaction"""
+    try:
+        from database import db
+        from models.cart import CartView
+        from utils.cart_batch import (
+            InsufficientStock,
+            InvalidBatch,
+            UnknownBooks,
+            apply_cart_batch,
+            parse_operations,
+        )
+
+        user_id = int(get_jwt_identity())
+
+        try:
+            operations = parse_operations(request.get_json(silent=True))
+            apply_cart_batch(user_id, operations)
+        except InvalidBatch as e:
+            return jsonify({"error": str(e)}), 400
+        except UnknownBooks as e:
+            db.session.rollback()
+            return jsonify({"error": "Book not found", "book_ids": e.isbns}), 404
+        except InsufficientStock as e:
+            db.session.rollback()
+            return jsonify({"error": str(e), "items": e.shortfalls}), 400
+
+        db.session.commit()
+
+        cart = CartView.load(user_id)
+        return (
+            jsonify(
+                {
+                    "success": True,
+                    "message": "Cart updated",
+                    "cart": cart.to_dict(),
+                    "summary": cart.summary(),
+                }
+            ),
+            200,
+        )
+
+    except Exception as e:
+        from database import db
+
+        db.session.rollback()
+        logger.error(f"Error applying cart batch: {str(e)}")
+        return jsonify({"error": "Failed to update cart", "details": str(e)}), 500
+
+
 @cart_bp.route("/remove/<book_id>", methods=["DELETE"])
 @cart_bp.route("/remove/<book_id>/", methods=["DELETE"])
 @jwt_required()
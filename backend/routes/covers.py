@@ -0,0 +1,38 @@
+from flask import Blueprint, jsonify
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+covers_bp = Blueprint("covers", __name__)
+
+# Renditions are named after their content, so they never change
+CACHE_SECONDS = 365 * 24 * 3600
+
+
+@covers_bp.route("/<filename>", methods=["GET"])
+def get_cover(filename):
+    """A cover rendition (see utils/covers.py).
+
+    send_file() answers Range and conditional requests, hands the file to
+    the WSGI server's sendfile-backed file wrapper, or to the front-end
+    server when USE_X_SENDFILE is set.
+    """
+    try:
+        from flask import send_file
+        from utils.covers import rendition_path
+
+        path = rendition_path(filename)
+        if path is None:
+            return jsonify({"error": "Cover not found"}), 404
+
+        response = send_file(
+            path, mimetype="image/jpeg", conditional=True, max_age=CACHE_SECONDS
+        )
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    except Exception as e:
+        logger.error(f"Error serving cover {filename}: {str(e)}")
+        return jsonify({"error": "Failed to serve cover", "details": str(e)}), 500
@@ -15,38 +15,35 @@ def get_orders():
     """Get all orders for current user"""
     try:
         from models.order import Order
+        from utils.pagination import InvalidCursor, SortKey, paginate_request
 
         user_id = int(get_jwt_identity())
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 10, type=int)
-
-        # Get user's orders with pagination
-        pagination = (
-            Order.query.filter_by(user_id=user_id)
-            .order_by(Order.order_date.desc())
-            .paginate(page=page, per_page=per_page, error_out=False)
+
+        # Get user's orders with pagination (newest first)
+        result = paginate_request(
+            Order.query.filter_by(user_id=user_id),
+            [
+                SortKey(Order.order_date, descending=True),
+                SortKey(Order.order_id, descending=True),
+            ],
+            default_per_page=10,
         )
 
-        orders = [order.to_dict_simple() for order in pagination.items]
+        orders = [order.to_dict_simple() for order in result.items]
 
         return (
             jsonify(
                 {
                     "success": True,
                     "orders": orders,
-                    "pagination": {
-                        "page": page,
-                        "pages": pagination.pages,
-                        "per_page": per_page,
-                        "total": pagination.total,
-                        "has_next": pagination.has_next,
-                        "has_prev": pagination.has_prev,
-                    },
+                    "pagination": result.to_dict(),
                 }
             ),
             200,
         )
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching orders: {str(e)}")
         return jsonify({"error": "Failed to fetch orders", "details": str(e)}), 500
@@ -81,31 +78,27 @@ def get_order(order_id):
 def create_order():
     try:
         from database import db
-        from models.cart import CartItem
+        from models.cart import CartItem, CartView
         from models.order import Order, OrderItem
-        from models.book import Book
         from decimal import Decimal
+        from utils.catalog import bump_catalog_version
+        from utils.related import record_order
+        from utils.sales import record_sales
 
         user_id = int(get_jwt_identity())
         data = request.get_json()
 
         # ✅ START TRANSACTION
         with db.session.begin_nested():
-            # Get user's cart items with FOR UPDATE lock
-            cart_items = (
-                CartItem.query.filter_by(user_id=user_id).with_for_update().all()
-            )
+            # Get user's cart items and their books with FOR UPDATE lock
+            cart_items = CartView.load(user_id, lock=True).items
 
             if not cart_items:
                 return jsonify({"error": "Cart is empty"}), 400
 
             # Validate stock for all items WITH LOCK
             for cart_item in cart_items:
-                book = (
-                    Book.query.filter_by(isbn=cart_item.book_id)
-                    .with_for_update()
-                    .first()
-                )
+                book = cart_item.book
                 if not book:
                     db.session.rollback()
                     return (
@@ -142,12 +135,9 @@ def create_order():
 
             # Create order items and calculate totals
             subtotal = Decimal("0.00")
+            sales = []
             for cart_item in cart_items:
-                book = (
-                    Book.query.filter_by(isbn=cart_item.book_id)
-                    .with_for_update()
-                    .first()
-                )
+                book = cart_item.book
 
                 order_item = OrderItem(
                     book_id=cart_item.book_id,
@@ -161,6 +151,7 @@ def create_order():
 
                 # Update book stock
                 book.stock_quantity -= cart_item.quantity
+                sales.append((book.isbn, book.category_name, cart_item.quantity))
 
             # ⭐ Calculate and SET total_amount BEFORE commit
             tax_amount = subtotal * Decimal("0.08")  # 8% tax
@@ -175,9 +166,16 @@ def create_order():
             logger.info(f"   Tax: ${tax_amount}")
             logger.info(f"   Shipping: ${shipping_cost}")
 
+            # Bestseller / trending counters and "customers also bought"
+            record_sales(sales, order.order_date)
+            record_order([cart_item.book_id for cart_item in cart_items])
+
             # Clear cart
             CartItem.query.filter_by(user_id=user_id).delete()
 
+            # Stock moved, so cached book responses are stale
+            bump_catalog_version("inventory")
+
         # Commit transaction
         db.session.commit()
 
@@ -211,6 +209,9 @@ def cancel_order(order_id):
         from database import db
         from models.order import Order
         from models.book import Book
+        from utils.catalog import bump_catalog_version
+        from utils.related import record_order
+        from utils.sales import record_sales
 
         user_id = int(get_jwt_identity())
 
@@ -232,16 +233,23 @@ def cancel_order(order_id):
             )
 
         # Restore stock for all order items
+        sales = []
         for order_item in order.order_items:
             book = Book.query.filter_by(isbn=order_item.book_id).first()
             if book:
                 book.stock_quantity += order_item.quantity
+                sales.append((book.isbn, book.category_name, order_item.quantity))
                 logger.info(f"✅ Restored {order_item.quantity} units of {book.title}")
 
-        # Cancel order
+        # Cancel order, taking its sales back off the counters
         order.cancel()
+        record_sales(sales, order.order_date, -1)
+        record_order([order_item.book_id for order_item in order.order_items], -1)
         logger.info(f"✅ Order {order_id} cancelled")
 
+        # Stock moved, so cached book responses are stale
+        bump_catalog_version("inventory")
+
         db.session.commit()
 
         return (
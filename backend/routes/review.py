@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from database import use_replica
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -8,24 +9,34 @@ logger = logging.getLogger(__name__)
 reviews_bp = Blueprint("reviews", __name__)
 
 
+@reviews_bp.before_request
+def read_from_replica():
+    """Review listings tolerate replica lag; clients re-reading a review they
+    just wrote send X-Read-Primary (see database.py)"""
+    if request.method == "GET":
+        use_replica()
+
+
 @reviews_bp.route("/book/<book_id>", methods=["GET"])
 def get_book_reviews(book_id):
     """Get all reviews for a specific book"""
     try:
         from models.review import Review
+        from utils.catalog import cached_json, catalog_state
 
-        reviews = Review.get_book_reviews(book_id)
+        # Reviews, and the reviewer names shown with them, only change
+        # through writes that bump the inventory version
+        version, last_modified = catalog_state("inventory")
 
-        return (
-            jsonify(
-                {
-                    "success": True,
-                    "reviews": [review.to_dict() for review in reviews],
-                    "count": len(reviews),
-                }
-            ),
-            200,
-        )
+        def payload():
+            reviews = Review.get_book_reviews(book_id)
+            return {
+                "success": True,
+                "reviews": [review.to_dict(public=True) for review in reviews],
+                "count": len(reviews),
+            }
+
+        return cached_json("reviews", version, payload, last_modified)
 
     except Exception as e:
         logger.error(f"Error fetching reviews: {str(e)}")
@@ -66,6 +77,7 @@ def create_review():
         from database import db
         from models.review import Review
         from models.book import Book
+        from utils.catalog import bump_catalog_version
 
         user_id = int(get_jwt_identity())
         data = request.get_json()
@@ -101,6 +113,8 @@ def create_review():
         )
 
         db.session.add(review)
+        Book.adjust_rating_totals(book.isbn, rating, 1)
+        bump_catalog_version("inventory")
         db.session.commit()
 
         return (
@@ -129,6 +143,8 @@ def update_review(review_id):
     try:
         from database import db
         from models.review import Review
+        from models.book import Book
+        from utils.catalog import bump_catalog_version
 
         user_id = int(get_jwt_identity())
 
@@ -147,12 +163,15 @@ def update_review(review_id):
             rating = int(data["rating"])
             if rating < 1 or rating > 5:
                 return jsonify({"error": "Rating must be between 1 and 5"}), 400
+            if rating != review.rating:
+                Book.adjust_rating_totals(review.book_id, rating - review.rating)
             review.rating = rating
 
         # Update review text if provided
         if "review_text" in data:
             review.review_text = data["review_text"]
 
+        bump_catalog_version("inventory")
         db.session.commit()
 
         return (
@@ -181,6 +200,8 @@ def delete_review(review_id):
     try:
         from database import db
         from models.review import Review
+        from models.book import Book
+        from utils.catalog import bump_catalog_version
 
         user_id = int(get_jwt_identity())
 
@@ -192,7 +213,9 @@ def delete_review(review_id):
         if review.user_id != user_id:
             return jsonify({"error": "Unauthorized to delete this review"}), 403
 
+        Book.adjust_rating_totals(review.book_id, -review.rating, -1)
         db.session.delete(review)
+        bump_catalog_version("inventory")
         db.session.commit()
 
         return jsonify({"success": True, "message": "Review deleted successfully"}), 200
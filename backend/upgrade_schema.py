@@ -0,0 +1,198 @@
+"""
+Schema Upgrade Script for BookHaven
+Brings an existing database up to date with columns, indexes and tables that
+were added after the original DDL. Every step is idempotent, so it is safe
+to run more than once.
+Usage: python upgrade_schema.py
+"""
+
+from sqlalchemy import inspect, text
+from app import create_app
+from database import db
+from models.cart import CartItem
+from utils.book_counts import reconcile_book_counts
+from utils.sales import reconcile_sales
+
+# (table, column, column definition)
+COLUMNS = [
+    ("Book_Details", "rating_sum", "INTEGER NOT NULL DEFAULT 0"),
+    ("Book_Details", "rating_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("Book_Details", "created_at", "DATETIME NULL"),
+    ("Book_Details", "updated_at", "DATETIME NULL"),
+    ("Category", "slug", "VARCHAR(255) NULL"),
+    ("Book_Details", "units_sold", "INTEGER NOT NULL DEFAULT 0"),
+    ("Book_Details", "trend_score", "DOUBLE NOT NULL DEFAULT 0"),
+    ("Category", "units_sold", "INTEGER NOT NULL DEFAULT 0"),
+    ("Category", "trend_score", "DOUBLE NOT NULL DEFAULT 0"),
+    ("Book_Details", "cover", "VARCHAR(32) NULL"),
+    ("Author", "book_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("Publisher", "book_count", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+# (table, index name, columns, unique)
+INDEXES = [
+    # Facet counts group on these
+    ("Book_Details", "ix_Book_Details_publisher_name", ["publisher_name"], False),
+    ("Book_Details", "ix_Book_Details_price", ["price"], False),
+    ("Book_Details", "ix_Book_Details_updated_at", ["updated_at"], False),
+    # Category filter and facet
+    ("Book_Details", "ix_Book_Details_category_name", ["category_name"], False),
+    ("Category", "ix_Category_slug", ["slug"], True),
+    # Bestseller and trending leaderboards
+    ("Book_Details", "ix_Book_Details_units_sold", ["units_sold"], False),
+    ("Book_Details", "ix_Book_Details_trend_score", ["trend_score"], False),
+    (
+        "Book_Details",
+        "ix_Book_Details_category_units_sold",
+        ["category_name", "units_sold"],
+        False,
+    ),
+    (
+        "Book_Details",
+        "ix_Book_Details_category_trend_score",
+        ["category_name", "trend_score"],
+        False,
+    ),
+    ("Category", "ix_Category_units_sold", ["units_sold"], False),
+    ("Category", "ix_Category_trend_score", ["trend_score"], False),
+    # Author and publisher lists skip names without books
+    ("Author", "ix_Author_book_count", ["book_count"], False),
+    ("Publisher", "ix_Publisher_book_count", ["book_count"], False),
+    # One line per book per user; add-to-cart upserts against it
+    ("Cart", "uq_Cart_user_book", ["user_id", "book_id"], True),
+]
+
+# (description, function returning the number of rows changed) run before
+# INDEXES, for rows that would break a unique index
+DEDUPLICATIONS = [
+    ("Duplicate cart lines", CartItem.merge_duplicates),
+]
+
+
+def backfill_category_slugs():
+    """Give every category without one a unique slug"""
+    from models.category import Category, unique_category_slug
+
+    taken = {slug for (slug,) in db.session.query(Category.slug) if slug}
+    filled = 0
+    for category in Category.query.filter(Category.slug.is_(None)):
+        category.slug = unique_category_slug(category.category_name, taken)
+        filled += 1
+    db.session.flush()
+    return filled
+
+
+# (description, statement) run after the columns exist; each only touches
+# rows that still need it. A statement is SQL, or a function returning the
+# number of rows it filled.
+BACKFILLS = [
+    (
+        "Book_Details timestamps",
+        "UPDATE Book_Details "
+        "SET created_at = COALESCE(publication_date, CURRENT_TIMESTAMP), "
+        "updated_at = COALESCE(publication_date, CURRENT_TIMESTAMP) "
+        "WHERE created_at IS NULL OR updated_at IS NULL",
+    ),
+    ("Category slugs", backfill_category_slugs),
+    ("Sales counters", reconcile_sales),
+    ("Author and publisher book counts", reconcile_book_counts),
+]
+
+
+def add_missing_columns(inspector):
+    """Add any column from COLUMNS that the table doesn't have yet"""
+    added = 0
+    for table, column, definition in COLUMNS:
+        existing = {col["name"] for col in inspector.get_columns(table)}
+        if column in existing:
+            print(f"  ✅ {table}.{column}")
+            continue
+
+        db.session.execute(
+            text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        )
+        print(f"  ➕ {table}.{column} added")
+        added += 1
+    return added
+
+
+def run_deduplications():
+    """Merge rows that a new unique index would reject"""
+    merged = 0
+    for description, deduplicate in DEDUPLICATIONS:
+        count = deduplicate()
+        print(f"  {'➖' if count else '✅'} {description}: {count} row(s)")
+        merged += count
+    return merged
+
+
+def add_missing_indexes(inspector):
+    """Create any index from INDEXES that doesn't exist yet"""
+    added = 0
+    for table, name, columns, unique in INDEXES:
+        existing = {idx["name"] for idx in inspector.get_indexes(table)}
+        existing |= {con["name"] for con in inspector.get_unique_constraints(table)}
+        if name in existing:
+            print(f"  ✅ {name}")
+            continue
+
+        db.session.execute(
+            text(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} "
+                f"ON {table} ({', '.join(columns)})"
+            )
+        )
+        print(f"  ➕ {name} created")
+        added += 1
+    return added
+
+
+def run_backfills():
+    """Fill in values for rows that predate a new column"""
+    filled = 0
+    for description, statement in BACKFILLS:
+        if callable(statement):
+            count = statement()
+        else:
+            count = db.session.execute(text(statement)).rowcount
+        print(f"  {'➕' if count else '✅'} {description}: {count} row(s)")
+        filled += count
+    return filled
+
+
+def main():
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "=" * 60)
+        print("SCHEMA UPGRADE")
+        print("=" * 60)
+
+        # New tables are created from the models; existing ones are untouched
+        db.create_all()
+
+        inspector = inspect(db.engine)
+
+        print("\n📋 Columns:")
+        columns_added = add_missing_columns(inspector)
+
+        print("\n📋 Duplicates:")
+        rows_merged = run_deduplications()
+
+        print("\n📋 Indexes:")
+        indexes_added = add_missing_indexes(inspector)
+
+        print("\n📋 Backfills:")
+        rows_filled = run_backfills()
+
+        db.session.commit()
+
+        print(
+            f"\n✅ Schema up to date ({columns_added} column(s), "
+            f"{indexes_added} index(es) added, {rows_merged} duplicate(s) merged, "
+            f"{rows_filled} row(s) backfilled)"
+        )
+
+
+if __name__ == "__main__":
+    main()
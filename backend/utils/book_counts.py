@@ -0,0 +1,132 @@
+"""Book counts per author and per publisher.
+
+Books name their author and publisher as plain columns; Author.book_count
+and Publisher.book_count count the books carrying each name, so author and
+publisher lists read those small tables instead of a DISTINCT over
+Book_Details.
+
+A single book write moves the counts with UPDATE ... SET book_count =
+book_count + delta, creating the Author / Publisher row for a name not seen
+before. A bulk import can't tell which of its upserts were new books, so it
+recounts the names a batch touched instead, one indexed COUNT per name.
+reconcile_book_counts() recomputes every count, for rows that predate the
+column or are suspected to have drifted.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import func, select, update
+from database import db
+
+# Names per IN (...) list and per multi-row INSERT
+CHUNK_SIZE = 1000
+
+
+def _entities():
+    """(model, name column, Book column) for authors and publishers"""
+    from models.author import Author
+    from models.book import Book
+    from models.publisher import Publisher
+
+    return (
+        (Author, Author.author_name, Book.author_name),
+        (Publisher, Publisher.publisher_name, Book.publisher_name),
+    )
+
+
+def _create_missing(model, key, names):
+    """Insert rows for the names that have none yet; returns how many"""
+    names = sorted(set(names))
+    dialect_name = db.session.get_bind().dialect.name
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    created = 0
+    for start in range(0, len(names), CHUNK_SIZE):
+        chunk = names[start : start + CHUNK_SIZE]
+        existing = {name for (name,) in db.session.query(key).filter(key.in_(chunk))}
+        missing = [name for name in chunk if name not in existing]
+        if not missing:
+            continue
+        # Ignored if a concurrent write (or a name differing only in case
+        # under MySQL's collation) got there first
+        statement = insert(model).values(
+            [{key.key: name, "book_count": 0} for name in missing]
+        )
+        if dialect_name == "mysql":
+            statement = statement.prefix_with("IGNORE")
+        else:
+            statement = statement.on_conflict_do_nothing()
+        created += db.session.execute(statement).rowcount
+    return created
+
+
+def adjust_book_counts(before=None, after=None):
+    """Count one book write (caller commits).
+
+    before and after are the book's (author_name, publisher_name) ahead of
+    and after the write; None for a book being created or deleted.
+    """
+    for index, (model, key, _) in enumerate(_entities()):
+        deltas = defaultdict(int)
+        if before:
+            deltas[before[index]] -= 1
+        if after:
+            deltas[after[index]] += 1
+        added = [name for name, delta in deltas.items() if delta > 0]
+        if added:
+            _create_missing(model, key, added)
+        for name, delta in deltas.items():
+            if delta:
+                db.session.execute(
+                    update(model)
+                    .where(key == name)
+                    .values(book_count=model.book_count + delta),
+                    execution_options={"synchronize_session": False},
+                )
+
+
+def recount_books(authors=(), publishers=()):
+    """Recount the books of the given names, creating missing rows (caller
+    commits)"""
+    for (model, key, book_column), names in zip(_entities(), (authors, publishers)):
+        names = sorted(set(names))
+        if not names:
+            continue
+        _create_missing(model, key, names)
+        count = (
+            select(func.count())
+            .where(book_column == key)
+            .correlate(model)
+            .scalar_subquery()
+        )
+        for start in range(0, len(names), CHUNK_SIZE):
+            db.session.execute(
+                update(model)
+                .where(key.in_(names[start : start + CHUNK_SIZE]))
+                .values(book_count=count),
+                execution_options={"synchronize_session": False},
+            )
+
+
+def reconcile_book_counts():
+    """Create rows for every author and publisher named by a book and fix
+    every stored count that is off. Returns the number of rows fixed."""
+    fixed = 0
+    for model, key, book_column in _entities():
+        counts = dict(
+            db.session.query(book_column, func.count()).group_by(book_column).all()
+        )
+        _create_missing(model, key, counts)
+        for name, stored in db.session.query(key, model.book_count).all():
+            expected = counts.get(name, 0)
+            if stored == expected:
+                continue
+            db.session.execute(
+                update(model).where(key == name).values(book_count=expected),
+                execution_options={"synchronize_session": False},
+            )
+            fixed += 1
+    return fixed
@@ -0,0 +1,153 @@
+"""Batched cart changes for POST /api/cart/batch.
+
+A batch is a list of operations applied in order to the user's cart:
+
+    {"op": "add", "book_id": isbn, "quantity": n}     n more copies (default 1)
+    {"op": "set", "book_id": isbn, "quantity": n}     exactly n; 0 removes the line
+    {"op": "remove", "book_id": isbn}                 drop the line
+
+The books and cart lines of every ISBN named are read with one IN (...)
+query each and locked, the operations are folded into a final quantity per
+ISBN in memory, and the result is checked against stock before anything is
+written. Either the whole batch applies or none of it does; the caller
+commits once.
+"""
+
+from database import db
+
+OPERATIONS = ("add", "set", "remove")
+
+# Operations accepted per request, which also bounds the IN (...) lists
+MAX_OPERATIONS = 100
+
+
+class InvalidBatch(ValueError):
+    """Raised for a malformed batch or operation"""
+
+
+class UnknownBooks(LookupError):
+    """Raised when operations name ISBNs that are not in the catalog"""
+
+    def __init__(self, isbns):
+        super().__init__(f"Book not found: {', '.join(isbns)}")
+        self.isbns = isbns
+
+
+class InsufficientStock(ValueError):
+    """Raised when the batch would take lines past the stock available"""
+
+    def __init__(self, shortfalls):
+        super().__init__("Insufficient stock")
+        self.shortfalls = shortfalls
+
+
+def _quantity(operation, index, default=None):
+    quantity = operation.get("quantity", default)
+    if isinstance(quantity, bool) or not isinstance(quantity, int):
+        raise InvalidBatch(f"operations[{index}].quantity must be an integer")
+    return quantity
+
+
+def parse_operations(data):
+    """The request body as a list of (op, isbn, quantity)"""
+    operations = data.get("operations") if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        raise InvalidBatch("operations must be a non-empty list")
+    if len(operations) > MAX_OPERATIONS:
+        raise InvalidBatch(f"At most {MAX_OPERATIONS} operations per batch")
+
+    parsed = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise InvalidBatch(f"operations[{index}] must be an object")
+        op = operation.get("op")
+        if op not in OPERATIONS:
+            raise InvalidBatch(
+                f"operations[{index}].op must be one of {', '.join(OPERATIONS)}"
+            )
+        book_id = operation.get("book_id")
+        if book_id in (None, ""):
+            raise InvalidBatch(f"operations[{index}].book_id is required")
+
+        quantity = None
+        if op == "add":
+            quantity = _quantity(operation, index, default=1)
+            if quantity < 1:
+                raise InvalidBatch(f"operations[{index}].quantity must be at least 1")
+        elif op == "set":
+            quantity = _quantity(operation, index)
+            if quantity < 0:
+                raise InvalidBatch(f"operations[{index}].quantity must not be negative")
+        parsed.append((op, str(book_id), quantity))
+    return parsed
+
+
+def apply_cart_batch(user_id, operations):
+    """Apply parsed operations to the user's cart (caller commits).
+
+    Returns {isbn: final quantity} for the ISBNs the batch named.
+    """
+    from sqlalchemy.orm import load_only
+    from models.book import Book
+    from models.cart import CartItem
+
+    isbns = list(dict.fromkeys(isbn for _, isbn, _ in operations))
+
+    books = {
+        book.isbn: book
+        for book in Book.query.options(
+            load_only(Book.isbn, Book.title, Book.stock_quantity)
+        )
+        .filter(Book.isbn.in_(isbns))
+        .with_for_update()
+    }
+    missing = [isbn for isbn in isbns if isbn not in books]
+    if missing:
+        raise UnknownBooks(missing)
+
+    lines = {}
+    query = CartItem.query.filter(
+        CartItem.user_id == user_id, CartItem.book_id.in_(isbns)
+    ).order_by(CartItem.cart_id)
+    for line in query.with_for_update():
+        lines.setdefault(line.book_id, line)
+
+    before = {isbn: lines[isbn].quantity if isbn in lines else 0 for isbn in isbns}
+    quantities = dict(before)
+    for op, isbn, quantity in operations:
+        if op == "add":
+            quantities[isbn] += quantity
+        elif op == "set":
+            quantities[isbn] = quantity
+        else:
+            quantities[isbn] = 0
+
+    # Only lines the batch grows are held to the stock; lowering a line that
+    # already exceeds it (stock sold since it was added) is still allowed
+    shortfalls = [
+        {
+            "book_id": isbn,
+            "title": books[isbn].title,
+            "requested": quantities[isbn],
+            "available": books[isbn].stock_quantity,
+        }
+        for isbn in isbns
+        if quantities[isbn] > before[isbn]
+        and quantities[isbn] > books[isbn].stock_quantity
+    ]
+    if shortfalls:
+        raise InsufficientStock(shortfalls)
+
+    for isbn in isbns:
+        quantity = quantities[isbn]
+        line = lines.get(isbn)
+        if line is None:
+            if quantity:
+                db.session.add(
+                    CartItem(user_id=user_id, book_id=isbn, quantity=quantity)
+                )
+        elif not quantity:
+            db.session.delete(line)
+        elif quantity != line.quantity:
+            line.quantity = quantity
+    return quantities
@@ -0,0 +1,317 @@
+"""Catalog versioning, cached catalog artefacts and conditional responses.
+
+Two counters live in Catalog_Version:
+
+* catalog - bumped by admin writes to books, categories, authors and
+  publishers. Cached artefacts built from the catalog (the filter snapshot,
+  author and publisher lists, facet counts) are keyed on it.
+* inventory - bumped by writes that only move a book's stock or rating
+  (orders, reviews). Together with the catalog counter it versions every
+  public response that embeds book data.
+
+Writers call bump_catalog_version() in their transaction. Readers compare
+the stored version with the one their cached data was built from, so
+/api/books/filters and friends cost one primary-key read instead of four
+catalog scans, and a revalidation that matches the current version is
+answered with a 304 without querying anything else.
+
+Requests that read from a replica (database.use_replica) also read the
+version there, so data built from a lagging replica is labelled with the
+replica's version rather than cached or ETagged under a newer one.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import current_app, g, has_request_context, jsonify, make_response
+from flask import request
+from sqlalchemy import insert, update
+from database import db, read_source
+
+# Catalog_Version row per counter
+SCOPES = {"catalog": 1, "inventory": 2}
+
+# How long a worker trusts its last read of the version before re-reading
+VERSION_TTL_SECONDS = 1.0
+
+_lock = threading.Lock()
+
+
+def _cache():
+    """Per-app, per-process cache state"""
+    return current_app.extensions.setdefault(
+        "catalog_cache",
+        {"versions": {}, "snapshots": {}, "keyed": {}},
+    )
+
+
+def bump_catalog_version(scope="catalog"):
+    """Mark the catalog (or just stock/ratings) as changed (caller commits)"""
+    from models.catalog import CatalogVersion
+
+    row_id = SCOPES[scope]
+    result = db.session.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.id == row_id)
+        .values(version=CatalogVersion.version + 1, updated_at=datetime.utcnow()),
+        execution_options={"synchronize_session": False},
+    )
+    if result.rowcount == 0:
+        db.session.execute(
+            insert(CatalogVersion).values(
+                id=row_id, version=2, updated_at=datetime.utcnow()
+            )
+        )
+    _cache()["versions"].clear()
+
+
+def _versions():
+    """{row id: (version, updated_at)} as seen by the database this request
+    reads from, re-read at most every VERSION_TTL_SECONDS"""
+    from models.catalog import CatalogVersion
+
+    cache = _cache()["versions"]
+    source = read_source()
+    now = time.monotonic()
+    expires, versions = cache.get(source, (0.0, None))
+    if now >= expires:
+        rows = db.session.query(
+            CatalogVersion.id, CatalogVersion.version, CatalogVersion.updated_at
+        ).all()
+        versions = {row_id: (version, updated) for row_id, version, updated in rows}
+        cache[source] = (now + VERSION_TTL_SECONDS, versions)
+    return versions
+
+
+def catalog_version(scope="catalog"):
+    """Current version of one counter"""
+    version, _ = _versions().get(SCOPES[scope], (1, None))
+    return version
+
+
+def catalog_state(*scopes):
+    """(version tag, last modified) over the given counters (default: all).
+
+    With no scopes this covers everything a book payload shows.
+    """
+    versions = _versions()
+    current = [versions.get(SCOPES[scope], (1, None)) for scope in scopes or SCOPES]
+    tag = ".".join(str(version) for version, _ in current)
+    last_modified = max((updated for _, updated in current if updated), default=None)
+    return tag, last_modified
+
+
+def versioned(name, build):
+    """Return (version, data) for a cached catalog artefact.
+
+    build() runs only when the catalog version has moved since the artefact
+    was last built in this process.
+    """
+    version = catalog_version()
+    snapshots = _cache()["snapshots"]
+    cached = snapshots.get(name)
+    if cached is None or cached[0] != version:
+        with _lock:
+            cached = snapshots.get(name)
+            if cached is None or cached[0] != version:
+                cached = snapshots[name] = (version, build())
+    return cached
+
+
+def versioned_entry(name, key, build, max_entries=256):
+    """Like versioned(), for artefacts that depend on request arguments.
+
+    Keeps up to max_entries results per name (least recently used evicted);
+    the whole set is dropped when the catalog version moves.
+    """
+    version = catalog_version()
+    keyed = _cache()["keyed"]
+    with _lock:
+        version_entries = keyed.get(name)
+        if version_entries is None or version_entries[0] != version:
+            version_entries = keyed[name] = (version, OrderedDict())
+        entries = version_entries[1]
+        if key in entries:
+            entries.move_to_end(key)
+            return version, entries[key]
+
+    data = build()
+    with _lock:
+        entries[key] = data
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+    return version, data
+
+
+def _names_with_books(key, book_count):
+    """Names from the Author or Publisher table that have books, in order"""
+    return [
+        name for (name,) in db.session.query(key).filter(book_count > 0).order_by(key)
+    ]
+
+
+def _build_filter_data():
+    from models.author import Author
+    from models.book import Book
+    from models.category import Category
+    from models.publisher import Publisher
+
+    categories = [cat.to_dict() for cat in Category.query.all()]
+
+    # Read from the small Author / Publisher tables, whose book counts the
+    # book writes maintain (utils/book_counts.py)
+    authors = _names_with_books(Author.author_name, Author.book_count)
+    publishers = _names_with_books(Publisher.publisher_name, Publisher.book_count)
+
+    price_range = db.session.query(
+        db.func.min(Book.price).label("min_price"),
+        db.func.max(Book.price).label("max_price"),
+    ).first()
+
+    return {
+        "categories": categories,
+        "authors": authors,
+        "publishers": publishers,
+        "priceRange": {
+            "min": float(price_range.min_price) if price_range.min_price else 0,
+            "max": float(price_range.max_price) if price_range.max_price else 100,
+        },
+    }
+
+
+def filter_snapshot():
+    """Return (version, filter data), rebuilding only if the catalog moved"""
+    return versioned("filters", _build_filter_data)
+
+
+def _build_book_counts(key, book_count):
+    return [
+        {"name": name, "bookCount": count}
+        for name, count in db.session.query(key, book_count)
+        .filter(book_count > 0)
+        .order_by(key)
+    ]
+
+
+def author_list():
+    """Return (version, [{"name", "bookCount"}]) for every author with books"""
+    from models.author import Author
+
+    return versioned(
+        "authors", lambda: _build_book_counts(Author.author_name, Author.book_count)
+    )
+
+
+def publisher_list():
+    """Return (version, [{"name", "bookCount"}]) for every publisher with
+    books"""
+    from models.publisher import Publisher
+
+    return versioned(
+        "publishers",
+        lambda: _build_book_counts(Publisher.publisher_name, Publisher.book_count),
+    )
+
+
+def _build_category_slugs():
+    from models.book import Book
+    from models.category import Category, unique_category_slug
+
+    # A Category row's persisted slug wins; categories without one (or only
+    # referenced by books) get a computed slug, suffixed like the backfill
+    # so two names never share one
+    slugs = {
+        name: slug
+        for name, slug in db.session.query(Category.category_name, Category.slug)
+        if slug
+    }
+    taken = set(slugs.values())
+    names = {name for (name,) in db.session.query(Category.category_name)}
+    names.update(name for (name,) in db.session.query(Book.category_name).distinct())
+    for name in sorted(name for name in names if name and name not in slugs):
+        slugs[name] = unique_category_slug(name, taken)
+
+    return {"slugs": slugs, "names": {slug: name for name, slug in slugs.items()}}
+
+
+def category_slugs():
+    """{"slugs": {name: slug}, "names": {slug: name}} for every category"""
+    return versioned("category_slugs", _build_category_slugs)[1]
+
+
+def slug_for_category(name):
+    """The slug a category is served and resolved under"""
+    # Looked up once per request rather than once per serialised book
+    if not has_request_context():
+        slugs = category_slugs()["slugs"]
+    elif "category_slugs" in g:
+        slugs = g.category_slugs
+    else:
+        slugs = g.category_slugs = category_slugs()["slugs"]
+    slug = slugs.get(name)
+    if slug is None:
+        from models.category import category_slug
+
+        slug = category_slug(name or "")
+    return slug
+
+
+def resolve_category(slug):
+    """Category name for a URL slug, or None if no category has that slug"""
+    return category_slugs()["names"].get(slug)
+
+
+def _validators(name, version, last_modified):
+    etag = f"{name}-v{version}"
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+    return etag, last_modified
+
+
+def _with_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Shared caches may store it but must revalidate before reuse
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(name, version, last_modified=None):
+    """A bodiless 304 if the client already holds this version, else None.
+
+    If-None-Match is checked first; If-Modified-Since only when no ETag was
+    sent. Lets a handler bail out before running any query.
+    """
+    etag, last_modified = _validators(name, version, last_modified)
+    if request.if_none_match:
+        # Weak comparison, as compressed responses carry W/"<etag>"
+        fresh = request.if_none_match.contains_weak(etag)
+    else:
+        fresh = bool(
+            last_modified
+            and request.if_modified_since
+            and last_modified <= request.if_modified_since
+        )
+    if not fresh:
+        return None
+    return _with_validators(make_response("", 304), etag, last_modified)
+
+
+def cached_json(name, version, payload, last_modified=None):
+    """Respond with payload under a strong ETag for this catalog version.
+
+    If the client already holds that version a bodiless 304 is returned
+    without calling payload. payload may be a dict or a zero-argument
+    callable producing one.
+    """
+    response = not_modified(name, version, last_modified)
+    if response is not None:
+        return response
+
+    etag, last_modified = _validators(name, version, last_modified)
+    response = jsonify(payload() if callable(payload) else payload)
+    return _with_validators(response, etag, last_modified)
@@ -0,0 +1,429 @@
+"""Bulk catalog import from CSV or NDJSON.
+
+Rows are read one at a time from the source (plain or gzipped), checked with
+the utils.validators rules and written BATCH_SIZE at a time as one
+multi-row INSERT ... ON DUPLICATE KEY UPDATE (an executemany of INSERT ...
+ON CONFLICT DO UPDATE on SQLite), so a 200k-title supplier catalog takes a
+few hundred statements rather than 200k requests. Existing books keep their sales and
+rating counters, and keep their optional columns where the source leaves
+them blank. Categories, authors and publishers that don't exist yet are
+created, and the book counts of every author and publisher a batch touched
+are recounted (utils/book_counts.py).
+
+Each batch is committed together with its ImportJob's progress
+(models/catalog_import.py), so an import that fails part way is resumed by
+sending the same file again with the job id: the rows up to the checkpoint
+are skipped. Rows that fail validation are recorded with their line number
+and don't stop the import.
+
+Column names are those of POST /api/admin/books (author_name, ...) or of
+the export (author, categoryName, ...), so an export can be re-imported.
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from types import SimpleNamespace
+
+from sqlalchemy import bindparam, func, insert
+from database import db
+from utils.validators import validate_isbn, validate_price, validate_stock
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Rows per INSERT ... ON DUPLICATE KEY UPDATE and per commit
+BATCH_SIZE = 1000
+
+# Row errors stored per job; failed keeps counting past it
+MAX_STORED_ERRORS = 10_000
+
+# Book column <- accepted source keys, first non-empty one wins
+FIELDS = {
+    "isbn": ("isbn", "id"),
+    "title": ("title",),
+    "author_name": ("author_name", "author"),
+    "publisher_name": ("publisher_name", "publisher"),
+    "category_name": ("category_name", "categoryName"),
+    "price": ("price",),
+    "stock_quantity": ("stock_quantity", "stock"),
+    "publication_date": ("publication_date", "publicationDate"),
+    "pages": ("pages",),
+    "description": ("description",),
+    "image": ("image",),
+}
+REQUIRED = (
+    "isbn",
+    "title",
+    "author_name",
+    "publisher_name",
+    "category_name",
+    "price",
+    "stock_quantity",
+)
+OPTIONAL = tuple(column for column in FIELDS if column not in REQUIRED)
+UPSERT_COLUMNS = tuple(FIELDS) + ("created_at", "updated_at")
+SHORT_TEXT = ("title", "author_name", "publisher_name", "category_name", "image")
+MAX_TEXT_LENGTH = 255
+
+
+class InvalidImport(ValueError):
+    """Raised for an unknown format or a job that can't be (re)started"""
+
+
+class InvalidRow(ValueError):
+    """A source row that can't be imported; recorded against the job"""
+
+
+def text_stream(binary, gzipped=False):
+    """Decode a binary source (optionally gzipped) as UTF-8 text"""
+    if gzipped:
+        binary = gzip.GzipFile(fileobj=binary, mode="rb")
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+def read_rows(stream, format):
+    """(line number, row) for each data row of the source.
+
+    row is a dict, or None for an NDJSON line that isn't a JSON object.
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def _source_isbn(raw):
+    """The row's ISBN as given, for error reports"""
+    if not isinstance(raw, dict):
+        return None
+    value = next((raw[key] for key in FIELDS["isbn"] if raw.get(key)), None)
+    return str(value)[:32] if value is not None else None
+
+
+def validate_row(raw):
+    """Book column values for a source row; raises InvalidRow"""
+    if raw is None:
+        raise InvalidRow("Not a JSON object")
+
+    row = {}
+    for column, keys in FIELDS.items():
+        value = next((raw[key] for key in keys if raw.get(key) not in (None, "")), None)
+        if isinstance(value, str):
+            value = value.strip() or None
+        row[column] = value
+
+    missing = [column for column in REQUIRED if row[column] is None]
+    if missing:
+        raise InvalidRow(f"Missing {', '.join(missing)}")
+
+    isbn = str(row["isbn"])
+    if not validate_isbn(isbn):
+        raise InvalidRow("ISBN must be 10 or 13 digits")
+    row["isbn"] = isbn.replace("-", "").replace(" ", "")
+
+    if not validate_price(row["price"]):
+        raise InvalidRow("Price must be a number between 0 and 10000")
+    try:
+        row["price"] = Decimal(str(row["price"])).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise InvalidRow("Price must be a number between 0 and 10000")
+
+    if not validate_stock(row["stock_quantity"]):
+        raise InvalidRow("Stock must be a whole number between 0 and 100000")
+    row["stock_quantity"] = int(row["stock_quantity"])
+
+    for column in SHORT_TEXT:
+        if row[column] is not None:
+            row[column] = str(row[column])
+            if len(row[column]) > MAX_TEXT_LENGTH:
+                raise InvalidRow(
+                    f"{column} is longer than {MAX_TEXT_LENGTH} characters"
+                )
+    if row["description"] is not None:
+        row["description"] = str(row["description"])
+
+    if row["publication_date"] is not None:
+        try:
+            row["publication_date"] = date.fromisoformat(
+                str(row["publication_date"])[:10]
+            )
+        except ValueError:
+            raise InvalidRow("publication_date must be YYYY-MM-DD")
+
+    if row["pages"] is not None:
+        try:
+            row["pages"] = int(row["pages"])
+        except (TypeError, ValueError):
+            raise InvalidRow("pages must be a whole number")
+        if row["pages"] < 0:
+            raise InvalidRow("pages must be a whole number")
+
+    return row
+
+
+def _dialect_insert(dialect_name):
+    """insert() of the dialect, which has the upsert clauses"""
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _upsert_statement(dialect_name, values=None):
+    """INSERT ... ON DUPLICATE KEY UPDATE (ON CONFLICT DO UPDATE on SQLite)
+    of Book_Details, for the given rows or, without them, for executemany
+    """
+    from models.book import Book
+
+    table = Book.__table__
+    statement = _dialect_insert(dialect_name)(table)
+    if values is not None:
+        statement = statement.values(values)
+    mysql = dialect_name == "mysql"
+    new = statement.inserted if mysql else statement.excluded
+
+    # Counters and created_at are left alone; optional columns the source
+    # leaves blank keep their current value
+    updates = {column: new[column] for column in REQUIRED if column != "isbn"}
+    updates.update(
+        {column: func.coalesce(new[column], table.c[column]) for column in OPTIONAL}
+    )
+    updates["updated_at"] = new.updated_at
+
+    if mysql:
+        return statement.on_duplicate_key_update(updates)
+    return statement.on_conflict_do_update(index_elements=[table.c.isbn], set_=updates)
+
+
+@lru_cache(maxsize=8)
+def _multi_row_upsert(dialect, row_count):
+    """Compiled row_count-row upsert with <column>_<row> parameters.
+
+    SQLAlchemy never caches multi-row VALUES statements, and compiling one
+    for every batch cost more than running it, so it is compiled once per
+    batch size here.
+    """
+    from models.book import Book
+
+    # Scalar column defaults (the counters' 0) are bound into the statement,
+    # as construct_params() leaves defaults to the execution
+    defaults = {
+        column.key: column.default.arg
+        for column in Book.__table__.c
+        if column.key not in UPSERT_COLUMNS
+        and column.default is not None
+        and column.default.is_scalar
+    }
+    values = [
+        {
+            **defaults,
+            **{column: bindparam(f"{column}_{row}") for column in UPSERT_COLUMNS},
+        }
+        for row in range(row_count)
+    ]
+    return _upsert_statement(dialect.name, values).compile(dialect=dialect)
+
+
+def _upsert_books(rows):
+    """Write a batch of validated rows.
+
+    MySQL gets one multi-row statement per batch. PyMySQL's executemany
+    can't batch the INSERT ... AS new ON DUPLICATE KEY UPDATE form used
+    from MySQL 8.0.20 on and would send a statement per row; SQLite runs
+    in-process, where executemany is the faster way.
+    """
+    bind = db.session.get_bind()
+    if bind.dialect.name != "mysql":
+        db.session.execute(_upsert_statement(bind.dialect.name), rows)
+        return
+
+    compiled = _multi_row_upsert(bind.dialect, len(rows))
+    # The driver takes the rows' Python values (str, int, Decimal, date,
+    # datetime, None) as they are
+    params = compiled.construct_params(
+        {
+            f"{column}_{index}": row[column]
+            for index, row in enumerate(rows)
+            for column in UPSERT_COLUMNS
+        }
+    )
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    db.session.connection().exec_driver_sql(compiled.string, params)
+
+
+def _create_categories(names):
+    """Insert the categories that don't exist yet; returns how many"""
+    from models.category import Category, category_slug
+
+    existing = {
+        name
+        for (name,) in db.session.query(Category.category_name).filter(
+            Category.category_name.in_(names)
+        )
+    }
+    missing = sorted(set(names) - existing)
+    if not missing:
+        return 0
+
+    # Names differing only in case (or sharing a slug) with an existing
+    # category are skipped rather than failing the batch
+    dialect_name = db.session.get_bind().dialect.name
+    statement = _dialect_insert(dialect_name)(Category).values(
+        [{"category_name": name, "slug": category_slug(name)} for name in missing]
+    )
+    if dialect_name == "mysql":
+        statement = statement.prefix_with("IGNORE")
+    else:
+        statement = statement.on_conflict_do_nothing()
+    return db.session.execute(statement).rowcount
+
+
+def _import_batch(job, batch):
+    """Validate and write one batch of (line, row) pairs (caller commits)"""
+    from models.book import Book
+    from models.catalog_import import ImportRowError
+    from utils import search as search_index
+    from utils.book_counts import recount_books
+    from utils.catalog import bump_catalog_version
+    from utils.sales import move_category_sales
+
+    books = {}
+    errors = []
+    for line, raw in batch:
+        try:
+            row = validate_row(raw)
+        except InvalidRow as e:
+            errors.append(
+                {
+                    "job_id": job.job_id,
+                    "line": line,
+                    "isbn": _source_isbn(raw),
+                    "error": str(e)[:255],
+                }
+            )
+        else:
+            # A later line for the same ISBN wins, as it would across batches
+            books[row["isbn"]] = row
+
+    categories_created = 0
+    if books:
+        rows = list(books.values())
+        categories_created = _create_categories({row["category_name"] for row in rows})
+        # Names the updated books had, whose counts may drop, and their
+        # categories and sales counters, which move with a category change.
+        # Locked so no order adds to the counters before they are moved.
+        previous = (
+            db.session.query(
+                Book.author_name,
+                Book.publisher_name,
+                Book.isbn,
+                Book.category_name,
+                Book.units_sold,
+                Book.trend_score,
+            )
+            .filter(Book.isbn.in_(books))
+            .with_for_update()
+        )
+        authors = {row["author_name"] for row in rows}
+        publishers = {row["publisher_name"] for row in rows}
+        moves = []
+        for author_name, publisher_name, isbn, category_name, units, trend in previous:
+            authors.add(author_name)
+            publishers.add(publisher_name)
+            moves.append((units, trend, category_name, books[isbn]["category_name"]))
+
+        now = datetime.utcnow()
+        for row in rows:
+            row["created_at"] = now
+            row["updated_at"] = now
+        _upsert_books(rows)
+        recount_books(authors, publishers)
+        move_category_sales(moves)
+        search_index.index_books([SimpleNamespace(**row) for row in rows])
+        # Other workers' caches and typeahead indexes pick the books up from
+        # the version bump (see utils/suggest.py)
+        bump_catalog_version()
+
+    room = MAX_STORED_ERRORS - job.failed
+    if errors and room > 0:
+        db.session.execute(insert(ImportRowError), errors[:room])
+
+    job.rows_done += len(batch)
+    job.imported += len(books)
+    job.failed += len(errors)
+    job.categories_created += categories_created
+
+
+def start_job(format, source=None, job_id=None):
+    """A new ImportJob, or job_id's to resume (committed as running)"""
+    from models.catalog_import import ImportJob
+
+    if format not in FORMATS:
+        raise InvalidImport(
+            f"Unknown format: {format}. Available: {', '.join(FORMATS)}"
+        )
+
+    if job_id is None:
+        job = ImportJob(format=format, source=source)
+        db.session.add(job)
+    else:
+        job = db.session.get(ImportJob, job_id)
+        if job is None:
+            raise InvalidImport(f"No import job {job_id}")
+        if job.status == "completed":
+            raise InvalidImport(f"Import job {job_id} has already completed")
+        if job.format != format:
+            raise InvalidImport(f"Import job {job_id} is a {job.format} import")
+        job.status = "running"
+        job.message = None
+    db.session.commit()
+    return job
+
+
+def import_books(stream, job, batch_size=BATCH_SIZE, progress=None):
+    """Import the rows of a text stream under job (see start_job).
+
+    Rows already covered by job.rows_done are skipped. Each batch is
+    committed along with the job's counters, then progress(job) is called if
+    given. If a batch fails it is rolled back, the job is marked failed with
+    the error and the exception re-raised; the job can then be resumed from
+    the last committed batch.
+    """
+    rows = read_rows(stream, job.format)
+    try:
+        for _ in islice(rows, job.rows_done):
+            pass
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            _import_batch(job, batch)
+            db.session.commit()
+            if progress is not None:
+                progress(job)
+        job.status = "completed"
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        job.status = "failed"
+        job.message = str(e)[:1000]
+        db.session.commit()
+        raise
+    return job
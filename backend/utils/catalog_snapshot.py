@@ -0,0 +1,156 @@
+"""Columnar catalog snapshots shared by the web workers through mmap.
+
+Every worker process would otherwise build its own columnar catalog
+(utils.columnar) from the database and sort each order itself. Instead one
+writer (write_catalog_snapshot.py) saves the catalog, with every browse
+order precomputed, to a single file, and the workers map it read-only: the
+arrays are NumPy views straight onto the mapped pages, so the page cache
+holds one copy however many workers read it, and a worker starts without
+scanning the book table.
+
+The writer replaces the file atomically (write to a temporary file, then
+rename over it). Workers notice the new inode and map the new file;
+requests still using the old mapping keep it alive until they finish.
+
+Layout: an 8-byte magic, the header length as a little-endian uint64, a JSON
+header (versions, sync time, dictionaries, and name, dtype, length and
+offset of each array), then the raw arrays, each aligned to 64 bytes.
+"""
+
+import json
+import mmap
+import os
+import struct
+from datetime import datetime
+
+import numpy as np
+
+MAGIC = b"BOOKCOL1"
+ALIGNMENT = 64
+_LENGTH = struct.Struct("<Q")
+
+
+class InvalidSnapshot(ValueError):
+    """Raised for a file that isn't a readable catalog snapshot"""
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def identity(path):
+    """What changes when the snapshot at path is replaced; None if missing"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def write_snapshot(path, catalog, versions, synced):
+    """Save catalog and its computed orders to path, replacing it atomically.
+
+    Returns the size of the file written.
+    """
+    arrays = {"isbns": catalog.isbns, **catalog.arrays}
+    orders = []
+    for index, (signature, order) in enumerate(catalog.orders().items()):
+        arrays[f"order{index}"] = order.permutation
+        orders.append(
+            {
+                "signature": list(signature),
+                "columns": sorted(order.columns),
+                "array": f"order{index}",
+            }
+        )
+
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        arrays[name] = values
+        layout[name] = {
+            "dtype": values.dtype.str,
+            "count": len(values),
+            "offset": offset,
+        }
+        offset = _aligned(offset + values.nbytes)
+
+    header = json.dumps(
+        {
+            "versions": list(versions),
+            "synced": synced.isoformat(),
+            "dictionaries": {
+                column: list(dictionary)
+                for column, dictionary in catalog.dictionaries.items()
+            },
+            "arrays": layout,
+            "orders": orders,
+        }
+    ).encode()
+    start = _aligned(len(MAGIC) + _LENGTH.size + len(header))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as out:
+        out.write(MAGIC + _LENGTH.pack(len(header)) + header)
+        for name, values in arrays.items():
+            out.seek(start + layout[name]["offset"])
+            out.write(values.data)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(temporary, path)
+    return start + offset
+
+
+def open_snapshot(path):
+    """Map the snapshot at path; returns (catalog, versions, synced)"""
+    from utils.columnar import ColumnarCatalog, Order
+
+    with open(path, "rb") as snapshot:
+        try:
+            mapped = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # empty file
+            raise InvalidSnapshot(f"{path} is empty") from e
+
+    try:
+        if mapped[: len(MAGIC)] != MAGIC:
+            raise InvalidSnapshot(f"{path} is not a catalog snapshot")
+        (length,) = _LENGTH.unpack_from(mapped, len(MAGIC))
+        header_start = len(MAGIC) + _LENGTH.size
+        header = json.loads(mapped[header_start : header_start + length])
+        start = _aligned(header_start + length)
+
+        arrays = {
+            name: (
+                np.frombuffer(
+                    mapped,
+                    dtype=spec["dtype"],
+                    count=spec["count"],
+                    offset=start + spec["offset"],
+                )
+                if spec["count"]
+                else np.empty(0, dtype=spec["dtype"])
+            )
+            for name, spec in header["arrays"].items()
+        }
+    except (KeyError, TypeError, ValueError, struct.error) as e:
+        if isinstance(e, InvalidSnapshot):
+            raise
+        raise InvalidSnapshot(f"{path} is damaged: {e}") from e
+
+    orders = {
+        tuple(order["signature"]): Order(
+            frozenset(order["columns"]), arrays.pop(order["array"]), None
+        )
+        for order in header["orders"]
+    }
+    dictionaries = {
+        column: {value: code for code, value in enumerate(values)}
+        for column, values in header["dictionaries"].items()
+    }
+    catalog = ColumnarCatalog(arrays.pop("isbns"), arrays, dictionaries, orders)
+    return (
+        catalog,
+        tuple(header["versions"]),
+        datetime.fromisoformat(header["synced"]),
+    )
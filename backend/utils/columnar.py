@@ -0,0 +1,624 @@
+"""In-process columnar copy of the catalog for browsing the book listing.
+
+GET /api/books without a search term filters on category, author, publisher
+and price and sorts on one column plus the ISBN. With COLUMNAR_CATALOG on,
+each worker keeps those columns of every book as NumPy arrays, one row per
+book in ISBN order: price, publication date and the sales counters as
+numbers, category/author/publisher as dictionary codes. A listing is then a
+boolean mask over the filtered columns applied to a presorted permutation of
+the rows for the requested order, so the filter, the total and any page
+(OFFSET or cursor) cost a few vectorised passes instead of a query. Only
+the rows on the page are loaded from the database, by primary key.
+
+Orders on numeric columns are sorted here. Orders on text columns (title,
+author, publisher) come from the database, so they follow its collation: a
+scan of ISBNs in ORDER BY order the first time, after which books whose
+sort value changed are re-placed with one index seek each for the book now
+before them. Titles are held only as checksums, to notice when one changes.
+
+The arrays are built on first use and kept in sync like the typeahead index
+(utils.suggest): when the catalog version moves, books whose updated_at
+changed since the last sync are re-read and patched in, and deletes are
+found by comparing row counts. Every sync produces a new snapshot, so
+requests in flight keep reading a consistent one, and the orders it holds
+are patched on next use rather than rebuilt.
+
+With COLUMNAR_SNAPSHOT_PATH set, workers map the catalog, orders included,
+from a file that write_catalog_snapshot.py keeps up to date (see
+utils.catalog_snapshot) instead of each building their own, and only patch
+in what changed since it was written.
+
+Filters match values exactly. A cursor resumes after its book's current
+position; if that book has been deleted since, the request takes the SQL
+path instead. NumPy is optional: without it, or with COLUMNAR_CATALOG off,
+every listing takes the SQL path.
+"""
+
+import threading
+import zlib
+from collections import namedtuple
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import select
+from database import db
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Book columns held as numbers (with their dtypes) and as dictionary codes
+NUMERIC_COLUMNS = {
+    "price": "float64",
+    "publication_date": "int32",
+    "units_sold": "int64",
+    "trend_score": "float64",
+}
+CODED_COLUMNS = ("category_name", "author_name", "publisher_name")
+# Text columns only sorted on, held as CRC-32s to notice when they change
+# (not hash(), which differs between processes sharing a snapshot)
+HASHED_COLUMNS = ("title",)
+
+# Dates are stored as proleptic ordinals; 0 stands for NULL
+_NULL_DATE = 0
+
+# Above this many changed books a text order is re-read rather than patched
+MAX_PLACED_ROWS = 200
+
+_lock = threading.Lock()
+
+# permutation holds row indices in order; moved, when not None, holds rows
+# whose place has to be worked out again (for text orders they have been
+# taken out of the permutation, numeric orders are simply re-sorted)
+Order = namedtuple("Order", "columns permutation moved")
+
+
+def _ordinal(value):
+    return _NULL_DATE if value is None else value.toordinal()
+
+
+# How values of the numeric columns that aren't plain numbers are stored
+_CONVERTERS = {"price": float, "publication_date": _ordinal}
+
+
+def _table_keys(sort_keys):
+    """sort_keys over the bare table columns, whose rows skip the ORM's
+    per-row processing (which dominates reading a million of them)"""
+    from models.book import Book
+    from utils.pagination import SortKey
+
+    table = Book.__table__
+    return [
+        SortKey(table.c[key.column.key], key.descending, key.null_value)
+        for key in sort_keys
+    ]
+
+
+def _book_rows(*criteria, sort_keys=()):
+    """Rows of the held columns (see ColumnarCatalog.build)"""
+    from models.book import Book
+
+    table = Book.__table__
+    columns = ("isbn", *CODED_COLUMNS, *NUMERIC_COLUMNS, *HASHED_COLUMNS)
+    statement = (
+        select(*[table.c[name] for name in columns])
+        .where(*criteria)
+        .order_by(*[key.order_by for key in _table_keys(sort_keys)])
+    )
+    return db.session.execute(statement).all()
+
+
+def _isbn_dtype():
+    from models.book import Book
+
+    return f"U{Book.isbn.type.length}"
+
+
+def _is_numeric(columns):
+    return columns <= NUMERIC_COLUMNS.keys()
+
+
+def _signature(sort_keys):
+    return tuple(str(key) for key in sort_keys)
+
+
+class ColumnarCatalog:
+    """One snapshot of the browse columns.
+
+    Rows are in ISBN order, so the row index doubles as the ISBN tie-breaker
+    every listing order ends with. The arrays are never modified once the
+    snapshot is published; only its orders are filled in on demand.
+    """
+
+    def __init__(self, isbns, arrays, dictionaries, orders=None):
+        self.isbns = isbns
+        self.arrays = arrays
+        self.dictionaries = dictionaries
+        self._orders = orders if orders is not None else {}
+        self._values = {}
+
+    @classmethod
+    def build(cls, rows, dictionaries=None, sort_keys=None):
+        """Snapshot of rows as returned by _book_rows().
+
+        New values are added to (copies of) dictionaries. If the rows arrive
+        in sort_keys order, pass them to keep that order too.
+        """
+        names = ("isbn", *CODED_COLUMNS, *NUMERIC_COLUMNS, *HASHED_COLUMNS)
+        rows = list(rows)
+        columns = dict(zip(names, zip(*rows) if rows else [()] * len(names)))
+        count = len(rows)
+        isbns = np.array(columns["isbn"], dtype=_isbn_dtype())
+        by_isbn = np.argsort(isbns, kind="stable")
+
+        dictionaries = {
+            column: dict((dictionaries or {}).get(column, {}))
+            for column in CODED_COLUMNS
+        }
+        arrays = {}
+        for column in CODED_COLUMNS:
+            dictionary = dictionaries[column]
+            arrays[column] = np.fromiter(
+                (
+                    dictionary.setdefault(value, len(dictionary))
+                    for value in columns[column]
+                ),
+                dtype=np.int32,
+                count=count,
+            )
+        for column, dtype in NUMERIC_COLUMNS.items():
+            values = columns[column]
+            if column in _CONVERTERS:
+                values = map(_CONVERTERS[column], values)
+            arrays[column] = np.fromiter(values, dtype=dtype, count=count)
+        for column in HASHED_COLUMNS:
+            arrays[column] = np.fromiter(
+                (zlib.crc32(value.encode()) for value in columns[column]),
+                dtype=np.uint32,
+                count=count,
+            )
+
+        catalog = cls(
+            isbns[by_isbn],
+            {column: values[by_isbn] for column, values in arrays.items()},
+            dictionaries,
+        )
+        if sort_keys is not None:
+            arrived = np.empty(count, dtype=np.intp)
+            arrived[by_isbn] = np.arange(count)
+            catalog._orders[_signature(sort_keys)] = Order(
+                frozenset(key.column.key for key in sort_keys[:-1]), arrived, None
+            )
+        return catalog
+
+    def __len__(self):
+        return len(self.isbns)
+
+    def _lookup(self, isbns):
+        """(row indices, found mask) for an array of ISBNs"""
+        index = np.searchsorted(self.isbns, isbns)
+        found = index < len(self.isbns)
+        found[found] = self.isbns[index[found]] == isbns[found]
+        return index, found
+
+    def patched(self, rows=(), deleted=()):
+        """New snapshot with rows (new or changed books) applied and the ISBNs
+        in deleted removed"""
+        fresh = ColumnarCatalog.build(rows, self.dictionaries)
+        index, found = self._lookup(fresh.isbns)
+        at = index[found]
+
+        # Old row indices whose value changed, per column
+        arrays = dict(self.arrays)
+        changed = {}
+        for column, values in fresh.arrays.items():
+            differs = arrays[column][at] != values[found]
+            if differs.any():
+                arrays[column] = arrays[column].copy()
+                arrays[column][at] = values[found]
+                changed[column] = at[differs]
+
+        drop_index, drop_found = self._lookup(
+            np.asarray(deleted, dtype=self.isbns.dtype)
+        )
+        added = ~found
+        isbns = self.isbns
+        remap = None
+        inserted = np.empty(0, dtype=np.intp)
+        if added.any() or drop_found.any():
+            keep = np.ones(len(self), dtype=bool)
+            keep[drop_index[drop_found]] = False
+            kept = np.arange(int(keep.sum()))
+            positions = np.searchsorted(isbns[keep], fresh.isbns[added])
+            # New index of every old row (-1 once deleted) and of the new rows
+            remap = np.full(len(self), -1, dtype=np.intp)
+            remap[keep] = kept + np.searchsorted(positions, kept, side="right")
+            inserted = positions + np.arange(len(positions))
+            isbns = np.insert(isbns[keep], positions, fresh.isbns[added])
+            arrays = {
+                column: np.insert(values[keep], positions, fresh.arrays[column][added])
+                for column, values in arrays.items()
+            }
+
+        orders = {}
+        for signature, order in self._orders.items():
+            moved = [changed[column] for column in order.columns if column in changed]
+            if order.moved is not None:
+                moved.append(order.moved)
+            moved = np.unique(np.concatenate(moved)) if moved else None
+            permutation = order.permutation
+            if remap is not None:
+                permutation = remap[permutation]
+                permutation = permutation[permutation >= 0]
+                if moved is not None:
+                    moved = remap[moved]
+                    moved = moved[moved >= 0]
+                moved = inserted if moved is None else np.union1d(moved, inserted)
+                if _is_numeric(order.columns):
+                    permutation = np.concatenate([permutation, inserted])
+            if moved is not None and not len(moved):
+                moved = None
+            if moved is not None and not _is_numeric(order.columns):
+                permutation = permutation[~np.isin(permutation, moved)]
+            orders[signature] = Order(order.columns, permutation, moved)
+
+        return ColumnarCatalog(isbns, arrays, fresh.dictionaries, orders)
+
+    def _sort_values(self, key):
+        values = self.arrays[key.column.key]
+        if key.null_value is not None:
+            values = np.where(values == _NULL_DATE, _ordinal(key.null_value), values)
+        return -values if key.descending else values
+
+    def order(self, sort_keys):
+        """Row indices in sort_keys order (the last key being the ISBN)"""
+        signature = _signature(sort_keys)
+        order = self._orders.get(signature)
+        if order is not None and order.moved is None:
+            return order.permutation
+
+        columns = frozenset(key.column.key for key in sort_keys[:-1])
+        if _is_numeric(columns):
+            keys = [self._sort_values(key) for key in reversed(sort_keys[:-1])]
+            if order is None:
+                permutation = np.lexsort([np.arange(len(self))] + keys)
+            else:
+                # Still nearly in order, which the merge sort behind lexsort
+                # runs through quickly
+                previous = order.permutation
+                permutation = previous[
+                    np.lexsort([previous] + [values[previous] for values in keys])
+                ]
+        elif order is None or len(order.moved) > MAX_PLACED_ROWS:
+            permutation = self._database_order(sort_keys)
+        else:
+            permutation = self._place(sort_keys, order.permutation, order.moved)
+
+        self._orders[signature] = Order(columns, permutation, None)
+        return permutation
+
+    def _database_order(self, sort_keys):
+        """Rows in the order the database sorts them (its collation decides
+        text orders); books it doesn't return are left out"""
+        from models.book import Book
+
+        statement = select(Book.__table__.c.isbn).order_by(
+            *[key.order_by for key in _table_keys(sort_keys)]
+        )
+        isbns = np.array(db.session.scalars(statement).all(), dtype=self.isbns.dtype)
+        index, found = self._lookup(isbns)
+        return index[found]
+
+    def _place(self, sort_keys, permutation, moved):
+        """Insert the moved rows into a database-sorted permutation, each
+        after the book the database now sorts just before it"""
+        from models.book import Book
+        from utils.pagination import SortKey, seek_after
+
+        moved_isbns = self.isbns[moved].tolist()
+        rows = (
+            db.session.query(*[key.column for key in sort_keys])
+            .filter(Book.isbn.in_(moved_isbns))
+            .order_by(*[key.order_by for key in sort_keys])
+            .all()
+        )
+        backwards = [
+            SortKey(key.column, not key.descending, key.null_value) for key in sort_keys
+        ]
+        placed = np.full(len(self), -1, dtype=np.intp)
+        placed[permutation] = np.arange(len(permutation))
+
+        isbns = []
+        previous = []
+        for row in rows:
+            isbns.append(row.isbn)
+            values = [key.value_of(row) for key in sort_keys]
+            previous.append(
+                db.session.query(Book.isbn)
+                .filter(seek_after(backwards, values), Book.isbn.notin_(moved_isbns))
+                .order_by(*[key.order_by for key in backwards])
+                .limit(1)
+                .scalar()
+            )
+
+        index, found = self._lookup(np.array(isbns, dtype=self.isbns.dtype))
+        before, before_found = self._lookup(
+            np.array([isbn or "" for isbn in previous], dtype=self.isbns.dtype)
+        )
+        first = np.array([isbn is None for isbn in previous], dtype=bool)
+        if found.all() and (first | before_found).all():
+            after = placed[np.where(first, 0, before)]
+            if not (after[~first] < 0).any():
+                return np.insert(permutation, np.where(first, 0, after + 1), index)
+        # The database is ahead of this snapshot; take its order as is
+        return self._database_order(sort_keys)
+
+    def mask(self, criteria, min_price=None, max_price=None):
+        """Boolean mask of the rows matching the filters, None when nothing
+        is filtered out.
+
+        criteria maps coded column names to the value they must equal.
+        """
+        mask = None
+        for column, value in criteria.items():
+            code = self.dictionaries[column].get(value)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            matches = self.arrays[column] == code
+            mask = matches if mask is None else mask & matches
+        price = self.arrays["price"]
+        if min_price is not None:
+            matches = price >= min_price
+            mask = matches if mask is None else mask & matches
+        if max_price is not None:
+            matches = price <= max_price
+            mask = matches if mask is None else mask & matches
+        return mask
+
+    def select(self, sort_keys, criteria, min_price=None, max_price=None):
+        """(rows, positions) of the books matching the filters (see mask), in
+        order.
+
+        positions are the rows' places in the full order (None when nothing
+        is filtered out), for seeking past a cursor.
+        """
+        mask = self.mask(criteria, min_price, max_price)
+        if mask is not None and not mask.any():
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+
+        permutation = self.order(sort_keys)
+        if mask is None:
+            return permutation, None
+        positions = np.flatnonzero(mask[permutation])
+        return permutation[positions], positions
+
+    def _value_order(self, column):
+        """(values by code, each code's place in value order) of a coded
+        column, NULL placed last"""
+        cached = self._values.get(column)
+        if cached is None:
+            dictionary = self.dictionaries[column]
+            values = [None] * len(dictionary)
+            for value, code in dictionary.items():
+                values[code] = value
+            places = np.empty(len(values), dtype=np.intp)
+            places[
+                sorted(
+                    range(len(values)),
+                    key=lambda code: (values[code] is None, values[code] or ""),
+                )
+            ] = np.arange(len(values))
+            cached = self._values[column] = (values, places)
+        return cached
+
+    def value_counts(self, column, mask, limit):
+        """[(value, books)] of a coded column over the rows in mask (None for
+        all), most frequent first and then by value (in code point order,
+        not the database collation's); NULLs are left out"""
+        dictionary = self.dictionaries[column]
+        codes = self.arrays[column] if mask is None else self.arrays[column][mask]
+        counts = np.bincount(codes, minlength=len(dictionary))
+        if None in dictionary:
+            counts[dictionary[None]] = 0
+
+        values, places = self._value_order(column)
+        present = np.flatnonzero(counts)
+        top = present[np.lexsort((places[present], -counts[present]))[:limit]]
+        return [(values[code], int(counts[code])) for code in top]
+
+    def price_counts(self, mask, edges):
+        """Books per price bucket over the rows in mask (None for all); edges
+        are the buckets' ascending lower bounds, the last bucket open-ended"""
+        prices = self.arrays["price"] if mask is None else self.arrays["price"][mask]
+        below = [int(np.count_nonzero(prices < edge)) for edge in edges]
+        below.append(len(prices))
+        return [below[index + 1] - below[index] for index in range(len(edges))]
+
+    def rank(self, sort_keys, isbn):
+        """Place of a book in the full sort_keys order, None if not held"""
+        index, found = self._lookup(np.array([isbn], dtype=self.isbns.dtype))
+        if not found[0]:
+            return None
+        place = np.flatnonzero(self.order(sort_keys) == index[0])
+        return int(place[0]) if len(place) else None
+
+    def orders(self):
+        """{signature: Order} of the orders computed so far"""
+        return {
+            signature: order
+            for signature, order in self._orders.items()
+            if order.moved is None
+        }
+
+    def nbytes(self):
+        """Memory held by the columns (dictionaries and orders excluded)"""
+        return self.isbns.nbytes + sum(a.nbytes for a in self.arrays.values())
+
+
+def enabled():
+    return np is not None and current_app.config.get("COLUMNAR_CATALOG", False)
+
+
+def _sync(state, versions):
+    """Patch in the books that changed since the catalog was last synced"""
+    from models.book import Book
+    from utils.suggest import SYNC_OVERLAP
+
+    synced = datetime.utcnow()
+    changed = _book_rows(Book.__table__.c.updated_at >= state["synced"] - SYNC_OVERLAP)
+    catalog = state["catalog"].patched(changed)
+
+    # Deletes leave nothing to find by updated_at, and only admin (catalog)
+    # writes delete books
+    if versions[0] != state["versions"][0]:
+        total = db.session.query(db.func.count(Book.isbn)).scalar()
+        if total != len(catalog):
+            # Both sides are in ISBN order, so a binary search finds the gaps
+            isbn = Book.__table__.c.isbn
+            existing = np.array(
+                db.session.scalars(select(isbn).order_by(isbn)).all(),
+                dtype=catalog.isbns.dtype,
+            )
+            index = np.searchsorted(existing, catalog.isbns)
+            gone = index >= len(existing)
+            gone[~gone] = existing[index[~gone]] != catalog.isbns[~gone]
+            catalog = catalog.patched(deleted=catalog.isbns[gone])
+
+    state.update(catalog=catalog, versions=versions, synced=synced)
+
+
+def _replaced(state, path):
+    from utils.catalog_snapshot import identity
+
+    current = identity(path)
+    return current is not None and current != state["snapshot"]
+
+
+def _load(path, versions, sort_keys):
+    """Fresh state: mapped from the snapshot at path if there is a usable
+    one, otherwise built from the database"""
+    from utils.catalog_snapshot import InvalidSnapshot, identity, open_snapshot
+
+    snapshot = identity(path) if path else None
+    if snapshot is not None:
+        try:
+            catalog, snapshot_versions, synced = open_snapshot(path)
+            return {
+                "catalog": catalog,
+                "versions": snapshot_versions,
+                "synced": synced,
+                "snapshot": snapshot,
+            }
+        except (OSError, InvalidSnapshot) as e:
+            # Remembered as this state's snapshot, so it isn't retried
+            current_app.logger.warning(f"Ignoring catalog snapshot: {str(e)}")
+
+    synced = datetime.utcnow()
+    rows = _book_rows(sort_keys=sort_keys or ())
+    return {
+        "catalog": ColumnarCatalog.build(rows, sort_keys=sort_keys),
+        "versions": versions,
+        "synced": synced,
+        "snapshot": snapshot,
+    }
+
+
+def get_catalog(sort_keys=None):
+    """This worker's columnar catalog, synced to the catalog version; None
+    when the engine is off.
+
+    It is mapped from COLUMNAR_SNAPSHOT_PATH when that file exists (and
+    re-mapped whenever the file is replaced), otherwise built from the
+    database on first use, reading the books in sort_keys order, if given,
+    so that order comes without another scan.
+    """
+    from utils.catalog import catalog_version
+
+    if not enabled():
+        return None
+
+    versions = (catalog_version("catalog"), catalog_version("inventory"))
+    path = current_app.config.get("COLUMNAR_SNAPSHOT_PATH")
+    state = current_app.extensions.get("columnar_catalog")
+    if state is None or (path and _replaced(state, path)):
+        with _lock:
+            state = current_app.extensions.get("columnar_catalog")
+            if state is None or (path and _replaced(state, path)):
+                state = _load(path, versions, sort_keys)
+                current_app.extensions["columnar_catalog"] = state
+    if state["versions"] != versions:
+        with _lock:
+            if state["versions"] != versions:
+                _sync(state, versions)
+    return state["catalog"]
+
+
+def publish_snapshot(path, sort_orders=()):
+    """Sync this process's catalog, compute the given orders (lists of sort
+    keys) and write it all to path for the workers to map.
+
+    Returns (versions written, file size).
+    """
+    from utils.catalog_snapshot import write_snapshot
+
+    catalog = get_catalog()
+    state = current_app.extensions["columnar_catalog"]
+    for sort_keys in sort_orders:
+        catalog.order(sort_keys)
+    size = write_snapshot(path, catalog, state["versions"], state["synced"])
+    return state["versions"], size
+
+
+def paginate_browse(
+    query, sort_keys, criteria, min_price=None, max_price=None, default_per_page=12
+):
+    """paginate_request() for a browse listing, answered from the columnar
+    catalog.
+
+    query loads the page's books by ISBN (it should carry the listing's load
+    options, not its filters, which the catalog has applied already).
+    Returns None when the engine is off or can't answer, and the caller
+    queries the database instead.
+    """
+    from models.book import Book
+    from utils.pagination import Page, decode_cursor, encode_cursor
+    from utils.pagination import page_args
+
+    catalog = get_catalog(sort_keys)
+    if catalog is None:
+        return None
+
+    args = page_args(default_per_page)
+    per_page = args["per_page"]
+    rows, positions = catalog.select(sort_keys, criteria, min_price, max_price)
+
+    page = None
+    start = 0
+    if args["cursor"] is None:
+        page = max(args["page"], 1)
+        start = (page - 1) * per_page
+    elif args["cursor"]:
+        rank = catalog.rank(sort_keys, decode_cursor(sort_keys, args["cursor"])[-1])
+        if rank is None:
+            return None
+        start = (
+            rank + 1
+            if positions is None
+            else int(np.searchsorted(positions, rank, side="right"))
+        )
+
+    window = rows[start : start + per_page + 1]
+    isbns = catalog.isbns[window[:per_page]].tolist()
+    books = (
+        {book.isbn: book for book in query.filter(Book.isbn.in_(isbns))}
+        if isbns
+        else {}
+    )
+    items = [books[isbn] for isbn in isbns if isbn in books]
+
+    has_next = len(window) > per_page
+    next_cursor = encode_cursor(sort_keys, items[-1]) if has_next and items else None
+    total = len(rows) if args["with_total"] else None
+    return Page(items, per_page, page, total, has_next, next_cursor)
@@ -0,0 +1,148 @@
+"""Response compression for the JSON API.
+
+init_compression(app) registers an after_request hook that compresses
+JSON/text bodies of at least COMPRESS_MIN_SIZE bytes with the best coding
+the client accepts: brotli or zstd when the Brotli / zstandard packages are
+installed, gzip always. Smaller bodies gain little and cost a round of CPU,
+so they are sent as they are.
+
+Responses carrying an ETag (cached_json() catalog responses) are the same
+bytes for every client until the catalog changes, so their compressed
+bodies are kept in a per-process LRU cache keyed by ETag, URL and coding,
+and a hot page is compressed once per catalog version instead of once per
+hit. A compressed response's ETag is made weak, as a strong one would
+promise byte-identical content across codings; If-None-Match compares
+weakly, so revalidation still works.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/plain",
+}
+
+# Fast settings: the payloads are small and compressed on the request path
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+# Coding preference when the client accepts several. Brotli compresses a
+# little tighter but zstd is several times cheaper (benchmarks/compression.py),
+# so brotli is preferred only where the result is cached
+CACHED_PREFERENCE = ("br", "zstd", "gzip")
+UNCACHED_PREFERENCE = ("zstd", "br", "gzip")
+
+
+def _encoders():
+    """Available codings by name"""
+    encoders = {}
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        encoders["zstd"] = compressor.compress
+    encoders["gzip"] = lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0)
+    return encoders
+
+
+class CompressedCache:
+    """Least recently used compressed bodies, bounded by their total size"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+def compress_response(response, encoders, cache, min_size):
+    """Compress response in place if it and the request allow it"""
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_TYPES
+    ):
+        return response
+
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+
+    # Shared caches must keep the identity and compressed variants apart
+    response.vary.add("Accept-Encoding")
+    etag, _ = response.get_etag()
+    preference = CACHED_PREFERENCE if etag else UNCACHED_PREFERENCE
+    encoding = request.accept_encodings.best_match(
+        [coding for coding in preference if coding in encoders]
+    )
+    if encoding is None:
+        return response
+
+    key = (etag, request.full_path, encoding)
+    compressed = cache.get(key) if etag else None
+    if compressed is None:
+        compressed = encoders[encoding](body)
+        if etag:
+            cache.put(key, compressed)
+    if len(compressed) >= len(body):
+        return response
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Compress eligible responses of app (see the module docstring)"""
+    encoders = _encoders()
+    cache = CompressedCache(app.config["COMPRESS_CACHE_SIZE"])
+    min_size = app.config["COMPRESS_MIN_SIZE"]
+    app.extensions["compression"] = {"encoders": encoders, "cache": cache}
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, encoders, cache, min_size)
@@ -0,0 +1,187 @@
+"""Uploaded book covers, resized once and served as immutable files.
+
+An upload is named after a hash of its content and kept as it came; the
+renditions in COVER_SIZES (grid thumbnail, card, book page) are made from it
+in a background thread pool, so the upload request returns as soon as the
+original is on disk. Renditions are JPEGs named <digest>-<width>x<height>.jpg:
+the name changes whenever the picture (or the size table) does, so they are
+served with a year-long immutable Cache-Control and never revalidated. A
+rendition asked for before the pool has made it, or by a worker process that
+didn't receive the upload, is made in that request.
+
+Book.cover holds the digest. cover_url() picks the rendition for a payload
+(see the image fields of Book.SERIALIZER) and falls back to the book's
+external image URL when it has no uploaded cover.
+
+Resizing needs Pillow; without it uploads are refused and books keep their
+external image URLs.
+"""
+
+import hashlib
+import io
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# Rendition name -> bounding box; covers keep their aspect ratio inside it
+COVER_SIZES = {
+    "thumbnail": (96, 144),
+    "card": (300, 450),
+    "detail": (600, 900),
+}
+JPEG_QUALITY = 85
+
+# Hex characters of the SHA-256 used in file names
+DIGEST_LENGTH = 32
+
+_RENDITION = re.compile(r"([0-9a-f]{%d})-(\d+)x(\d+)\.jpg" % DIGEST_LENGTH)
+
+_executor = None
+_pending = {}
+_lock = threading.Lock()
+
+
+class InvalidCover(ValueError):
+    """Raised for an upload that isn't a usable cover image"""
+
+
+def enabled():
+    return Image is not None
+
+
+def cover_folder():
+    return os.path.join(current_app.config["UPLOAD_FOLDER"], "covers")
+
+
+def rendition_name(digest, size):
+    width, height = COVER_SIZES[size]
+    return f"{digest}-{width}x{height}.jpg"
+
+
+def cover_url(cover, image, size):
+    """URL of a book's cover at size, or its external image URL"""
+    if not cover:
+        return image
+    return f"{current_app.config['COVER_URL_PREFIX']}/{rendition_name(cover, size)}"
+
+
+def _original(folder, digest):
+    """Path of the stored upload for digest, None if there is none"""
+    for extension in current_app.config["ALLOWED_EXTENSIONS"]:
+        path = os.path.join(folder, f"{digest}.{extension}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _write(path, data):
+    """Write data to path atomically, so readers never see a partial file"""
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "wb") as out:
+        out.write(data)
+    os.replace(temporary, path)
+
+
+def _render(original, path, box):
+    with Image.open(original) as image:
+        # Lets the JPEG decoder downscale while decoding
+        image.draft("RGB", box)
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        image.thumbnail(box, Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    _write(path, out.getvalue())
+
+
+def _render_all(folder, digest, original):
+    for size, box in COVER_SIZES.items():
+        path = os.path.join(folder, rendition_name(digest, size))
+        if not os.path.exists(path):
+            _render(original, path, box)
+
+
+def _submit(folder, digest, original):
+    """Queue the renditions of digest on the pool; returns their future"""
+    global _executor
+
+    with _lock:
+        future = _pending.get(digest)
+        if future is None:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=current_app.config["COVER_WORKERS"],
+                    thread_name_prefix="covers",
+                )
+            future = _pending[digest] = _executor.submit(
+                _render_all, folder, digest, original
+            )
+            future.add_done_callback(lambda _: _pending.pop(digest, None))
+    return future
+
+
+def save_cover(upload):
+    """Store an uploaded cover (a werkzeug FileStorage) and queue its
+    renditions; returns its digest"""
+    from utils.helpers import allowed_file
+
+    if not enabled():
+        raise InvalidCover("Cover uploads need Pillow, which isn't installed")
+    if not upload or not upload.filename:
+        raise InvalidCover("No cover file was uploaded")
+    allowed = current_app.config["ALLOWED_EXTENSIONS"]
+    if not allowed_file(upload.filename, allowed):
+        raise InvalidCover(f"Cover must be one of: {', '.join(sorted(allowed))}")
+
+    data = upload.read()
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise InvalidCover(f"Not a readable image: {str(e)}") from e
+
+    digest = hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+    folder = cover_folder()
+    os.makedirs(folder, exist_ok=True)
+    original = _original(folder, digest)
+    if original is None:
+        extension = upload.filename.rsplit(".", 1)[1].lower()
+        original = os.path.join(folder, f"{digest}.{extension}")
+        _write(original, data)
+
+    _submit(folder, digest, original)
+    return digest
+
+
+def rendition_path(filename):
+    """Path of the rendition named filename, made now if the pool hasn't
+    yet; None for a name that isn't a current rendition of a stored cover"""
+    match = _RENDITION.fullmatch(filename)
+    if not match or tuple(map(int, match.group(2, 3))) not in COVER_SIZES.values():
+        return None
+
+    folder = cover_folder()
+    path = os.path.join(folder, filename)
+    if os.path.exists(path):
+        return path
+
+    digest = match.group(1)
+    original = _original(folder, digest)
+    if original is None or not enabled():
+        return None
+    _submit(folder, digest, original).result()
+    return path
@@ -0,0 +1,198 @@
+"""Faceted counts for the book listing.
+
+GET /api/books?facets=category,author,publisher,price returns, next to the
+page of books, how many books each facet value would match. Every facet is
+one aggregate query (a grouped COUNT(*), or conditional counts over the
+bucket edges for the price histogram), so the cost is one query per
+requested facet rather than one per value. Listings without a search term
+are counted from the columnar catalog (utils.columnar) instead when it is
+on, with no query at all.
+
+Facets are disjunctive: a facet's counts apply every active filter except
+its own, so selecting one author still shows the counts for the others.
+Results only change with the catalog, so they are cached per catalog version
+and filter set.
+"""
+
+from sqlalchemy import case, func
+
+from database import db
+
+FACET_COLUMNS = {
+    "category": "category_name",
+    "author": "author_name",
+    "publisher": "publisher_name",
+}
+FACET_NAMES = (*FACET_COLUMNS, "price")
+
+# Values returned per facet, most frequent first
+FACET_LIMIT = 50
+MAX_FACET_LIMIT = 500
+
+# Lower edges of the price histogram buckets; the last bucket is open-ended
+DEFAULT_PRICE_EDGES = (0, 10, 20, 30, 50)
+MAX_PRICE_BUCKETS = 20
+
+
+class InvalidFacet(ValueError):
+    """Raised for an unknown facet name or malformed facet arguments"""
+
+
+def parse_price_edges(value):
+    """Parse price_buckets=0,10,25 into sorted, distinct bucket edges"""
+    if not value:
+        return DEFAULT_PRICE_EDGES
+    try:
+        edges = sorted({float(edge) for edge in value.split(",") if edge.strip()})
+    except ValueError:
+        raise InvalidFacet("price_buckets must be a comma-separated list of numbers")
+    if not edges or len(edges) > MAX_PRICE_BUCKETS:
+        raise InvalidFacet(f"price_buckets takes 1 to {MAX_PRICE_BUCKETS} edges")
+    if edges[0] < 0:
+        raise InvalidFacet("price_buckets edges must not be negative")
+    return tuple(edges)
+
+
+def _values(facet, rows):
+    """Facet values from (value, count) rows"""
+    from utils.catalog import slug_for_category
+
+    if facet == "category":
+        return [
+            {"id": slug_for_category(value), "name": value, "count": n}
+            for value, n in rows
+        ]
+    return [{"value": value, "count": n} for value, n in rows]
+
+
+def _buckets(edges, counts):
+    """Price histogram from the count of books per bucket"""
+    return [
+        {
+            "min": lower,
+            "max": edges[index + 1] if index + 1 < len(edges) else None,
+            "count": counts[index],
+        }
+        for index, lower in enumerate(edges)
+    ]
+
+
+def _value_counts(facet, criteria, limit):
+    from models.book import Book
+
+    column = getattr(Book, FACET_COLUMNS[facet])
+    count = func.count().label("count")
+    rows = (
+        db.session.query(column, count)
+        .filter(*criteria)
+        .filter(column.isnot(None))
+        .group_by(column)
+        .order_by(count.desc(), column)
+        .limit(limit)
+        .all()
+    )
+    return _values(facet, rows)
+
+
+def _price_histogram(criteria, edges):
+    from models.book import Book
+
+    # One aggregate row of running counts (books under each upper edge, then
+    # all books), differenced into buckets; cheaper than GROUP BY on a CASE
+    below = (
+        db.session.query(
+            *[func.count(case((Book.price < upper, 1))) for upper in edges[1:]],
+            func.count(),
+        )
+        .filter(*criteria)
+        .filter(Book.price >= edges[0])
+        .one()
+    )
+    return _buckets(
+        edges,
+        [
+            below[index] - (below[index - 1] if index else 0)
+            for index in range(len(edges))
+        ],
+    )
+
+
+def _browse_facets(catalog, browse, names, price_edges, limit):
+    """compute_facets() from the columnar catalog: one mask and one bincount
+    per facet over the in-process arrays"""
+    criteria, min_price, max_price = browse
+    facets = {}
+    for name in names:
+        if name == "price":
+            counts = catalog.price_counts(catalog.mask(criteria), price_edges)
+            facets[name] = _buckets(price_edges, counts)
+        else:
+            column = FACET_COLUMNS[name]
+            others = {key: value for key, value in criteria.items() if key != column}
+            mask = catalog.mask(others, min_price, max_price)
+            facets[name] = _values(name, catalog.value_counts(column, mask, limit))
+    return facets
+
+
+def compute_facets(
+    filters, names, price_edges=DEFAULT_PRICE_EDGES, limit=FACET_LIMIT, browse=None
+):
+    """Count books per value of each named facet.
+
+    filters maps a facet name ("category", "author", "publisher", "price",
+    or any other key such as "search") to the SQL criterion it contributes.
+    browse is the same filter set as the columnar catalog takes it,
+    (criteria, min_price, max_price), for a listing without a search term;
+    with COLUMNAR_CATALOG on the counts then come from the catalog's arrays
+    instead of the database.
+    """
+    if browse is not None:
+        from utils.columnar import get_catalog
+
+        catalog = get_catalog()
+        if catalog is not None:
+            return _browse_facets(catalog, browse, names, price_edges, limit)
+
+    facets = {}
+    for name in names:
+        criteria = [criterion for key, criterion in filters.items() if key != name]
+        if name == "price":
+            facets[name] = _price_histogram(criteria, price_edges)
+        else:
+            facets[name] = _value_counts(name, criteria, limit)
+    return facets
+
+
+def facet_counts(
+    filters,
+    names,
+    price_edges=DEFAULT_PRICE_EDGES,
+    limit=FACET_LIMIT,
+    cache_key=None,
+    browse=None,
+):
+    """Validated, cached compute_facets().
+
+    cache_key identifies the filter set (normally the normalised request
+    arguments); without one the counts are computed every time.
+    """
+    from utils.catalog import versioned_entry
+
+    unknown = [name for name in names if name not in FACET_NAMES]
+    if unknown:
+        raise InvalidFacet(
+            f"Unknown facet(s): {', '.join(unknown)}. "
+            f"Available: {', '.join(FACET_NAMES)}"
+        )
+    if not 1 <= limit <= MAX_FACET_LIMIT:
+        raise InvalidFacet(f"facet_limit must be between 1 and {MAX_FACET_LIMIT}")
+
+    names = tuple(dict.fromkeys(names))
+
+    def build():
+        return compute_facets(filters, names, price_edges, limit, browse)
+
+    if cache_key is None:
+        return build()
+    _, facets = versioned_entry("facets", (cache_key, names, price_edges, limit), build)
+    return facets
@@ -35,46 +35,6 @@ def calculate_discount_percentage(original_price, sale_price):
     discount = ((original_price - sale_price) / original_price) * 100
     return round(discount, 0)
 
-def generate_slug(text):
-    """Generate URL-friendly slug from text"""
-    # Convert to lowercase and replace spaces with hyphens
-    slug = re.sub(r'[^\w\s-]', '', text.lower())
-    slug = re.sub(r'[-\s]+', '-', slug)
-    return slug.strip('-')
-
-def paginate_query(query, page=1, per_page=10):
-    """Helper function for pagination"""
-    try:
-        pagination = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
-        
-        return {
-            'items': pagination.items,
-            'pagination': {
-                'page': page,
-                'pages': pagination.pages,
-                'per_page': per_page,
-                'total': pagination.total,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
-        }
-    except Exception:
-        return {
-            'items': [],
-            'pagination': {
-                'page': 1,
-                'pages': 0,
-                'per_page': per_page,
-                'total': 0,
-                'has_next': False,
-                'has_prev': False
-            }
-        }
-
 def format_date(date_obj, format_str='%Y-%m-%d'):
     """Format date object to string"""
     if not date_obj:
@@ -0,0 +1,234 @@
+"""Offset and keyset (cursor) pagination for list endpoints.
+
+Every listing pages the same way: the default page mode keeps the old
+page/per_page behaviour, while passing cursor= (empty for the first page)
+switches to keyset mode. Keyset mode seeks straight past the last row seen
+using the active sort key plus the primary key as a tie-breaker, so deep
+pages cost the same as the first one. Total counts are optional in both
+modes since COUNT(*) over a large table is often the most expensive part.
+
+Cursors are opaque, signed tokens; a cursor minted for one sort order is
+rejected if replayed against another.
+"""
+
+import math
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import current_app, request
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import and_, func, or_
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+_CURSOR_SALT = "pagination-cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor is malformed, tampered with or for another sort"""
+
+
+class SortKey:
+    """One column of a listing's sort order.
+
+    null_value stands in for NULLs (in both the ORDER BY and the cursor) so
+    nullable columns such as publication_date can still be seeked past; use a
+    value that sorts lowest to match the database's own NULL ordering.
+    """
+
+    def __init__(self, column, descending=False, null_value=None):
+        self.column = column
+        self.descending = descending
+        self.null_value = null_value
+
+    @property
+    def expression(self):
+        if self.null_value is None:
+            return self.column
+        return func.coalesce(self.column, self.null_value)
+
+    @property
+    def order_by(self):
+        return self.expression.desc() if self.descending else self.expression.asc()
+
+    def value_of(self, item):
+        value = getattr(item, self.column.key)
+        return self.null_value if value is None else value
+
+    def __str__(self):
+        return f"{self.column.key}:{'desc' if self.descending else 'asc'}"
+
+
+class Page:
+    """One page of results plus the metadata the client needs for the next"""
+
+    def __init__(
+        self, items, per_page, page=None, total=None, has_next=False, next_cursor=None
+    ):
+        self.items = items
+        self.per_page = per_page
+        self.page = page
+        self.total = total
+        self.has_next = has_next
+        self.next_cursor = next_cursor
+
+    @property
+    def pages(self):
+        if self.total is None:
+            return None
+        return math.ceil(self.total / self.per_page) if self.per_page else 0
+
+    def to_dict(self):
+        data = {
+            "per_page": self.per_page,
+            "has_next": self.has_next,
+            "next_cursor": self.next_cursor,
+        }
+        if self.page is not None:
+            data.update(page=self.page, has_prev=self.page > 1)
+        if self.total is not None:
+            data.update(total=self.total, pages=self.pages)
+        return data
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config["SECRET_KEY"], salt=_CURSOR_SALT)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, Decimal):
+        return ["n", str(value)]
+    return ["v", value]
+
+
+def _decode_value(tagged):
+    kind, value = tagged
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "d":
+        return date.fromisoformat(value)
+    if kind == "n":
+        return Decimal(value)
+    return value
+
+
+def _signature(sort_keys):
+    return ",".join(str(key) for key in sort_keys)
+
+
+def encode_cursor(sort_keys, item):
+    """Mint a cursor pointing just past item"""
+    return _serializer().dumps(
+        {
+            "s": _signature(sort_keys),
+            "v": [_encode_value(key.value_of(item)) for key in sort_keys],
+        }
+    )
+
+
+def decode_cursor(sort_keys, cursor):
+    """Return the sort-key values stored in a cursor"""
+    try:
+        data = _serializer().loads(cursor)
+        if data["s"] != _signature(sort_keys) or len(data["v"]) != len(sort_keys):
+            raise InvalidCursor("Cursor does not match the requested sort order")
+        return [_decode_value(value) for value in data["v"]]
+    except (BadSignature, KeyError, TypeError, ValueError) as e:
+        if isinstance(e, InvalidCursor):
+            raise
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def clamp_per_page(per_page):
+    """per_page limited to 1..MAX_PER_PAGE; the response's pagination.per_page
+    echoes the value actually used"""
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+
+def seek_after(sort_keys, values):
+    """WHERE clause selecting rows strictly after values in sort order"""
+    clauses = []
+    for i, key in enumerate(sort_keys):
+        equal_prefix = [
+            prev.expression == value for prev, value in zip(sort_keys[:i], values[:i])
+        ]
+        if key.descending:
+            beyond = key.expression < values[i]
+        else:
+            beyond = key.expression > values[i]
+        clauses.append(and_(*equal_prefix, beyond))
+
+    # The redundant range bound on the leading key lets the database turn
+    # the seek into an index range scan instead of filtering every row
+    first = sort_keys[0]
+    if first.descending:
+        leading = first.expression <= values[0]
+    else:
+        leading = first.expression >= values[0]
+    return and_(leading, or_(*clauses))
+
+
+def paginate(
+    query, sort_keys, page=1, per_page=DEFAULT_PER_PAGE, cursor=None, with_total=True
+):
+    """Order query by sort_keys and return one Page of it.
+
+    sort_keys must end with a unique column (the primary key) so the order is
+    total. With cursor=None the page number is used (OFFSET); any other
+    cursor value, including "", switches to keyset mode.
+    """
+    per_page = clamp_per_page(per_page)
+    ordered = query.order_by(None).order_by(*[key.order_by for key in sort_keys])
+
+    total = query.order_by(None).count() if with_total else None
+
+    if cursor is None:
+        page = max(page, 1)
+        rows = ordered.offset((page - 1) * per_page).limit(per_page + 1).all()
+    else:
+        page = None
+        if cursor:
+            ordered = ordered.filter(
+                seek_after(sort_keys, decode_cursor(sort_keys, cursor))
+            )
+        rows = ordered.limit(per_page + 1).all()
+
+    has_next = len(rows) > per_page
+    items = rows[:per_page]
+    next_cursor = encode_cursor(sort_keys, items[-1]) if has_next else None
+
+    return Page(items, per_page, page, total, has_next, next_cursor)
+
+
+def page_args(default_per_page=DEFAULT_PER_PAGE):
+    """paginate() keyword arguments from the page, per_page, cursor and
+    include_total request args.
+
+    Totals are included by default in page mode (as before) and left out by
+    default in cursor mode.
+    """
+    cursor = request.args.get("cursor")
+    include_total = request.args.get("include_total")
+    if include_total is None:
+        with_total = cursor is None
+    else:
+        with_total = include_total.lower() in ("1", "true", "yes")
+
+    return {
+        "page": request.args.get("page", 1, type=int),
+        "per_page": clamp_per_page(
+            request.args.get("per_page", default_per_page, type=int)
+        ),
+        "cursor": cursor,
+        "with_total": with_total,
+    }
+
+
+def paginate_request(query, sort_keys, default_per_page=DEFAULT_PER_PAGE):
+    """paginate() driven by the request args (see page_args)"""
+    return paginate(query, sort_keys, **page_args(default_per_page))
@@ -0,0 +1,110 @@
+"""Sparse fieldsets for book payloads.
+
+Endpoints that return books accept either fields=title,price,... (a
+comma-separated string, or a list in JSON bodies) or one of the named
+projections below via projection=card|detail|admin. Only the requested keys
+of Book.to_dict() are computed, and load_options() restricts the SQL to the
+columns those keys read, so e.g. the description Text column is never
+fetched for a grid of cards. The book's "id" is always included so clients
+can key the results. Cards get the card-sized cover as their "image".
+"""
+
+from sqlalchemy import func
+from sqlalchemy.orm import load_only, with_expression
+
+PROJECTIONS = {
+    # Book grid cards
+    "card": (
+        "id",
+        "title",
+        "author",
+        "summary",
+        "price",
+        "originalPrice",
+        "rating",
+        "reviews",
+        "image@card",
+        "isInStock",
+    ),
+    # Book page; the historical full payload
+    "detail": None,
+    # Admin book table and edit form
+    "admin": (
+        "id",
+        "isbn",
+        "title",
+        "author",
+        "publisher",
+        "category",
+        "categoryName",
+        "description",
+        "price",
+        "stock",
+        "pages",
+        "image",
+        "publicationDate",
+        "rating",
+        "reviews",
+        "createdAt",
+        "updatedAt",
+    ),
+}
+
+
+class InvalidFields(ValueError):
+    """Raised for an unknown field or projection name"""
+
+
+def parse_fields(value=None, projection=None):
+    """Resolve fields= / projection= into a tuple of payload keys.
+
+    Returns None for the default (full) payload. fields wins over projection
+    when both are given.
+    """
+    from models.book import Book
+
+    if isinstance(value, str):
+        value = value.split(",")
+    fields = [field.strip() for field in value or [] if field and field.strip()]
+
+    if not fields:
+        if not projection:
+            return None
+        if projection not in PROJECTIONS:
+            raise InvalidFields(
+                f"Unknown projection: {projection}. "
+                f"Available: {', '.join(PROJECTIONS)}"
+            )
+        return PROJECTIONS[projection]
+
+    unknown = [field for field in fields if field not in Book.SERIALIZER.fields]
+    if unknown:
+        raise InvalidFields(
+            f"Unknown field(s): {', '.join(unknown)}. "
+            f"Available: {', '.join(Book.SERIALIZER.fields)}"
+        )
+    return tuple(dict.fromkeys(["id", *fields]))
+
+
+def load_options(fields, extra_columns=()):
+    """Loader options that fetch only the columns the given keys read.
+
+    extra_columns are loaded as well, e.g. the sort columns a keyset cursor
+    is built from.
+    """
+    from models.book import Book, SUMMARY_LENGTH
+
+    if fields is None:
+        fields = Book.SERIALIZER.default
+
+    columns = Book.SERIALIZER.columns(fields)
+    loaded = [getattr(Book, column) for column in sorted(columns)]
+    options = [load_only(*loaded, *extra_columns)]
+    if "summary" in fields:
+        # Truncated in SQL instead of shipping the whole Text column
+        options.append(
+            with_expression(
+                Book.summary, func.substr(Book.description, 1, SUMMARY_LENGTH)
+            )
+        )
+    return options
@@ -0,0 +1,325 @@
+"""Customers-also-bought recommendations from co-purchase counts.
+
+build_related() recomputes everything from Order_Item. Live orders become
+the rows of a sparse order x book incidence matrix X, so C = X.T @ X holds,
+for every pair of books, the number of orders containing both (its diagonal
+is each book's own order count). Pairs are scored by cosine similarity,
+damped when few orders back them, and the TOP_RELATED best per book are
+stored in Related_Book for GET /api/books/<id>/related to read by primary
+key. C itself is kept in Co_Purchase so that new and cancelled orders can
+update it through record_order(), which also re-ranks the lists of the
+books in that order against the books already listed; other books' scores
+drift slightly, and a cancelled order can leave a list missing a book that
+should move up into it, until the next rebuild.
+
+NumPy/SciPy are optional. Without them the build counts pairs order by
+order in Python, which gives the same lists, only more slowly.
+"""
+
+import math
+from collections import Counter, defaultdict
+from heapq import nsmallest
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.orm import aliased
+from database import db
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+# Books kept per related list (and most a request can ask for)
+TOP_RELATED = 20
+DEFAULT_RELATED = 8
+
+# Pairs bought together in few orders are damped by orders / (orders + this),
+# so one shared basket of two rare books doesn't outrank a real pattern
+SUPPORT_SHRINK = 5
+
+LOAD_BATCH_SIZE = 100_000
+WRITE_BATCH_SIZE = 10_000
+# Pairs per multi-row upsert in record_order()
+UPSERT_BATCH_SIZE = 1000
+
+
+def similarity(both, orders_a, orders_b, sqrt=math.sqrt):
+    """Support-damped cosine similarity of two books (works on arrays too)"""
+    return both / sqrt(orders_a * orders_b) * both / (both + SUPPORT_SHRINK)
+
+
+def _order_line_batches(batch_size):
+    """(order ids, ISBNs) of live order lines, one keyset batch at a time"""
+    from models.order import CANCELLED_STATUSES, Order, OrderItem
+
+    query = (
+        select(OrderItem.order_item_id, OrderItem.order_id, OrderItem.book_id)
+        .join(Order, Order.order_id == OrderItem.order_id)
+        .where(Order.payment_status.notin_(CANCELLED_STATUSES))
+        .order_by(OrderItem.order_item_id)
+        .limit(batch_size)
+    )
+    last_id = 0
+    while True:
+        rows = db.session.execute(query.where(OrderItem.order_item_id > last_id)).all()
+        if not rows:
+            return
+        item_ids, order_ids, isbns = zip(*rows)
+        yield order_ids, isbns
+        last_id = item_ids[-1]
+
+
+def co_purchase_matrix(order_ids, books, book_count):
+    """Sparse book x book matrix counting the orders that contain both books.
+
+    order_ids and books are parallel arrays with one entry per order line;
+    books holds integer codes below book_count.
+    """
+    _, rows = np.unique(order_ids, return_inverse=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(books), dtype=np.int32), (rows, books)),
+        shape=(int(rows.max()) + 1 if len(rows) else 0, book_count),
+    )
+    # A book listed twice in one order still counts once
+    incidence.data[:] = 1
+    return (incidence.T @ incidence).tocoo()
+
+
+def top_related(matrix, limit=TOP_RELATED):
+    """The best `limit` off-diagonal entries of each row of a co_purchase_matrix.
+
+    Returns parallel (book, rank, related, score, orders) arrays, sorted by
+    book and rank.
+    """
+    counts = matrix.diagonal().astype(np.float64)
+    off_diagonal = matrix.row != matrix.col
+    books = matrix.row[off_diagonal]
+    related = matrix.col[off_diagonal]
+    both = matrix.data[off_diagonal].astype(np.float64)
+    scores = similarity(both, counts[books], counts[related], sqrt=np.sqrt)
+
+    # Best first within each book; ties go to the pair bought together more
+    # often, then to the lower ISBN (codes are assigned in ISBN order)
+    order = np.lexsort((related, -both, -scores, books))
+    books, related, scores, both = (
+        books[order],
+        related[order],
+        scores[order],
+        both[order],
+    )
+    ranks = np.arange(len(books)) - np.searchsorted(books, books)
+    top = ranks < limit
+    return books[top], ranks[top], related[top], scores[top], both[top]
+
+
+def _vectorized_build(limit):
+    """Co-purchase counts and top lists as arrays of ISBNs, counts and scores"""
+    codes = {}
+    order_ids, books = [], []
+    for batch_orders, isbns in _order_line_batches(LOAD_BATCH_SIZE):
+        order_ids.append(np.array(batch_orders, dtype=np.int64))
+        books.append(
+            np.fromiter(
+                (codes.setdefault(isbn, len(codes)) for isbn in isbns),
+                dtype=np.int32,
+                count=len(isbns),
+            )
+        )
+    if not codes:
+        return None
+
+    # Renumber the books in ISBN order so that ties break the same way as
+    # in record_order()
+    names = np.array(list(codes))
+    by_isbn = np.argsort(names)
+    renumber = np.empty_like(by_isbn)
+    renumber[by_isbn] = np.arange(len(by_isbn))
+    names = names[by_isbn]
+
+    matrix = co_purchase_matrix(
+        np.concatenate(order_ids), renumber[np.concatenate(books)], len(names)
+    )
+    pairs = (names[matrix.row], names[matrix.col], matrix.data)
+    book, rank, related, score, both = top_related(matrix, limit)
+    return pairs, (names[book], rank, names[related], score, both)
+
+
+def _python_build(limit):
+    """Same as _vectorized_build() with plain dicts, for when NumPy is missing"""
+    baskets = defaultdict(set)
+    for order_ids, isbns in _order_line_batches(LOAD_BATCH_SIZE):
+        for order_id, isbn in zip(order_ids, isbns):
+            baskets[order_id].add(isbn)
+    if not baskets:
+        return None
+
+    counts = Counter()
+    for basket in baskets.values():
+        counts.update((a, b) for a in basket for b in basket)
+
+    neighbours = defaultdict(list)
+    for (a, b), both in counts.items():
+        if a != b:
+            neighbours[a].append(
+                (-similarity(both, counts[(a, a)], counts[(b, b)]), -both, b)
+            )
+
+    top = []
+    for isbn in sorted(neighbours):
+        for rank, (score, both, related) in enumerate(
+            nsmallest(limit, neighbours[isbn])
+        ):
+            top.append((isbn, rank, related, -score, -both))
+
+    pairs = [(a, b, both) for (a, b), both in sorted(counts.items())]
+    return list(zip(*pairs)), list(zip(*top))
+
+
+def _write(model, columns, arrays):
+    """Bulk insert parallel column arrays (NumPy arrays or sequences)"""
+    for start in range(0, len(arrays[0]), WRITE_BATCH_SIZE):
+        chunk = [array[start : start + WRITE_BATCH_SIZE] for array in arrays]
+        # NumPy scalars aren't understood by every DB driver
+        chunk = [c.tolist() if hasattr(c, "tolist") else c for c in chunk]
+        db.session.execute(
+            insert(model), [dict(zip(columns, row)) for row in zip(*chunk)]
+        )
+
+
+def build_related(limit=TOP_RELATED):
+    """Recreate Co_Purchase and Related_Book from Order_Item (caller commits).
+
+    Returns the number of (pairs, related list entries) written.
+    """
+    from models.related import CoPurchase, RelatedBook
+
+    db.session.execute(delete(RelatedBook))
+    db.session.execute(delete(CoPurchase))
+
+    built = _vectorized_build(limit) if np is not None else _python_build(limit)
+    if built is None:
+        return 0, 0
+
+    pairs, top = built
+    _write(CoPurchase, ("book_id", "related_id", "orders"), pairs)
+    _write(RelatedBook, ("book_id", "rank", "related_id", "score", "orders"), top)
+    return len(pairs[0]), len(top[0])
+
+
+def _refresh_related(isbn, candidates=None, limit=TOP_RELATED):
+    """Re-rank one book's related list from its Co_Purchase row.
+
+    candidates limits the re-ranking to those books (plus the current
+    list); None reads every book ever bought with this one.
+    """
+    from models.related import CoPurchase, RelatedBook
+
+    other = aliased(CoPurchase)
+    query = (
+        select(CoPurchase.related_id, CoPurchase.orders, other.orders)
+        .join(
+            other,
+            and_(
+                other.book_id == CoPurchase.related_id,
+                other.related_id == CoPurchase.related_id,
+            ),
+        )
+        .where(CoPurchase.book_id == isbn)
+    )
+    if candidates is not None:
+        listed = select(RelatedBook.related_id).where(RelatedBook.book_id == isbn)
+        query = query.where(
+            or_(
+                CoPurchase.related_id.in_([isbn, *candidates]),
+                CoPurchase.related_id.in_(listed),
+            )
+        )
+    rows = db.session.execute(query).all()
+    own = next((both for related, both, _ in rows if related == isbn), 0)
+    best = nsmallest(
+        limit,
+        (
+            (-similarity(both, own, orders), -both, related)
+            for related, both, orders in rows
+            if related != isbn
+        ),
+    )
+
+    db.session.execute(delete(RelatedBook).where(RelatedBook.book_id == isbn))
+    if best:
+        db.session.execute(
+            insert(RelatedBook),
+            [
+                {
+                    "book_id": isbn,
+                    "rank": rank,
+                    "related_id": related,
+                    "score": -score,
+                    "orders": -both,
+                }
+                for rank, (score, both, related) in enumerate(best)
+            ],
+        )
+
+
+def record_order(isbns, delta=1):
+    """Count one order's books as bought together, or with delta=-1 take a
+    cancelled order back out, and re-rank those books' lists (caller commits)
+    """
+    from models.related import CoPurchase
+
+    isbns = sorted(set(isbns))
+    if not isbns:
+        return
+
+    if delta > 0:
+        # Every pair of the order's books, the diagonal included, counted with
+        # one upsert so two orders that are first to pair the same books
+        # can't both try to insert the pair
+        pairs = [
+            {"book_id": a, "related_id": b, "orders": delta}
+            for a in isbns
+            for b in isbns
+        ]
+        mysql = db.session.get_bind().dialect.name == "mysql"
+        if mysql:
+            from sqlalchemy.dialects.mysql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        for start in range(0, len(pairs), UPSERT_BATCH_SIZE):
+            statement = upsert(CoPurchase).values(
+                pairs[start : start + UPSERT_BATCH_SIZE]
+            )
+            if mysql:
+                statement = statement.on_duplicate_key_update(
+                    orders=CoPurchase.orders + delta
+                )
+            else:
+                statement = statement.on_conflict_do_update(
+                    index_elements=["book_id", "related_id"],
+                    set_={"orders": CoPurchase.orders + delta},
+                )
+            db.session.execute(statement)
+    else:
+        # Two plain IN lists rather than a row-value IN, which SQLite can't
+        # seek on
+        in_order = and_(CoPurchase.book_id.in_(isbns), CoPurchase.related_id.in_(isbns))
+        db.session.execute(
+            update(CoPurchase).where(in_order).values(orders=CoPurchase.orders + delta),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.execute(
+            delete(CoPurchase).where(
+                CoPurchase.book_id.in_(isbns), CoPurchase.orders <= 0
+            )
+        )
+
+    # A new order only raises the scores of the books in it, and scales the
+    # rest of each list alike, so nothing outside list + order can move in.
+    # Taking an order out can let an outside book in where one of the
+    # order's books drops out of a list; finding it means reading every
+    # co-purchase of the book, so that is left to the next build_related()
+    # instead of being done inside the cancel request.
+    for isbn in isbns:
+        _refresh_related(isbn, isbns)
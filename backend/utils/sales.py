@@ -0,0 +1,201 @@
+"""Bestseller and trending counters for books and categories.
+
+Every order adds its quantities to Book_Details.units_sold and
+Category.units_sold (cancelling takes them off again), so bestseller lists
+are an index scan rather than a SUM over Order_Item.
+
+Trending scores decay with a half-life of TREND_HALF_LIFE. Rather than
+rewriting every score as time passes, a sale is stored with a weight that
+grows by the same factor instead:
+
+    trend_score = sum(quantity * 2 ** ((sold_at - TREND_EPOCH) / TREND_HALF_LIFE))
+
+which, at any moment, is the decayed score sum(quantity * 2 ** -(age /
+TREND_HALF_LIFE)) times one common factor. It therefore ranks books
+the same way, only ever changes by a plain += and can live in an indexed
+column. The weights double every half-life, so TREND_EPOCH has to be moved
+forward (and reconcile_sales.py rerun) before they near the float limit of
+2 ** 1023, about 19 years after it.
+"""
+
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, update
+from database import db
+
+TREND_HALF_LIFE = timedelta(days=7)
+TREND_EPOCH = datetime(2025, 1, 1)
+
+# Relative difference below which a stored trend score counts as current
+TREND_TOLERANCE = 1e-9
+
+# Responses showing decayed scores are revalidated at least this often
+TREND_CACHE_BUCKET = timedelta(minutes=15)
+
+
+def trend_weight(quantity, sold_at):
+    """What a sale adds to trend_score"""
+    return quantity * 2 ** ((sold_at - TREND_EPOCH) / TREND_HALF_LIFE)
+
+
+def current_trend(trend_score, now=None):
+    """A stored trend_score as the decayed number of recent sales"""
+    now = now or datetime.utcnow()
+    return (trend_score or 0.0) * 2 ** -((now - TREND_EPOCH) / TREND_HALF_LIFE)
+
+
+def trend_state(version, last_modified, now=None):
+    """catalog_state() for a response carrying decayed trend scores.
+
+    Those scores drift with the clock as well as with sales, so the version
+    tag gains the current TREND_CACHE_BUCKET and last_modified is moved up
+    to the bucket's start; a 304 is then never older than one bucket.
+    """
+    now = now or datetime.utcnow()
+    bucket = (now - TREND_EPOCH) // TREND_CACHE_BUCKET
+    started = TREND_EPOCH + bucket * TREND_CACHE_BUCKET
+    if last_modified is None or last_modified < started:
+        last_modified = started
+    return f"{version}-t{bucket}", last_modified
+
+
+def record_sales(lines, sold_at, sign=1):
+    """Add an order's (isbn, category name, quantity) lines to the counters,
+    or with sign=-1 take a cancelled order back out (caller commits).
+
+    sold_at is the order date, so a cancellation removes exactly the weight
+    the sale added. One UPDATE ... SET col = col + delta per book and per
+    category, so concurrent orders can't lose each other's counts.
+    """
+    from models.book import Book
+    from models.category import Category
+
+    books = defaultdict(int)
+    categories = defaultdict(int)
+    for isbn, category_name, quantity in lines:
+        books[isbn] += quantity
+        categories[category_name] += quantity
+
+    for model, key, totals in (
+        (Book, Book.isbn, books),
+        (Category, Category.category_name, categories),
+    ):
+        for value, quantity in totals.items():
+            _add_to_counters(
+                model,
+                key,
+                value,
+                sign * quantity,
+                sign * trend_weight(quantity, sold_at),
+            )
+
+
+def _add_to_counters(model, key, value, units, trend):
+    """UPDATE one row's units_sold and trend_score by the given deltas"""
+    units_sold = model.units_sold + units
+    # No sales left means no trend, rather than float rounding residue.
+    # trend_score is assigned first because MySQL evaluates SET left to
+    # right, so it must still see the old units_sold
+    db.session.execute(
+        update(model)
+        .where(key == value)
+        .ordered_values(
+            (
+                model.trend_score,
+                case((units_sold <= 0, 0.0), else_=model.trend_score + trend),
+            ),
+            (model.units_sold, units_sold),
+        ),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def move_category_sales(moves):
+    """Move books' counters to the category they were moved to (caller
+    commits).
+
+    moves holds (units_sold, trend_score, old category, new category) per
+    book whose category changed, read with the book row locked so no order
+    can add to the counters in between.
+    """
+    from models.category import Category
+
+    deltas = defaultdict(lambda: [0, 0.0])
+    for units, trend, old, new in moves:
+        if old == new or not (units or trend):
+            continue
+        for category_name, sign in ((old, -1), (new, 1)):
+            deltas[category_name][0] += sign * units
+            deltas[category_name][1] += sign * (trend or 0.0)
+
+    for category_name, (units, trend) in deltas.items():
+        if units or trend:
+            _add_to_counters(
+                Category, Category.category_name, category_name, units, trend
+            )
+
+
+def _sales_totals():
+    """Units sold and trend score per book and per category, from the orders"""
+    from models.book import Book
+    from models.order import CANCELLED_STATUSES, Order, OrderItem
+
+    books = defaultdict(lambda: [0, 0.0])
+    categories = defaultdict(lambda: [0, 0.0])
+    lines = (
+        db.session.query(
+            OrderItem.book_id,
+            Book.category_name,
+            OrderItem.quantity,
+            Order.order_date,
+        )
+        .join(Order, Order.order_id == OrderItem.order_id)
+        .join(Book, Book.isbn == OrderItem.book_id)
+        .filter(Order.payment_status.notin_(CANCELLED_STATUSES))
+    )
+    for isbn, category_name, quantity, order_date in lines:
+        weight = trend_weight(quantity, order_date)
+        for totals in (books[isbn], categories[category_name]):
+            totals[0] += quantity
+            totals[1] += weight
+    return books, categories
+
+
+def _is_current(stored, expected):
+    """Same units sold, and trend scores equal up to float rounding"""
+    (units, trend), (expected_units, expected_trend) = stored, expected
+    return units == expected_units and math.isclose(
+        trend, expected_trend, rel_tol=TREND_TOLERANCE
+    )
+
+
+def reconcile_sales():
+    """Recompute every book's and category's counters from the orders.
+
+    Only rows whose stored counters are off are rewritten, so untouched
+    books keep their updated_at. Returns the number of rows fixed.
+    """
+    from models.book import Book
+    from models.category import Category
+
+    books, categories = _sales_totals()
+    fixed = 0
+    for model, key, expected in (
+        (Book, Book.isbn, books),
+        (Category, Category.category_name, categories),
+    ):
+        stored = db.session.query(key, model.units_sold, model.trend_score).all()
+        for value, units, trend in stored:
+            totals = expected.get(value, (0, 0.0))
+            if _is_current((units, trend or 0.0), totals):
+                continue
+            db.session.execute(
+                update(model)
+                .where(key == value)
+                .values(units_sold=totals[0], trend_score=totals[1]),
+                execution_options={"synchronize_session": False},
+            )
+            fixed += 1
+    return fixed
@@ -0,0 +1,467 @@
+"""Full-text search over the book catalog.
+
+Books are analysed (tokenised, stop-word filtered, stemmed) into an inverted
+index stored in the Search_Posting / Search_Document / Search_Term tables,
+and queries are ranked with BM25. Admin book writes keep the index current through
+index_book() / remove_book(); rebuild_index() recreates it from scratch.
+"""
+
+import math
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from heapq import nlargest
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import aliased
+from database import db
+
+# Relative importance of each searchable Book column
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "author_name": 2.0,
+    "publisher_name": 1.0,
+    "description": 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Upper bound on ranked hits handed back to the listing query
+MAX_RESULTS = 1000
+
+# Terms more common than this are read best-first and cut off, so a query
+# costs the same whether a term is in 50 books or 500,000
+MAX_POSTINGS_PER_TERM = 5000
+
+MAX_QUERY_TERMS = 8
+
+# Searches with fewer hits than this also rank the spelling-corrected query
+FUZZY_MIN_HITS = 5
+
+# N and average document length barely move between admin edits, so they
+# are cached rather than re-aggregated on every search
+STATS_TTL_SECONDS = 60
+
+MAX_TERM_LENGTH = 64
+
+STOPWORDS = set(
+    "a an and are as at be by for from in into is it its of on or that the "
+    "to was with".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_stats = {"expires": 0.0, "documents": 0, "avg_length": 0.0}
+
+
+def tokenize(text):
+    """Lowercase, strip accents and split text into alphanumeric tokens"""
+    if not text:
+        return []
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    tokens = _TOKEN_RE.findall(text.lower())
+    return [tok for tok in tokens if len(tok) > 1 or tok.isdigit()]
+
+
+def _has_vowel(word):
+    return any(ch in "aeiouy" for ch in word)
+
+
+def stem(word):
+    """Light suffix-stripping stemmer (plurals, -ing, -ed, -ly)"""
+    if len(word) <= 3 or word.isdigit():
+        return word
+
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+
+    for suffix in ("ingly", "edly", "ing", "ed", "ly"):
+        base = word[: -len(suffix)]
+        if word.endswith(suffix) and len(base) >= 3 and _has_vowel(base):
+            # running -> runn -> run
+            if base[-1] == base[-2] and base[-1] not in "lsz":
+                base = base[:-1]
+            return base
+
+    return word
+
+
+def analyze(text):
+    """Turn free text into the list of index terms it contributes"""
+    return [
+        stem(tok)[:MAX_TERM_LENGTH] for tok in tokenize(text) if tok not in STOPWORDS
+    ]
+
+
+def document_terms(book):
+    """Return ({term: weighted tf}, document length) for a book"""
+    weights = Counter()
+    for field, field_weight in FIELD_WEIGHTS.items():
+        for term in analyze(getattr(book, field, None)):
+            weights[term] += field_weight
+    return weights, sum(weights.values())
+
+
+def _invalidate_stats():
+    _stats["expires"] = 0.0
+
+
+def _collection_stats():
+    """Number of indexed books and their average length (cached)"""
+    from models.search import SearchDocument
+
+    now = time.monotonic()
+    if now >= _stats["expires"]:
+        documents, avg_length = db.session.query(
+            db.func.count(SearchDocument.book_id),
+            db.func.avg(SearchDocument.length),
+        ).one()
+        _stats.update(
+            documents=documents or 0,
+            avg_length=float(avg_length or 0.0),
+            expires=now + STATS_TTL_SECONDS,
+        )
+    return _stats
+
+
+def is_index_ready():
+    """True once the index has been built at least once (cached, for the
+    read path)"""
+    return _collection_stats()["documents"] > 0
+
+
+def _is_index_built():
+    """is_index_ready() read from the database, for the write path.
+
+    A worker that cached "not built yet" before another process ran
+    rebuild_index() would otherwise leave every book it writes within
+    STATS_TTL_SECONDS out of the index for good.
+    """
+    from models.search import SearchDocument
+
+    built = db.session.query(SearchDocument.book_id).limit(1).first() is not None
+    if built and not _stats["documents"]:
+        _invalidate_stats()
+    return built
+
+
+def _index_rows(book):
+    weights, length = document_terms(book)
+    postings = [
+        {"term": term, "book_id": book.isbn, "weight": weight}
+        for term, weight in weights.items()
+    ]
+    return postings, {"book_id": book.isbn, "length": length}
+
+
+def _adjust_doc_freq(terms, delta):
+    """Add delta to the document frequency of each term"""
+    from models.search import SearchTerm
+
+    if not terms:
+        return
+
+    db.session.execute(
+        update(SearchTerm)
+        .where(SearchTerm.term.in_(terms))
+        .values(doc_freq=SearchTerm.doc_freq + delta),
+        execution_options={"synchronize_session": False},
+    )
+    if delta > 0:
+        known = {
+            term
+            for (term,) in db.session.query(SearchTerm.term).filter(
+                SearchTerm.term.in_(terms)
+            )
+        }
+        new_terms = [{"term": t, "doc_freq": delta} for t in terms if t not in known]
+        if new_terms:
+            db.session.execute(insert(SearchTerm), new_terms)
+
+
+def remove_book(isbn):
+    """Drop a book from the index (caller commits)"""
+    from models.search import SearchDocument, SearchPosting
+
+    old_terms = [
+        term
+        for (term,) in db.session.query(SearchPosting.term).filter(
+            SearchPosting.book_id == isbn
+        )
+    ]
+    _adjust_doc_freq(old_terms, -1)
+
+    db.session.execute(delete(SearchPosting).where(SearchPosting.book_id == isbn))
+    db.session.execute(delete(SearchDocument).where(SearchDocument.book_id == isbn))
+    _invalidate_stats()
+
+
+def index_book(book):
+    """(Re)index a single book in the caller's transaction.
+
+    Does nothing until the index has been built: search falls back to LIKE
+    until then, and rebuild_index() will pick the book up.
+    """
+    from models.search import SearchDocument, SearchPosting
+
+    if not _is_index_built():
+        return
+
+    # The book row must exist before postings can reference it
+    db.session.flush()
+    remove_book(book.isbn)
+
+    postings, document = _index_rows(book)
+    if postings:
+        db.session.execute(insert(SearchPosting), postings)
+    db.session.execute(insert(SearchDocument), [document])
+    _adjust_doc_freq([posting["term"] for posting in postings], 1)
+    _invalidate_stats()
+
+
+def index_books(books):
+    """(Re)index a batch of books in the caller's transaction.
+
+    Same as index_book() for each, in a handful of statements for the whole
+    batch; books only need isbn and the FIELD_WEIGHTS attributes.
+    """
+    from models.search import SearchDocument, SearchPosting
+
+    if not books or not _is_index_built():
+        return
+
+    isbns = [book.isbn for book in books]
+    old_terms = Counter(
+        term
+        for (term,) in db.session.query(SearchPosting.term).filter(
+            SearchPosting.book_id.in_(isbns)
+        )
+    )
+    db.session.execute(delete(SearchPosting).where(SearchPosting.book_id.in_(isbns)))
+    db.session.execute(delete(SearchDocument).where(SearchDocument.book_id.in_(isbns)))
+
+    postings, documents = [], []
+    for book in books:
+        book_postings, document = _index_rows(book)
+        postings.extend(book_postings)
+        documents.append(document)
+    if postings:
+        db.session.execute(insert(SearchPosting), postings)
+    db.session.execute(insert(SearchDocument), documents)
+
+    # Net change in each term's document frequency, applied per distinct delta
+    new_terms = Counter(posting["term"] for posting in postings)
+    by_delta = defaultdict(list)
+    for term in old_terms.keys() | new_terms.keys():
+        delta = new_terms[term] - old_terms[term]
+        if delta:
+            by_delta[delta].append(term)
+    for delta, terms in by_delta.items():
+        _adjust_doc_freq(terms, delta)
+    _invalidate_stats()
+
+
+def rebuild_index(batch_size=2000):
+    """Recreate the whole index from Book_Details (caller commits).
+
+    Walks the catalog in ISBN order one batch at a time instead of holding a
+    streaming cursor open, so it behaves the same on MySQL and SQLite.
+    Returns the number of books indexed.
+    """
+    from sqlalchemy.orm import load_only
+    from models.book import Book
+    from models.search import SearchDocument, SearchPosting, SearchTerm
+
+    db.session.execute(delete(SearchTerm))
+    db.session.execute(delete(SearchPosting))
+    db.session.execute(delete(SearchDocument))
+
+    columns = [getattr(Book, field) for field in FIELD_WEIGHTS]
+    indexed = 0
+    last_isbn = ""
+    while True:
+        books = (
+            Book.query.options(load_only(Book.isbn, *columns))
+            .filter(Book.isbn > last_isbn)
+            .order_by(Book.isbn)
+            .limit(batch_size)
+            .all()
+        )
+        if not books:
+            break
+
+        postings, documents = [], []
+        for book in books:
+            book_postings, document = _index_rows(book)
+            postings.extend(book_postings)
+            documents.append(document)
+
+        if postings:
+            db.session.execute(insert(SearchPosting), postings)
+        db.session.execute(insert(SearchDocument), documents)
+
+        indexed += len(books)
+        last_isbn = books[-1].isbn
+        db.session.expunge_all()
+
+    db.session.execute(
+        insert(SearchTerm).from_select(
+            ["term", "doc_freq"],
+            select(SearchPosting.term, db.func.count()).group_by(SearchPosting.term),
+        )
+    )
+
+    _invalidate_stats()
+    return indexed
+
+
+def _bm25(weight, length, idf, avg_length):
+    norm = 1 - BM25_B + BM25_B * length / avg_length
+    return idf * weight * (BM25_K1 + 1) / (weight + BM25_K1 * norm)
+
+
+def _term_postings(term, doc_freq):
+    """Select (book_id, weight) for one term, best-first if it is very common"""
+    from models.search import SearchPosting
+
+    stmt = select(SearchPosting.book_id, SearchPosting.weight).where(
+        SearchPosting.term == term
+    )
+    if doc_freq > MAX_POSTINGS_PER_TERM:
+        stmt = stmt.order_by(SearchPosting.weight.desc()).limit(MAX_POSTINGS_PER_TERM)
+    return stmt.subquery()
+
+
+def _match_all(terms, doc_freqs):
+    """Books containing every term, as (book_id, length, w1, w2, ...) rows.
+
+    Driven by the rarest term; the others are probed through the
+    (term, book_id) primary key, so the database does the intersection and
+    the work is bounded by the rarest term's postings.
+    """
+    from models.search import SearchDocument, SearchPosting
+
+    driver = _term_postings(terms[0], doc_freqs[terms[0]])
+    columns = [driver.c.book_id, SearchDocument.length, driver.c.weight]
+    stmt = (
+        select()
+        .select_from(driver)
+        .join(SearchDocument, SearchDocument.book_id == driver.c.book_id)
+    )
+    for term in terms[1:]:
+        other = aliased(SearchPosting)
+        stmt = stmt.join(
+            other, db.and_(other.book_id == driver.c.book_id, other.term == term)
+        )
+        columns.append(other.weight)
+    return db.session.execute(stmt.add_columns(*columns)).all()
+
+
+def _match_any(term, doc_freq):
+    """Books containing one term, as (book_id, length, weight) rows"""
+    from models.search import SearchDocument
+
+    postings = _term_postings(term, doc_freq)
+    return db.session.execute(
+        select(postings.c.book_id, SearchDocument.length, postings.c.weight).join(
+            SearchDocument, SearchDocument.book_id == postings.c.book_id
+        )
+    ).all()
+
+
+def search_books(text, limit=MAX_RESULTS):
+    """Rank books against a free-text query with BM25.
+
+    Books containing every query term are returned first; if none do, books
+    matching any term are ranked instead. Returns [(isbn, score), ...] with
+    the best match first.
+    """
+    from models.search import SearchTerm
+
+    terms = list(dict.fromkeys(analyze(text)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return []
+
+    stats = _collection_stats()
+    total_docs = stats["documents"]
+    avg_length = stats["avg_length"] or 1.0
+    if not total_docs:
+        return []
+
+    doc_freqs = dict(
+        db.session.query(SearchTerm.term, SearchTerm.doc_freq).filter(
+            SearchTerm.term.in_(terms), SearchTerm.doc_freq > 0
+        )
+    )
+    known = sorted(doc_freqs, key=doc_freqs.get)
+    if not known:
+        return []
+    idf = {
+        term: math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+        for term, df in doc_freqs.items()
+    }
+
+    scores = {}
+    if len(known) == len(terms):
+        for book_id, length, *weights in _match_all(known, doc_freqs):
+            scores[book_id] = sum(
+                _bm25(weight, length, idf[term], avg_length)
+                for term, weight in zip(known, weights)
+            )
+
+    if not scores:
+        for term in known:
+            for book_id, length, weight in _match_any(term, doc_freqs[term]):
+                scores[book_id] = scores.get(book_id, 0.0) + _bm25(
+                    weight, length, idf[term], avg_length
+                )
+
+    best = nlargest(limit, scores, key=lambda isbn: (scores[isbn], isbn))
+    return [(isbn, scores[isbn]) for isbn in best]
+
+
+def search_books_fuzzy(text, limit=MAX_RESULTS):
+    """search_books() with a typo-tolerant fallback.
+
+    When the exact query finds fewer than FUZZY_MIN_HITS books and some of
+    its words are unknown to the catalog, the corrected query's hits are
+    ranked after the exact ones. Returns (ranked, corrected query or None).
+    """
+    from utils.suggest import did_you_mean
+
+    ranked = search_books(text, limit)
+    if len(ranked) >= FUZZY_MIN_HITS:
+        return ranked, None
+
+    corrected = did_you_mean(text)
+    if corrected is None:
+        return ranked, None
+
+    found = {isbn for isbn, _ in ranked}
+    extra = [hit for hit in search_books(corrected, limit) if hit[0] not in found]
+    return (ranked + extra)[:limit], corrected
+
+
+def paginate_ranked(query, relevance, page, per_page):
+    """Page through a filtered query in relevance order.
+
+    Ordering 1,000 ranked ISBNs with a SQL CASE is slower than fetching the
+    ISBNs that survive the other filters and ordering them here, so only the
+    requested page of full rows is loaded. Returns (books, total).
+    """
+    from models.book import Book
+
+    matching = [isbn for (isbn,) in query.with_entities(Book.isbn)]
+    matching.sort(key=relevance.get)
+
+    page = max(page, 1)
+    page_isbns = matching[(page - 1) * per_page : page * per_page]
+    books = {book.isbn: book for book in query.filter(Book.isbn.in_(page_isbns))}
+    return [books[isbn] for isbn in page_isbns if isbn in books], len(matching)
@@ -0,0 +1,260 @@
+"""Compiled, schema-driven serializers for the models' to_dict() payloads.
+
+Each model declares a Schema: an ordered mapping of payload key -> field.
+For every set of keys that is asked for, the schema generates the source of
+a plain function (one dict literal, no per-field calls) and compiles it
+once. Attribute reads and conversions used more than once are hoisted into
+locals, so e.g. a cart item's book is fetched once and its
+createdAt/updatedAt share a single strftime() call. compile_all() builds
+every schema's default serializer at startup.
+
+Fields render to Python expression templates in which {name} stands for
+obj.name:
+
+    Attr("title")                           obj.title
+    Float("price")                          float(obj.price)
+    DateTime("created_at", default="")      obj.created_at.strftime(...) or ""
+    Const(False)                            False
+    Expr("{rating_count} or 0")             any expression over attributes
+    Nested("user", User.SERIALIZER)         nested schema, None-safe
+    List("order_items", ...)                list of nested payloads
+    Group({...})                            nested dict of fields
+
+A key written "name@variant" is another rendering of "name" and is emitted
+under "name", so a projection can pick, say, the card-sized image URL and
+still send it as "image".
+"""
+
+import re
+import threading
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_REFERENCE = re.compile(r"\0(\d+)\0")
+_SIMPLE = re.compile(r"[\w.]+")
+
+_registry = []
+_lock = threading.RLock()
+
+
+class Field:
+    """A payload value rendered from an expression template"""
+
+    def __init__(self, template, columns=None):
+        self.template = template
+        # Mapped columns the value reads (drives load_only() projections)
+        self.columns = tuple(
+            _PLACEHOLDER.findall(template) if columns is None else columns
+        )
+
+    def render(self, compiler):
+        return compiler.expression(self.template)
+
+
+class Attr(Field):
+    def __init__(self, name):
+        super().__init__(f"{{{name}}}")
+
+
+class Float(Field):
+    def __init__(self, name):
+        super().__init__(f"float({{{name}}})")
+
+
+class DateTime(Field):
+    def __init__(self, name, fmt="%Y-%m-%d %H:%M:%S", default=""):
+        super().__init__(
+            f"({{{name}}}.strftime({fmt!r}) if {{{name}}} else {default!r})"
+        )
+
+
+class Const(Field):
+    def __init__(self, value):
+        super().__init__(repr(value), columns=())
+
+
+class Expr(Field):
+    """Arbitrary expression; obj is the instance, helpers are in scope"""
+
+    def __init__(self, template, columns=None, **helpers):
+        super().__init__(template, columns)
+        self.helpers = helpers
+
+    def render(self, compiler):
+        for name, value in self.helpers.items():
+            compiler.namespace[name] = value
+        return super().render(compiler)
+
+
+class Nested(Field):
+    """Another schema's payload for a related object (None when missing)"""
+
+    def __init__(self, name, schema, keys=None, default=None):
+        super().__init__(f"{{{name}}}", columns=())
+        self.name = name
+        self.schema = schema
+        self.keys = keys
+        self.default = default
+
+    def _serializer(self):
+        schema = self.schema() if callable(self.schema) else self.schema
+        return schema.serializer(self.keys)
+
+    def render(self, compiler):
+        function = compiler.constant(self._serializer())
+        value = compiler.attribute(self.name)
+        return f"({function}({value}) if {value} is not None else {self.default!r})"
+
+
+class List(Nested):
+    """A list of nested payloads for a one-to-many relationship"""
+
+    def render(self, compiler):
+        function = compiler.constant(self._serializer())
+        return f"[{function}(item) for item in {compiler.attribute(self.name)}]"
+
+
+class Group(Field):
+    """A nested dict built from the same object"""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.columns = tuple(
+            column for field in fields.values() for column in field.columns
+        )
+
+    def render(self, compiler):
+        return compiler.dict_literal(self.fields, self.fields, indent=2)
+
+
+class _Compiler:
+    """Turns one schema + key set into a Python function.
+
+    Every attribute read and expression becomes a numbered value; values
+    used more than once are computed into a local up front, the rest are
+    inlined where they are used.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.namespace = {}
+        self.values = []
+        self.uses = []
+        self.index = {}
+
+    def _use(self, key, code=None):
+        number = self.index.get(key)
+        if number is None:
+            number = self.index[key] = len(self.values)
+            self.values.append(key if code is None else code)
+            self.uses.append(0)
+        self.uses[number] += 1
+        return f"\0{number}\0"
+
+    def attribute(self, name):
+        """Reference to obj.<name>, read only once per call.
+
+        Loaded column values are taken straight from the instance __dict__,
+        skipping the ORM's attribute descriptor; anything else (unloaded or
+        expired columns, relationships, properties) goes through getattr.
+        """
+        return self._use(
+            f"obj.{name}", f"(d[{name!r}] if {name!r} in d else obj.{name})"
+        )
+
+    def constant(self, value):
+        name = f"c_{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def expression(self, template):
+        if not _PLACEHOLDER.search(template):
+            return template
+        if _PLACEHOLDER.fullmatch(template):
+            return self.attribute(template[1:-1])
+        key = _PLACEHOLDER.sub(r"obj.\1", template)
+        if key in self.index:
+            return self._use(key)
+        code = _PLACEHOLDER.sub(lambda m: self.attribute(m.group(1)), template)
+        return self._use(key, code)
+
+    def dict_literal(self, fields, keys, indent=1):
+        pad = "    " * (indent + 1)
+        items = [
+            f"{pad}{key.partition('@')[0]!r}: {fields[key].render(self)},"
+            for key in keys
+        ]
+        return "{\n" + "\n".join(items) + "\n" + "    " * indent + "}"
+
+    def _resolve(self, code):
+        return _REFERENCE.sub(lambda m: self._reference(int(m.group(1))), code)
+
+    def _reference(self, number):
+        if self.uses[number] > 1:
+            return f"v_{number}"
+        code = self._resolve(self.values[number])
+        return code if _SIMPLE.fullmatch(code) else f"({code})"
+
+    def build(self, fields, keys):
+        body = self._resolve(self.dict_literal(fields, keys))
+        prelude = [
+            f"    v_{number} = {self._resolve(code)}"
+            for number, code in enumerate(self.values)
+            if self.uses[number] > 1
+        ]
+        source = "\n".join(
+            [
+                f"def {self.name}(obj):",
+                "    d = obj.__dict__",
+                *prelude,
+                f"    return {body}",
+                "",
+            ]
+        )
+        exec(compile(source, f"<serializer {self.name}>", "exec"), self.namespace)
+        function = self.namespace[self.name]
+        function.source = source
+        return function
+
+
+class Schema:
+    """Ordered payload fields for one model.
+
+    default lists the keys to_dict() emits when none are requested; it
+    defaults to every field.
+    """
+
+    def __init__(self, name, fields, default=None):
+        self.name = name
+        self.fields = fields
+        self.default = tuple(default or fields)
+        self._compiled = {}
+        _registry.append(self)
+
+    def serializer(self, keys=None):
+        """Compiled function for the given keys (compiled on first use)"""
+        keys = self.default if keys is None else tuple(keys)
+        function = self._compiled.get(keys)
+        if function is None:
+            with _lock:
+                function = self._compiled.get(keys)
+                if function is None:
+                    unknown = [key for key in keys if key not in self.fields]
+                    if unknown:
+                        raise KeyError(f"{self.name} has no field(s) {unknown}")
+                    function = _Compiler(f"serialize_{self.name}").build(
+                        self.fields, keys
+                    )
+                    self._compiled[keys] = function
+        return function
+
+    def columns(self, keys=None):
+        """Mapped columns read by the given keys"""
+        keys = self.default if keys is None else keys
+        return {column for key in keys for column in self.fields[key].columns}
+
+
+def compile_all():
+    """Compile every registered schema's default serializer"""
+    for schema in list(_registry):
+        schema.serializer()
+    return len(_registry)
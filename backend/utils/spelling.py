@@ -0,0 +1,109 @@
+"""Spelling correction for search queries from a trigram index.
+
+The vocabulary is every word of the catalog's titles and author names,
+counted by the number of books it appears in. Each word is listed under
+each of its padded trigrams ("  t", " to", "tol", ..., "en " for "tolkien"),
+bucketed by word length. A query word the vocabulary doesn't know is
+corrected to the known word sharing the largest proportion of trigrams with
+it (Jaccard similarity); only words of similar length that share at least
+one trigram are scored, and ties go to the more common word.
+"""
+
+import threading
+from collections import Counter, defaultdict
+
+from utils.search import tokenize
+
+# Shorter words and plain numbers are never corrected
+MIN_WORD_LENGTH = 3
+
+# Candidates may be this many characters longer or shorter than the word
+MAX_LENGTH_DIFFERENCE = 2
+
+# Lowest trigram similarity accepted as a correction
+SIMILARITY_THRESHOLD = 0.3
+
+
+def trigrams(word):
+    """Distinct trigrams of a word padded with two leading and one trailing space"""
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _words(texts):
+    return {
+        word
+        for text in texts
+        for word in tokenize(text)
+        if len(word) >= MIN_WORD_LENGTH and not word.isdigit()
+    }
+
+
+class SpellingIndex:
+    """Word counts plus a (trigram, word length) -> words inverted index"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.postings = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add_text(self, *texts):
+        """Count the words of one book's texts"""
+        with self.lock:
+            for word in _words(texts):
+                if not self.counts[word]:
+                    for gram in trigrams(word):
+                        self.postings[(gram, len(word))].add(word)
+                self.counts[word] += 1
+
+    def remove_text(self, *texts):
+        """Undo add_text() for the same texts"""
+        with self.lock:
+            for word in _words(texts):
+                self.counts[word] -= 1
+                if self.counts[word] > 0:
+                    continue
+                del self.counts[word]
+                for gram in trigrams(word):
+                    key = (gram, len(word))
+                    self.postings[key].discard(word)
+                    if not self.postings[key]:
+                        del self.postings[key]
+
+    def correct(self, word):
+        """The known word closest to word: itself if known, None if nothing is"""
+        if word in self.counts:
+            return word
+        if len(word) < MIN_WORD_LENGTH or word.isdigit():
+            return None
+
+        grams = trigrams(word)
+        lengths = range(
+            len(word) - MAX_LENGTH_DIFFERENCE, len(word) + MAX_LENGTH_DIFFERENCE + 1
+        )
+        shared = Counter()
+        scored = []
+        with self.lock:
+            for gram in grams:
+                for length in lengths:
+                    shared.update(self.postings.get((gram, length), ()))
+
+            for candidate, common in shared.items():
+                # The union is at least len(grams), so this bounds the similarity
+                if common < SIMILARITY_THRESHOLD * len(grams):
+                    continue
+                similarity = common / len(grams | trigrams(candidate))
+                if similarity >= SIMILARITY_THRESHOLD:
+                    scored.append((-similarity, -self.counts[candidate], candidate))
+        return min(scored)[2] if scored else None
+
+    def did_you_mean(self, text):
+        """text with unknown words corrected, or None if nothing changed"""
+        words = tokenize(text)
+        corrected = [self.correct(word) or word for word in words]
+        if corrected == words:
+            return None
+        return " ".join(corrected)
@@ -0,0 +1,411 @@
+"""Typeahead suggestions over book titles, authors and publishers.
+
+Names are normalised (accents stripped, lowercased, punctuation collapsed)
+into keys held in one sorted array, so the entries starting with a prefix
+are a contiguous range found with two binary searches. Prefixes whose range
+holds at least TOP_THRESHOLD entries (short ones such as "t") keep a
+precomputed best-first list, built bottom-up from their children, so a
+lookup never ranks more than TOP_THRESHOLD entries.
+
+Entries are ranked by popularity, then alphabetically. A book's popularity
+is its review count; an author's or publisher's is the total over their
+books.
+
+Each worker builds its indexes on first use. Admin book writes update them
+in place through index_book() / remove_book(); other workers catch up when
+the catalog version moves by re-reading only the books whose updated_at
+changed since their last sync. The spelling index behind search's "did you
+mean" (utils.spelling) lives in the same state and follows the same rows.
+"""
+
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+from datetime import datetime, timedelta
+from heapq import nsmallest
+from operator import itemgetter
+
+from flask import current_app
+from database import db
+
+DEFAULT_SUGGESTIONS = 8
+MAX_SUGGESTIONS = 10
+
+# Entries kept per precomputed prefix; a book can be listed under two keys
+# ("the hobbit" and "hobbit"), so twice what a lookup may return
+TOP_SIZE = 2 * MAX_SUGGESTIONS
+
+# Prefix ranges at least this large get a precomputed top list
+TOP_THRESHOLD = 512
+
+MAX_QUERY_LENGTH = 100
+
+# Books re-read on sync reach back this far before the last sync, covering
+# transactions that were still open when it ran
+SYNC_OVERLAP = timedelta(seconds=60)
+
+ARTICLES = ("the ", "a ", "an ")
+
+# Sorts after every character a key can contain
+_END = "\uffff"
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_lock = threading.Lock()
+
+Entry = namedtuple("Entry", "key score kind text ref")
+_key = itemgetter(0)
+
+
+def normalize(text):
+    """Lowercase, strip accents and reduce text to space-separated words"""
+    if not text:
+        return ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _keys(kind, text):
+    """Keys a name can be found under"""
+    key = normalize(text)
+    if not key:
+        return ()
+    # "The Hobbit" is also found by typing "hob...", and "J.R.R. Tolkien" by
+    # typing the surname
+    if kind == "title" and key.startswith(ARTICLES):
+        return key, key.split(" ", 1)[1]
+    if kind == "author" and " " in key:
+        return key, key.rsplit(" ", 1)[1]
+    return (key,)
+
+
+def _entries(kind, text, score, ref=None):
+    return [Entry(key, score, kind, text, ref) for key in _keys(kind, text)]
+
+
+def _rank(entry):
+    return -entry.score, entry.key, entry.kind, entry.text, entry.ref
+
+
+class SuggestionIndex:
+    """Sorted prefix index with precomputed top lists for large ranges"""
+
+    def __init__(self):
+        # Sorted by key
+        self.entries = []
+        self.tops = {}
+        # isbn -> (title, author, publisher, score) as last indexed
+        self.books = {}
+        # (kind, name) -> [total score, number of books]
+        self.groups = {}
+        self.lock = threading.RLock()
+
+    @classmethod
+    def build(cls, books):
+        """Index (isbn, title, author, publisher, score) rows in one pass"""
+        index = cls()
+        entries = []
+        for isbn, title, author, publisher, score in books:
+            score = score or 0
+            index.books[isbn] = (title, author, publisher, score)
+            entries.extend(_entries("title", title, score, isbn))
+            for kind, name in (("author", author), ("publisher", publisher)):
+                group = index.groups.setdefault((kind, name), [0, 0])
+                group[0] += score
+                group[1] += 1
+
+        for (kind, name), (score, _) in index.groups.items():
+            entries.extend(_entries(kind, name, score))
+
+        entries.sort(key=_key)
+        index.entries = entries
+        index._collect("", 0, len(entries))
+        return index
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _range(self, prefix):
+        lo = bisect_left(self.entries, prefix, key=_key)
+        return lo, bisect_left(self.entries, prefix + _END, lo, key=_key)
+
+    def _collect(self, prefix, lo, hi):
+        """Best entries among entries[lo:hi], which all start with prefix.
+
+        Large ranges are merged from their children's lists (computed
+        recursively unless already present) and stored in self.tops.
+        """
+        if hi - lo < TOP_THRESHOLD:
+            return nsmallest(TOP_SIZE, self.entries[lo:hi], key=_rank)
+
+        entries, depth = self.entries, len(prefix)
+        candidates = []
+        i = lo
+        # Keys equal to the prefix sort first
+        while i < hi and len(entries[i].key) == depth:
+            candidates.append(entries[i])
+            i += 1
+        while i < hi:
+            child = entries[i].key[: depth + 1]
+            j = bisect_left(entries, child + _END, i, hi, key=_key)
+            top = self.tops.get(child)
+            candidates.extend(top if top is not None else self._collect(child, i, j))
+            i = j
+
+        top = self.tops[prefix] = nsmallest(TOP_SIZE, candidates, key=_rank)
+        return top
+
+    def _position(self, entry):
+        """Index of entry in self.entries, or None"""
+        entries = self.entries
+        position = bisect_left(entries, entry.key, key=_key)
+        while position < len(entries) and entries[position].key == entry.key:
+            if entries[position] == entry:
+                return position
+            position += 1
+        return None
+
+    def _add(self, entry):
+        position = bisect_right(self.entries, entry.key, key=_key)
+        self.entries.insert(position, entry)
+        for end in range(len(entry.key) + 1):
+            top = self.tops.get(entry.key[:end])
+            if top is not None:
+                insort(top, entry, key=_rank)
+                del top[TOP_SIZE:]
+
+    def _remove(self, entry):
+        position = self._position(entry)
+        if position is None:
+            return
+        del self.entries[position]
+
+        # An entry in a prefix's top list is also in every longer prefix's, so
+        # the stale lists form a chain; recomputing the shortest one rebuilds
+        # the rest from their (still valid) siblings
+        stale = [
+            entry.key[:end]
+            for end in range(len(entry.key) + 1)
+            if entry in self.tops.get(entry.key[:end], ())
+        ]
+        for prefix in stale:
+            del self.tops[prefix]
+        if stale:
+            self._collect(stale[0], *self._range(stale[0]))
+
+    def _adjust_group(self, kind, name, score, books):
+        """Add to an author's or publisher's total score and book count"""
+        old_score, old_books = self.groups.get((kind, name), (0, 0))
+        new_score, new_books = old_score + score, old_books + books
+        if new_books > 0:
+            self.groups[(kind, name)] = [new_score, new_books]
+        else:
+            self.groups.pop((kind, name), None)
+
+        if old_books > 0 and new_books > 0 and old_score == new_score:
+            return
+        if old_books > 0:
+            for entry in _entries(kind, name, old_score):
+                self._remove(entry)
+        if new_books > 0:
+            for entry in _entries(kind, name, new_score):
+                self._add(entry)
+
+    def _drop_book(self, isbn):
+        indexed = self.books.pop(isbn, None)
+        if indexed is None:
+            return
+        title, author, publisher, score = indexed
+        for entry in _entries("title", title, score, isbn):
+            self._remove(entry)
+        self._adjust_group("author", author, -score, -1)
+        self._adjust_group("publisher", publisher, -score, -1)
+
+    def upsert_book(self, isbn, title, author, publisher, score):
+        """Add a book, or re-index whichever of its entries changed"""
+        score = score or 0
+        with self.lock:
+            old = self.books.get(isbn)
+            if old == (title, author, publisher, score):
+                return
+            self.books[isbn] = (title, author, publisher, score)
+            old_title, old_author, old_publisher, old_score = old or (None,) * 4
+            old_score = old_score or 0
+
+            if (old_title, old_score) != (title, score):
+                for entry in _entries("title", old_title, old_score, isbn):
+                    self._remove(entry)
+                for entry in _entries("title", title, score, isbn):
+                    self._add(entry)
+
+            for kind, old_name, name in (
+                ("author", old_author, author),
+                ("publisher", old_publisher, publisher),
+            ):
+                if old is not None and old_name == name:
+                    self._adjust_group(kind, name, score - old_score, 0)
+                else:
+                    if old is not None:
+                        self._adjust_group(kind, old_name, -old_score, -1)
+                    self._adjust_group(kind, name, score, 1)
+
+    def remove_book(self, isbn):
+        with self.lock:
+            self._drop_book(isbn)
+
+    def suggest(self, text, limit=DEFAULT_SUGGESTIONS):
+        """Best entries whose key starts with the normalised text"""
+        prefix = normalize(text)
+        if not prefix:
+            return []
+
+        with self.lock:
+            top = self.tops.get(prefix)
+            if top is None:
+                lo, hi = self._range(prefix)
+                top = nsmallest(TOP_SIZE, self.entries[lo:hi], key=_rank)
+
+        suggestions, seen = [], set()
+        for entry in top:
+            identity = (entry.kind, entry.ref or entry.text)
+            if identity not in seen:
+                seen.add(identity)
+                suggestions.append(entry)
+                if len(suggestions) == limit:
+                    break
+        return suggestions
+
+
+def _book_rows(query):
+    from models.book import Book
+
+    return query.with_entities(
+        Book.isbn,
+        Book.title,
+        Book.author_name,
+        Book.publisher_name,
+        Book.rating_count,
+    )
+
+
+def _upsert(state, isbn, title, author, publisher, score):
+    """Apply one book row to both of the worker's indexes"""
+    index, spelling = state["index"], state["spelling"]
+    with index.lock:
+        indexed = index.books.get(isbn)
+        if indexed is None or indexed[:2] != (title, author):
+            if indexed is not None:
+                spelling.remove_text(*indexed[:2])
+            spelling.add_text(title, author)
+        index.upsert_book(isbn, title, author, publisher, score)
+
+
+def _remove(state, isbn):
+    index = state["index"]
+    with index.lock:
+        indexed = index.books.get(isbn)
+        if indexed is not None:
+            state["spelling"].remove_text(*indexed[:2])
+        index.remove_book(isbn)
+
+
+def _sync(state, versions):
+    """Apply the books that changed since the indexes were last synced"""
+    from models.book import Book
+
+    synced = datetime.utcnow()
+    changed = Book.query.filter(Book.updated_at >= state["synced"] - SYNC_OVERLAP)
+    for row in _book_rows(changed):
+        _upsert(state, *row)
+
+    # Deletes leave nothing to find by updated_at, and only admin (catalog)
+    # writes delete books
+    if versions[0] != state["versions"][0]:
+        indexed = state["index"].books
+        total = db.session.query(db.func.count(Book.isbn)).scalar()
+        if total != len(indexed):
+            existing = {isbn for (isbn,) in db.session.query(Book.isbn)}
+            for isbn in set(indexed) - existing:
+                _remove(state, isbn)
+
+    state.update(versions=versions, synced=synced)
+
+
+def _state():
+    """This worker's indexes, built on first use and synced to the catalog"""
+    from models.book import Book
+    from utils.catalog import catalog_version
+    from utils.spelling import SpellingIndex
+
+    versions = (catalog_version("catalog"), catalog_version("inventory"))
+    state = current_app.extensions.get("suggest_index")
+    if state is None:
+        with _lock:
+            state = current_app.extensions.get("suggest_index")
+            if state is None:
+                synced = datetime.utcnow()
+                rows = _book_rows(Book.query).all()
+                spelling = SpellingIndex()
+                for _, title, author, _, _ in rows:
+                    spelling.add_text(title, author)
+                state = current_app.extensions["suggest_index"] = {
+                    "index": SuggestionIndex.build(rows),
+                    "spelling": spelling,
+                    "versions": versions,
+                    "synced": synced,
+                }
+    elif state["versions"] != versions:
+        with _lock:
+            if state["versions"] != versions:
+                _sync(state, versions)
+    return state
+
+
+def get_index():
+    """This worker's typeahead index"""
+    return _state()["index"]
+
+
+def get_spelling():
+    """This worker's spelling index (see utils.spelling)"""
+    return _state()["spelling"]
+
+
+def index_book(book):
+    """Refresh one book in this worker's indexes (if they have been built)"""
+    state = current_app.extensions.get("suggest_index")
+    if state is not None:
+        _upsert(
+            state,
+            book.isbn,
+            book.title,
+            book.author_name,
+            book.publisher_name,
+            book.rating_count,
+        )
+
+
+def remove_book(isbn):
+    """Drop a book from this worker's indexes (if they have been built)"""
+    state = current_app.extensions.get("suggest_index")
+    if state is not None:
+        _remove(state, isbn)
+
+
+def suggest(text, limit=DEFAULT_SUGGESTIONS):
+    """Top suggestions for a typed prefix, as response dicts"""
+    limit = max(1, min(limit, MAX_SUGGESTIONS))
+    suggestions = []
+    for entry in get_index().suggest(text[:MAX_QUERY_LENGTH], limit):
+        suggestion = {"type": entry.kind, "text": entry.text}
+        if entry.ref is not None:
+            suggestion["id"] = entry.ref
+        suggestions.append(suggestion)
+    return suggestions
+
+
+def did_you_mean(text):
+    """Search text with misspelt words corrected, or None if none are"""
+    return get_spelling().did_you_mean(text[:MAX_QUERY_LENGTH])
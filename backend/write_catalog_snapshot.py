@@ -0,0 +1,56 @@
+"""
+Catalog Snapshot Writer
+Writes the columnar catalog (utils/columnar.py), with every /api/books sort
+order precomputed, to the file the web workers map (COLUMNAR_SNAPSHOT_PATH),
+so they share one copy of it and start without scanning the book table.
+Run it after deploying, and keep it running with --watch to republish
+whenever the catalog version moves; each run starts from the previous
+snapshot and only re-reads what changed since.
+Usage: python write_catalog_snapshot.py [--path FILE] [--watch SECONDS]
+"""
+
+import argparse
+import time
+from app import create_app
+from database import db
+from routes.books import BROWSE_SORTS, _book_sort_keys
+from utils.catalog import catalog_version
+from utils.columnar import np, publish_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the catalog snapshot")
+    parser.add_argument("--path", help="defaults to COLUMNAR_SNAPSHOT_PATH")
+    parser.add_argument("--watch", type=float, metavar="SECONDS")
+    args = parser.parse_args()
+
+    if np is None:
+        parser.error("the columnar catalog needs NumPy (pip install numpy)")
+
+    app = create_app()
+    path = args.path or app.config.get("COLUMNAR_SNAPSHOT_PATH")
+    if not path:
+        parser.error("give --path or set COLUMNAR_SNAPSHOT_PATH")
+    app.config.update(COLUMNAR_CATALOG=True, COLUMNAR_SNAPSHOT_PATH=path)
+    sort_orders = [_book_sort_keys(sort) for sort in BROWSE_SORTS]
+
+    with app.app_context():
+        written = None
+        while True:
+            versions = (catalog_version("catalog"), catalog_version("inventory"))
+            if versions != written:
+                start = time.perf_counter()
+                written, size = publish_snapshot(path, sort_orders)
+                print(
+                    f"✅ Wrote {path} at version {written[0]}.{written[1]} "
+                    f"({size / 2**20:.1f} MiB) in {time.perf_counter() - start:.1f}s"
+                )
+            if not args.watch:
+                break
+            # End the transaction so the next round sees new commits
+            db.session.remove()
+            time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
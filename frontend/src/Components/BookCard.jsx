@@ -38,7 +38,7 @@ const BookCard = ({ book, favorites, toggleFavorite, addToCart }) => {
         </h3>
         <p className="text-gray-600 text-xs mb-2">{book.author}</p>
         <p className="text-gray-500 text-xs mb-3 line-clamp-2 leading-relaxed">
-          {book.description}
+          {book.summary ?? book.description}
         </p>
 
         <div className="mb-3">
@@ -44,6 +44,7 @@ const BookStore = () => {
         const params = {
           search: searchTerm,
           sort: sortBy,
+          projection: "card",
         };
 
         // Only add filters if they're not default values
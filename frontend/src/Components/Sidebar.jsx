@@ -177,6 +177,8 @@ const Sidebar = ({
           <option value="price-low">Price (Low to High)</option>
           <option value="price-high">Price (High to Low)</option>
           <option value="newest">Newest First</option>
+          <option value="bestselling">Bestselling</option>
+          <option value="trending">Trending Now</option>
         </select>
       </div>
 
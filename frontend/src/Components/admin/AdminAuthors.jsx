@@ -20,7 +20,7 @@ const AdminAuthors = () => {
   const fetchAuthors = async () => {
     try {
       setLoading(true);
-      const response = await apiService.adminGetAuthors();
+      const response = await apiService.adminGetAllAuthors();
       if (response.success) {
         setAuthors(response.authors);
       }
@@ -23,7 +23,7 @@ const AdminPublishers = () => {
   const fetchPublishers = async () => {
     try {
       setLoading(true);
-      const response = await apiService.adminGetPublishers();
+      const response = await apiService.adminGetAllPublishers();
       if (response.success) {
         setPublishers(response.publishers);
       }
@@ -112,6 +112,36 @@ class ApiService {
     return await this.handleResponse(response);
   }
 
+  async getBooksBatch(bookIds, fields = null) {
+    const response = await fetch(`${API_BASE_URL}/books/batch`, {
+      method: "POST",
+      headers: this.getHeaders(false),
+      body: JSON.stringify({ ids: bookIds, ...(fields && { fields }) }),
+    });
+    return await this.handleResponse(response);
+  }
+
+  async getSuggestions(query, limit = 8) {
+    const params = new URLSearchParams({ q: query, limit });
+    const response = await fetch(`${API_BASE_URL}/books/suggest?${params}`, {
+      method: "GET",
+      headers: this.getHeaders(false),
+    });
+    return await this.handleResponse(response);
+  }
+
+  async getRelatedBooks(bookId, limit = 8) {
+    const params = new URLSearchParams({ limit });
+    const response = await fetch(
+      `${API_BASE_URL}/books/${bookId}/related?${params}`,
+      {
+        method: "GET",
+        headers: this.getHeaders(false),
+      }
+    );
+    return await this.handleResponse(response);
+  }
+
   async getCategories() {
     const response = await fetch(`${API_BASE_URL}/books/categories`, {
       method: "GET",
@@ -305,6 +335,36 @@ class ApiService {
     return await this.handleResponse(response);
   }
 
+  // file is a CSV or NDJSON File; pass { job } to resume a failed import
+  async adminImportBooks(file, params = {}) {
+    const format = file.name.endsWith(".csv") ? "csv" : "ndjson";
+    const queryString = new URLSearchParams({
+      format,
+      filename: file.name,
+      ...params,
+    }).toString();
+    const response = await fetch(
+      `${API_BASE_URL}/admin/books/import?${queryString}`,
+      {
+        method: "POST",
+        headers: {
+          ...this.getHeaders(),
+          "Content-Type": format === "csv" ? "text/csv" : "application/x-ndjson",
+        },
+        body: file,
+      }
+    );
+    return await this.handleResponse(response);
+  }
+
+  async adminGetImport(jobId) {
+    const response = await fetch(`${API_BASE_URL}/admin/books/import/${jobId}`, {
+      method: "GET",
+      headers: this.getHeaders(),
+    });
+    return await this.handleResponse(response);
+  }
+
   async adminUpdateBook(isbn, bookData) {
     const response = await fetch(`${API_BASE_URL}/admin/books/${isbn}`, {
       method: "PUT",
@@ -422,14 +482,29 @@ class ApiService {
     return await this.handleResponse(response);
   }
 
-  async adminGetAuthors() {
-    const response = await fetch(`${API_BASE_URL}/admin/authors`, {
-      method: "GET",
-      headers: this.getHeaders(),
-    });
+  async adminGetAuthors(params = {}) {
+    const queryString = new URLSearchParams(params).toString();
+    const response = await fetch(
+      `${API_BASE_URL}/admin/authors${queryString ? `?${queryString}` : ""}`,
+      { method: "GET", headers: this.getHeaders() }
+    );
     return await this.handleResponse(response);
   }
 
+  // Every author, following the cursor across pages
+  async adminGetAllAuthors() {
+    const authors = [];
+    let cursor = "";
+    do {
+      const response = await this.adminGetAuthors({ cursor });
+      authors.push(...response.authors);
+      cursor = response.pagination.has_next
+        ? response.pagination.next_cursor
+        : null;
+    } while (cursor);
+    return { success: true, authors };
+  }
+
   async adminCreateAuthor(authorData) {
     const response = await fetch(`${API_BASE_URL}/admin/authors`, {
       method: "POST",
@@ -462,14 +537,29 @@ class ApiService {
     return await this.handleResponse(response);
   }
 
-  async adminGetPublishers() {
-    const response = await fetch(`${API_BASE_URL}/admin/publishers`, {
-      method: "GET",
-      headers: this.getHeaders(),
-    });
+  async adminGetPublishers(params = {}) {
+    const queryString = new URLSearchParams(params).toString();
+    const response = await fetch(
+      `${API_BASE_URL}/admin/publishers${queryString ? `?${queryString}` : ""}`,
+      { method: "GET", headers: this.getHeaders() }
+    );
     return await this.handleResponse(response);
   }
 
+  // Every publisher, following the cursor across pages
+  async adminGetAllPublishers() {
+    const publishers = [];
+    let cursor = "";
+    do {
+      const response = await this.adminGetPublishers({ cursor });
+      publishers.push(...response.publishers);
+      cursor = response.pagination.has_next
+        ? response.pagination.next_cursor
+        : null;
+    } while (cursor);
+    return { success: true, publishers };
+  }
+
   async adminCreatePublisher(publisherData) {
     const response = await fetch(`${API_BASE_URL}/admin/publishers`, {
       method: "POST",